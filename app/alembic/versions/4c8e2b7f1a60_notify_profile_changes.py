@@ -0,0 +1,46 @@
+"""Notify listeners of profile changes
+
+Revision ID: 4c8e2b7f1a60
+Revises: 9f3a6c1e2d87
+Create Date: 2026-10-19 14:02:41.518203
+
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "4c8e2b7f1a60"
+down_revision = "9f3a6c1e2d87"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # The payload is the affected user_id, which is all the service needs to evict cache keys.
+    # Postgres collapses identical notifications within a transaction, so bulk updates send
+    # one notification per profile.
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION notify_profile_change() RETURNS trigger AS $$
+        BEGIN
+            PERFORM pg_notify('profile_changes', OLD.user_id::text);
+            IF TG_OP = 'UPDATE' AND NEW.user_id IS DISTINCT FROM OLD.user_id THEN
+                PERFORM pg_notify('profile_changes', NEW.user_id::text);
+            END IF;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER profile_notify_change
+        AFTER UPDATE OR DELETE ON profile
+        FOR EACH ROW EXECUTE FUNCTION notify_profile_change()
+        """
+    )
+
+
+def downgrade():
+    op.execute("DROP TRIGGER IF EXISTS profile_notify_change ON profile")
+    op.execute("DROP FUNCTION IF EXISTS notify_profile_change()")
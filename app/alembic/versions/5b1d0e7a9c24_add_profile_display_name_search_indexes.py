@@ -0,0 +1,49 @@
+"""Add profile display name search indexes
+
+Revision ID: 5b1d0e7a9c24
+Revises: ceb82cebf5d4
+Create Date: 2026-10-19 11:02:47.905113
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "5b1d0e7a9c24"
+down_revision = "ceb82cebf5d4"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_profile_display_name_trgm",
+            "profile",
+            ["display_name"],
+            unique=False,
+            postgresql_using="gin",
+            postgresql_ops={"display_name": "gin_trgm_ops"},
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_profile_display_name_lower_prefix",
+            "profile",
+            [sa.text('lower(display_name) COLLATE "C"')],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_profile_display_name_lower_prefix",
+            table_name="profile",
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            "ix_profile_display_name_trgm", table_name="profile", postgresql_concurrently=True
+        )
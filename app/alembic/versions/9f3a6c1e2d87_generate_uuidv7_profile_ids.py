@@ -0,0 +1,53 @@
+"""Generate UUIDv7 profile ids
+
+Revision ID: 9f3a6c1e2d87
+Revises: 5b1d0e7a9c24
+Create Date: 2026-10-19 12:21:09.377514
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "9f3a6c1e2d87"
+down_revision = "5b1d0e7a9c24"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # New ids are generated by the application (app.core.ids.uuid7). The server default
+    # covers rows inserted with plain SQL. Existing UUIDv4 ids stay valid and are not touched.
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION uuid_generate_v7() RETURNS uuid AS $$
+        BEGIN
+            -- Overlay the millisecond timestamp on a random UUID, then flip version 4 to 7.
+            RETURN encode(
+                set_bit(
+                    set_bit(
+                        overlay(
+                            uuid_send(gen_random_uuid())
+                            placing substring(
+                                int8send(floor(extract(epoch FROM clock_timestamp()) * 1000)::bigint)
+                                FROM 3
+                            )
+                            FROM 1 FOR 6
+                        ),
+                        52, 1
+                    ),
+                    53, 1
+                ),
+                'hex'
+            )::uuid;
+        END
+        $$ LANGUAGE plpgsql VOLATILE
+        """
+    )
+    op.alter_column("profile", "id", server_default=sa.text("uuid_generate_v7()"))
+
+
+def downgrade():
+    op.alter_column("profile", "id", server_default=None)
+    op.execute("DROP FUNCTION IF EXISTS uuid_generate_v7()")
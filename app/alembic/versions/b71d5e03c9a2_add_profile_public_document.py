@@ -0,0 +1,49 @@
+"""Add profile public document
+
+Revision ID: b71d5e03c9a2
+Revises: 4c8e2b7f1a60
+Create Date: 2026-10-19 15:37:12.804416
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "b71d5e03c9a2"
+down_revision = "4c8e2b7f1a60"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Existing rows start without a document and are served through the ORM until they are
+    # written again or rebuilt with `python -m app.cli profiles rebuild-documents`.
+    op.add_column("profile", sa.Column("public_document", sa.LargeBinary(), nullable=True))
+    # The service rebuilds the document in the same UPDATE. Any other update leaves it
+    # unchanged, which would make it stale, so it is cleared instead.
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION clear_stale_profile_document() RETURNS trigger AS $$
+        BEGIN
+            IF NEW.public_document IS NOT DISTINCT FROM OLD.public_document THEN
+                NEW.public_document := NULL;
+            END IF;
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER profile_clear_stale_document
+        BEFORE UPDATE ON profile
+        FOR EACH ROW EXECUTE FUNCTION clear_stale_profile_document()
+        """
+    )
+
+
+def downgrade():
+    op.execute("DROP TRIGGER IF EXISTS profile_clear_stale_document ON profile")
+    op.execute("DROP FUNCTION IF EXISTS clear_stale_profile_document()")
+    op.drop_column("profile", "public_document")
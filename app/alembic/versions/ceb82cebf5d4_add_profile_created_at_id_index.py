@@ -0,0 +1,34 @@
+"""Add profile created_at id index
+
+Revision ID: ceb82cebf5d4
+Revises: 0ec46eed3903
+Create Date: 2026-10-19 10:12:31.418220
+
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "ceb82cebf5d4"
+down_revision = "0ec46eed3903"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Keyset pagination orders by (created_at, id); build the index without locking writes.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_profile_created_at_id",
+            "profile",
+            ["created_at", "id"],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_profile_created_at_id", table_name="profile", postgresql_concurrently=True
+        )
@@ -0,0 +1,36 @@
+"""Add profile avatar placeholder
+
+Revision ID: e5a19c7d3b48
+Revises: b71d5e03c9a2
+Create Date: 2026-10-19 17:04:51.218093
+
+"""
+
+import sqlalchemy as sa
+import sqlmodel
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "e5a19c7d3b48"
+down_revision = "b71d5e03c9a2"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column(
+        "profile",
+        sa.Column(
+            "avatar_placeholder", sqlmodel.sql.sqltypes.AutoString(length=1024), nullable=True
+        ),
+    )
+    # Stored public documents predate the new field. Clearing them makes reads go through the
+    # ORM until `python -m app.cli profiles rebuild-documents` runs. Cached entries expire with
+    # their TTL, so the per-row change notifications are not needed.
+    op.execute("ALTER TABLE profile DISABLE TRIGGER profile_notify_change")
+    op.execute("UPDATE profile SET public_document = NULL WHERE public_document IS NOT NULL")
+    op.execute("ALTER TABLE profile ENABLE TRIGGER profile_notify_change")
+
+
+def downgrade():
+    op.drop_column("profile", "avatar_placeholder")
@@ -0,0 +1,184 @@
+import asyncio
+import logging
+import uuid
+from typing import Annotated, Any
+
+from auth_lib.auth import CurrentUserUUID
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import PlainTextResponse
+from fastapi.routing import APIRoute
+
+from app.core.config import settings
+from app.core.database import async_engine
+from app.core.database import get_pool_stats as get_db_pool_stats
+from app.core.hot_keys import hot_profiles
+from app.core.memory import (
+    TracingStateError,
+    gc_stats,
+    memory_tracer,
+    object_counts,
+    process_memory,
+)
+from app.core.profiler import ProfilerBusyError, SamplingProfiler, profiler_state
+from app.core.rate_limit import local_buckets
+from app.core.redis_client import get_pool_stats as get_redis_pool_stats
+
+logger = logging.getLogger(__name__)
+
+ADMIN_USER_IDS = frozenset(
+    uuid.UUID(user_id.strip()) for user_id in settings.ADMIN_USER_IDS.split(",") if user_id.strip()
+)
+
+
+async def require_admin(user_id: CurrentUserUUID) -> uuid.UUID:
+    if user_id not in ADMIN_USER_IDS:
+        logger.warning(f"User {user_id} called an admin endpoint without being an admin")
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin access required")
+    return user_id
+
+
+profiler_router = APIRouter(dependencies=[Depends(require_admin)])
+memory_router = APIRouter(dependencies=[Depends(require_admin)])
+hot_profiles_router = APIRouter(dependencies=[Depends(require_admin)])
+
+
+def _find_route(request: Request, path: str) -> APIRoute:
+    for route in request.app.routes:
+        if isinstance(route, APIRoute) and route.path == path:
+            return route
+    raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"No route {path!r}")
+
+
+@profiler_router.post(
+    "/profile",
+    response_class=PlainTextResponse,
+    summary="Profile this worker",
+    description=(
+        "Samples the stacks of the worker serving this request for `seconds`, or until"
+        " `requests` requests have completed, and returns them as collapsed stacks for"
+        " flamegraph tools. `route` (e.g. `/profiles/profile/{user_id}`) keeps only samples"
+        " taken inside that route's handler."
+    ),
+)
+async def profile_worker(
+    request: Request,
+    seconds: Annotated[float, Query(gt=0, le=settings.PROFILER_MAX_SECONDS)] = 10.0,
+    requests: Annotated[int | None, Query(ge=1)] = None,
+    route: str | None = None,
+):
+    """Runs the sampling profiler in this worker only."""
+    handler = _find_route(request, route).endpoint if route is not None else None
+    profiler = SamplingProfiler(
+        settings.PROFILER_SAMPLE_INTERVAL_SECONDS,
+        focus=handler.__code__ if handler is not None else None,
+        focus_path=route,
+        max_requests=requests,
+    )
+    try:
+        await profiler_state.profile(profiler, seconds)
+    except ProfilerBusyError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    return PlainTextResponse(
+        profiler.collapsed(),
+        headers={
+            "X-Profile-Samples": str(profiler.samples),
+            "X-Profile-Requests": str(profiler.requests),
+        },
+    )
+
+
+def _service_caches(request: Request) -> dict[str, Any]:
+    """Sizes of the in-process caches and pools that grow with traffic."""
+    caches: dict[str, Any] = {
+        "db_pool": get_db_pool_stats(),
+        # SQLAlchemy's cache of compiled statements, bounded by `query_cache_size`.
+        "sql_compiled_cache": len(async_engine.sync_engine._compiled_cache or ()),
+        "hot_profiles": hot_profiles.stats(),
+        "local_rate_limit_buckets": local_buckets.stats(),
+    }
+    redis_client = getattr(request.app.state, "redis_client", None)
+    if redis_client is not None:
+        caches["redis_pool"] = get_redis_pool_stats(redis_client)
+    return caches
+
+
+@memory_router.get(
+    "/memory",
+    summary="Memory usage of this worker",
+    description=(
+        "Reports the worker's resident memory, garbage collector statistics, the most common"
+        " object types and the sizes of the service's own caches and pools."
+    ),
+)
+async def memory_report(request: Request, types: Annotated[int, Query(ge=1, le=500)] = 30):
+    # Walking every object takes a while on a large heap.
+    counts = await asyncio.to_thread(object_counts, types)
+    return {
+        "process": process_memory(),
+        "gc": gc_stats(),
+        "objects": counts,
+        "caches": _service_caches(request),
+        "tracing": memory_tracer.tracing,
+    }
+
+
+@memory_router.post(
+    "/memory/tracing",
+    status_code=status.HTTP_204_NO_CONTENT,
+    summary="Start memory tracing",
+    description=(
+        "Starts `tracemalloc` in this worker with `frames` frames per traceback and takes the"
+        " baseline snapshot that `GET /memory/tracing/diff` compares against. Allocations are"
+        " slower while tracing runs."
+    ),
+)
+async def start_memory_tracing(frames: Annotated[int, Query(ge=1, le=25)] = 1):
+    try:
+        memory_tracer.start(frames)
+    except TracingStateError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+
+
+@memory_router.delete(
+    "/memory/tracing",
+    status_code=status.HTTP_204_NO_CONTENT,
+    summary="Stop memory tracing",
+    description="Stops `tracemalloc` in this worker and frees its traces.",
+)
+async def stop_memory_tracing():
+    try:
+        memory_tracer.stop()
+    except TracingStateError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+
+
+@memory_router.get(
+    "/memory/tracing/diff",
+    summary="Memory growth since the baseline",
+    description=(
+        "Lists the `limit` source lines whose live allocations grew most since tracing started,"
+        " or since the last call with `reset=true`."
+    ),
+)
+async def memory_tracing_diff(
+    limit: Annotated[int, Query(ge=1, le=500)] = 20,
+    reset: bool = False,
+):
+    try:
+        return await asyncio.to_thread(memory_tracer.diff, limit, reset)
+    except TracingStateError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+
+
+@hot_profiles_router.get(
+    "/hot-profiles",
+    summary="Hot profiles of this worker",
+    description="Lists the most read profiles of this worker with their approximate read counts.",
+)
+async def hot_profile_stats(limit: Annotated[int, Query(ge=1, le=1000)] = 20):
+    return {
+        **hot_profiles.stats(),
+        "profiles": [
+            {"user_id": user_id, "reads": reads} for user_id, reads in hot_profiles.hot(limit)
+        ],
+    }
@@ -0,0 +1,202 @@
+import asyncio
+import logging
+from collections.abc import AsyncGenerator
+from contextlib import AsyncExitStack
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any
+
+from fastapi import APIRouter, HTTPException, Request, status
+from fastapi.responses import FileResponse, Response, StreamingResponse
+
+from app.core.avatar_cache import AvatarCacheWriter, AvatarDiskCache, AvatarMetadata
+from app.core.circuit_breaker import CircuitOpenError
+from app.core.config import settings
+from app.core.s3_client import (
+    S3ObjectNotFoundError,
+    S3ObjectNotModifiedError,
+    S3RangeNotSatisfiableError,
+    s3_breaker,
+)
+
+from .endpoints import USER_ICON_PREFIX, _get_s3_client
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+AVATAR_STREAM_CHUNK_SIZE = 64 * 1024
+
+
+def _cache_control() -> str:
+    # Avatar keys are never reused for different content, so any copy stays valid forever.
+    return f"public, max-age={settings.AVATAR_CACHE_MAX_AGE_SECONDS}, immutable"
+
+
+def _cache_headers(metadata: AvatarMetadata) -> dict[str, str]:
+    return {
+        "Cache-Control": _cache_control(),
+        "ETag": metadata.etag,
+        "Last-Modified": metadata.last_modified,
+    }
+
+
+def _is_not_modified(
+    metadata: AvatarMetadata, if_none_match: str | None, if_modified_since: str | None
+) -> bool:
+    """Evaluates the conditional request headers; If-None-Match takes precedence."""
+    if if_none_match is not None:
+        candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return "*" in candidates or metadata.etag.removeprefix("W/") in candidates
+    if if_modified_since is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+            return parsedate_to_datetime(metadata.last_modified) <= since
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def _get_avatar_cache(request: Request) -> AvatarDiskCache | None:
+    return getattr(request.app.state, "avatar_cache", None)
+
+
+def _metadata_from_s3(s3_object: dict[str, Any]) -> AvatarMetadata:
+    return AvatarMetadata(
+        content_type=s3_object.get("ContentType") or "application/octet-stream",
+        etag=s3_object["ETag"],
+        last_modified=format_datetime(s3_object["LastModified"], usegmt=True),
+    )
+
+
+async def _fill_cache(writer: AvatarCacheWriter, chunk: bytes) -> AvatarCacheWriter | None:
+    """Writes a chunk to the cache entry. A failing disk only costs the entry, not the response."""
+    try:
+        await asyncio.to_thread(writer.write, chunk)
+        return writer
+    except OSError as e:
+        logger.error(f"Disk cache write for avatar '{writer.object_key}' failed: {e}")
+        await asyncio.to_thread(writer.abort)
+        return None
+
+
+async def _open_avatar(
+    request: Request,
+    stack: AsyncExitStack,
+    object_key: str,
+    byte_range: str | None,
+    if_none_match: str | None,
+) -> dict[str, Any] | None:
+    """Opens the object on `stack`. Returns None if the caller's copy is current."""
+    s3 = _get_s3_client(request)
+    try:
+        return await s3_breaker.call(
+            stack.enter_async_context,
+            s3.open_object(object_key, byte_range=byte_range, if_none_match=if_none_match),
+        )
+    except S3ObjectNotModifiedError:
+        return None
+    except S3ObjectNotFoundError:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Avatar not found")
+    except S3RangeNotSatisfiableError:
+        raise HTTPException(
+            status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+            detail="Requested range is not satisfiable.",
+        )
+    except CircuitOpenError:
+        logger.warning(f"S3 circuit open, cannot serve avatar '{object_key}'")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Avatar storage is temporarily unavailable.",
+        )
+    except Exception as e:
+        logger.error(f"Reading avatar '{object_key}' from S3 failed: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY, detail="Could not read avatar from storage."
+        )
+
+
+@router.get(
+    "/avatar/{object_key:path}",
+    summary="Get an avatar image",
+    description="Streams an avatar from storage with long-lived, immutable caching headers.",
+    responses={
+        status.HTTP_206_PARTIAL_CONTENT: {"description": "Requested byte range"},
+        status.HTTP_304_NOT_MODIFIED: {"description": "Cached copy is current"},
+    },
+)
+async def get_avatar(request: Request, object_key: str):
+    """Serves an avatar from the local disk cache, filling it from S3 on a miss."""
+    if_none_match = request.headers.get("if-none-match")
+    if_modified_since = request.headers.get("if-modified-since")
+    if not object_key.startswith(USER_ICON_PREFIX) or ".." in object_key.split("/"):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Avatar not found")
+
+    cache = _get_avatar_cache(request)
+    cached = await asyncio.to_thread(cache.get, object_key) if cache is not None else None
+    if cached is not None:
+        headers = _cache_headers(cached.metadata)
+        if _is_not_modified(cached.metadata, if_none_match, if_modified_since):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        logger.debug(f"Disk cache HIT for avatar '{object_key}'")
+        # FileResponse answers Range and If-Range requests itself.
+        return FileResponse(cached.path, headers=headers, media_type=cached.metadata.content_type)
+
+    # A miss with If-Range can't be checked before reading the object, so send all of it.
+    byte_range = request.headers.get("range") if "if-range" not in request.headers else None
+    stack = AsyncExitStack()
+    s3_object = await _open_avatar(
+        request, stack, object_key, byte_range=byte_range, if_none_match=if_none_match
+    )
+    if s3_object is None:
+        return Response(
+            status_code=status.HTTP_304_NOT_MODIFIED, headers={"Cache-Control": _cache_control()}
+        )
+
+    try:
+        metadata = _metadata_from_s3(s3_object)
+        headers = _cache_headers(metadata) | {
+            "Accept-Ranges": "bytes",
+            "Content-Length": str(s3_object["ContentLength"]),
+        }
+        status_code = status.HTTP_200_OK
+        if "ContentRange" in s3_object:
+            status_code = status.HTTP_206_PARTIAL_CONTENT
+            headers["Content-Range"] = s3_object["ContentRange"]
+
+        writer: AvatarCacheWriter | None = None
+        if (
+            cache is not None
+            and status_code == status.HTTP_200_OK
+            and s3_object["ContentLength"] <= settings.AVATAR_CACHE_MAX_OBJECT_BYTES
+        ):
+            try:
+                writer = await asyncio.to_thread(cache.open_writer, object_key, metadata)
+            except OSError as e:
+                logger.error(f"Could not open a disk cache entry for avatar '{object_key}': {e}")
+    except BaseException:
+        await stack.aclose()
+        raise
+
+    async def stream() -> AsyncGenerator[bytes]:
+        nonlocal writer
+        # Closing the stack releases the S3 connection, however the response ends.
+        async with stack:
+            try:
+                async for chunk in s3_object["Body"].iter_chunks(AVATAR_STREAM_CHUNK_SIZE):
+                    if writer is not None:
+                        writer = await _fill_cache(writer, chunk)
+                    yield chunk
+            except BaseException:
+                if writer is not None:
+                    await asyncio.to_thread(writer.abort)
+                raise
+        if writer is not None:
+            try:
+                await asyncio.to_thread(writer.commit)
+                logger.debug(f"Stored avatar '{object_key}' in the disk cache")
+            except OSError as e:
+                logger.error(f"Could not store avatar '{object_key}' in the disk cache: {e}")
+                await asyncio.to_thread(writer.abort)
+
+    return StreamingResponse(
+        stream(), status_code=status_code, headers=headers, media_type=metadata.content_type
+    )
@@ -1,25 +1,321 @@
+import asyncio
+import base64
+import datetime
 import logging
+import time
 import uuid
-from typing import Annotated
+from collections.abc import AsyncGenerator, Awaitable, Callable, Sequence
+from typing import Annotated, Any, Literal, TypeVar
 
 import redis.asyncio as aioredis
 from auth_lib.auth import CurrentUserUUID
-from fastapi import APIRouter, Depends, File, Form, HTTPException, Request, UploadFile, status
+from fastapi import (
+    APIRouter,
+    Depends,
+    File,
+    Form,
+    HTTPException,
+    Query,
+    Request,
+    UploadFile,
+    status,
+)
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from pydantic import TypeAdapter
+from pydantic_core import to_json
+from sqlalchemy import Row, Select, func, or_, tuple_
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import defer
 from sqlmodel import select
 
-from app.core.database import get_async_session
-from app.core.redis_client import get_redis_client
-from app.core.s3_client import S3Client
+from app.core.avatar_jobs import (
+    AvatarJob,
+    AvatarJobFailedError,
+    enqueue_avatar_job,
+    get_avatar_job,
+)
+from app.core.cache_codec import (
+    JsonProfileCodec,
+    decode_profile,
+    decode_profile_json,
+    profile_codec,
+)
+from app.core.cache_keys import profile_fields_key, profile_me_key, profile_public_key
+from app.core.circuit_breaker import CircuitOpenError
+from app.core.config import settings
+from app.core.database import get_async_session, get_session_factory
+from app.core.events import latest_event_id, publish_profile_event
+from app.core.hot_keys import hot_profiles
+from app.core.placeholders import build_avatar_placeholder
+from app.core.rate_limit import RateLimit, consume
+from app.core.redis_client import get_redis_client, redis_breaker
+from app.core.s3_client import S3Client, s3_breaker
 from app.models.profile import Profile
-from app.schemas.profile import ProfileRead
+from app.schemas.profile import (
+    AvatarJobRead,
+    ProfileEventCursor,
+    ProfilePage,
+    ProfileRead,
+    build_public_document,
+    render_public_document,
+)
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+T = TypeVar("T")
+
 USER_ICON_PREFIX = "icons/"
 ICON_URL_EXPIRY_SECONDS = 3600 * 24  # 1 day by default
+PROFILE_LIST_DEFAULT_LIMIT = 100
+PROFILE_LIST_MAX_LIMIT = 500
+PROFILE_STREAM_BATCH_SIZE = 500
+PRESIGN_CONCURRENCY = 32
+SEARCH_DEFAULT_LIMIT = 10
+SEARCH_MAX_LIMIT = 50
+SEARCH_MIN_FUZZY_LENGTH = 3  # shorter queries have no trigrams to match on
+SEARCH_CACHE_TTL_SECONDS = 30
+PROFILE_CACHE_TTL_SECONDS = 60
+AVATAR_JOB_MAX_WAIT_SECONDS = 30
+AVATAR_JOB_POLL_SECONDS = 0.25
+
+PROFILE_FIELDS = tuple(ProfileRead.model_fields)
+
+ProfileReadList = TypeAdapter(list[ProfileRead])
+FieldsQuery = Annotated[
+    str | None,
+    Query(
+        description="Comma-separated profile fields to return, e.g. `display_name,avatar_url`",
+        examples=["display_name,avatar_url"],
+    ),
+]
+
+
+def _get_s3_client(request: Request) -> S3Client:
+    try:
+        return request.app.state.s3_client
+    except AttributeError:
+        logger.error("S3Client not found in application state. Check lifespan initialization.")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="S3 storage service is not configured correctly.",
+        )
+
+
+async def _read_cached(
+    redis: aioredis.Redis | None,
+    cache_key: str,
+    parse: Callable[[bytes], T],
+    field: str | None = None,
+) -> T | None:
+    """
+    Returns the parsed cache entry, or None on a miss or when Redis is unavailable.
+    With `field`, the entry is read from the hash stored at `cache_key`.
+    """
+    if redis is None:
+        return None
+    try:
+        if field is None:
+            cached_value = await redis_breaker.call(redis.get, cache_key)
+        else:
+            cached_value = await redis_breaker.call(redis.hget, cache_key, field)
+        if cached_value:
+            return parse(cached_value)
+    except CircuitOpenError:
+        logger.debug(f"Redis circuit open, skipping cache read for key '{cache_key}'")
+    except (aioredis.RedisError, TimeoutError) as e:
+        logger.error(f"Redis error: {e}")
+    except Exception as e:
+        logger.error(f"Error processing cached data for key '{cache_key}': {e}. Fetching from DB.")
+    return None
+
+
+async def _hset_with_ttl(
+    redis: aioredis.Redis, cache_key: str, field: str, value: str | bytes, ttl_seconds: int
+) -> None:
+    async with redis.pipeline(transaction=False) as pipe:
+        pipe.hset(cache_key, field, value)
+        pipe.expire(cache_key, ttl_seconds)
+        await pipe.execute()
+
+
+async def _write_cached(
+    redis: aioredis.Redis | None,
+    cache_key: str,
+    value: str | bytes,
+    ttl_seconds: int,
+    field: str | None = None,
+) -> None:
+    if redis is None:
+        return
+    try:
+        if field is None:
+            await redis_breaker.call(redis.set, cache_key, value, ex=ttl_seconds)
+        else:
+            await redis_breaker.call(_hset_with_ttl, redis, cache_key, field, value, ttl_seconds)
+        logger.info(f"Stored value in cache for key '{cache_key}' with TTL {ttl_seconds}s")
+    except CircuitOpenError:
+        logger.debug(f"Redis circuit open, skipping cache write for key '{cache_key}'")
+    except (aioredis.RedisError, TimeoutError) as e:
+        logger.error(
+            f"Redis SET error for key '{cache_key}': {e}. Response served without caching."
+        )
+    except Exception as e:
+        logger.error(f"Unexpected error caching data for key '{cache_key}': {e}")
+
+
+async def _invalidate_cached_profile(redis: aioredis.Redis | None, cache_key: str) -> None:
+    if redis is None:
+        return
+    try:
+        deleted_count = await redis_breaker.call(redis.delete, cache_key)
+        if deleted_count > 0:
+            logger.info(f"Successfully invalidated cache for key: {cache_key}")
+        else:
+            logger.info(
+                f"Cache key not found or already expired during invalidation attempt: {cache_key}"
+            )
+    except CircuitOpenError:
+        logger.warning(f"Redis circuit open, could not invalidate cache key '{cache_key}'")
+    except (aioredis.RedisError, TimeoutError) as e:
+        logger.error(f"Redis cache invalidation error for key '{cache_key}': {e}")
+    except Exception as e:
+        logger.error(f"Unexpected error during cache invalidation for key '{cache_key}': {e}")
+
+
+async def _presign_avatar(s3: S3Client, object_key: str, user_id: uuid.UUID) -> str | None:
+    """Generates the avatar URL, or None if S3 is unavailable."""
+    try:
+        avatar_url = await s3_breaker.call(
+            s3.get_file_url, object_key=object_key, expires_in=ICON_URL_EXPIRY_SECONDS
+        )
+        logger.info(f"Successfully generated avatar URL for user {user_id}")
+        return avatar_url
+    except CircuitOpenError:
+        logger.warning(f"S3 circuit open, serving profile of user {user_id} without avatar URL")
+    except Exception as e:
+        logger.exception(
+            f"Unexpected error generating pre-signed URL for user {user_id},"
+            f" key '{object_key}': {e}"
+        )
+    return None
+
+
+async def _to_profile_reads(s3: S3Client, profiles: Sequence[Profile]) -> list[ProfileRead]:
+    """Builds response models for a page of profiles, presigning avatar URLs concurrently."""
+    semaphore = asyncio.Semaphore(PRESIGN_CONCURRENCY)
+
+    async def presign(profile: Profile) -> str | None:
+        if not profile.avatar_url:
+            return None
+        async with semaphore:
+            return await _presign_avatar(s3, profile.avatar_url, profile.user_id)
+
+    avatar_urls = await asyncio.gather(*(presign(profile) for profile in profiles))
+    profile_reads = []
+    for profile, avatar_url in zip(profiles, avatar_urls):
+        profile_read = ProfileRead.model_validate(profile)
+        profile_read.avatar_url = avatar_url
+        profile_reads.append(profile_read)
+    return profile_reads
+
+
+def _parse_fields(fields: str | None) -> tuple[str, ...] | None:
+    """Validates a `fields` query value and returns the fields in canonical order."""
+    if fields is None:
+        return None
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = requested.difference(PROFILE_FIELDS)
+    if not requested or unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid fields: {', '.join(sorted(unknown)) or fields!r}. "
+            f"Allowed: {', '.join(PROFILE_FIELDS)}.",
+        )
+    return tuple(name for name in PROFILE_FIELDS if name in requested)
+
+
+def _projection_statement(projection: tuple[str, ...], *extra_columns: str) -> Select:
+    """Selects only the columns needed to build the projection."""
+    columns = [*projection, *extra_columns]
+    if "avatar_url" in projection:
+        columns.append("user_id")  # identifies the profile in presigning logs
+    return select(*(getattr(Profile, name) for name in dict.fromkeys(columns)))
+
+
+async def _to_projections(
+    s3: S3Client, rows: Sequence[Row], projection: tuple[str, ...]
+) -> list[dict[str, Any]]:
+    """Builds projected response items, presigning avatar URLs only if they were requested."""
+    items = [{name: row._mapping[name] for name in projection} for row in rows]
+    if "avatar_url" not in projection:
+        return items
+
+    semaphore = asyncio.Semaphore(PRESIGN_CONCURRENCY)
+
+    async def presign(item: dict[str, Any], user_id: uuid.UUID) -> None:
+        if not item["avatar_url"]:
+            return
+        async with semaphore:
+            item["avatar_url"] = await _presign_avatar(s3, item["avatar_url"], user_id)
+
+    await asyncio.gather(*(presign(item, row.user_id) for item, row in zip(items, rows)))
+    return items
+
+
+def _encode_cursor(profile: Profile | Row) -> str:
+    raw_cursor = f"{profile.created_at.isoformat()}|{profile.id}"
+    return base64.urlsafe_b64encode(raw_cursor.encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> tuple[datetime.datetime, uuid.UUID]:
+    try:
+        created_at, profile_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.datetime.fromisoformat(created_at), uuid.UUID(profile_id)
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor.")
+
+
+def build_search_statement(query: str, limit: int) -> Select:
+    """
+    Matches display names starting with `query` first, then similar ones by trigram score.
+    `query` is expected to be lowercased.
+    """
+    escaped_query = query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    lower_display_name = func.lower(Profile.display_name).collate("C")
+    is_prefix_match = lower_display_name.like(f"{escaped_query}%", escape="\\")
+    statement = select(Profile).options(defer(Profile.public_document)).limit(limit)
+    if len(query) < SEARCH_MIN_FUZZY_LENGTH:
+        return statement.where(is_prefix_match).order_by(lower_display_name)
+    return statement.where(or_(is_prefix_match, Profile.display_name.op("%")(query))).order_by(
+        is_prefix_match.desc(),
+        func.similarity(Profile.display_name, query).desc(),
+        Profile.display_name,
+    )
+
+
+async def _stream_profiles_ndjson(
+    session_factory: async_sessionmaker[AsyncSession],
+    s3: S3Client,
+    statement: Select,
+    projection: tuple[str, ...] | None = None,
+) -> AsyncGenerator[str | bytes]:
+    # Runs after the request-scoped session is closed, so it opens its own. A server-side
+    # cursor fetches one page at a time, keeping memory flat regardless of table size.
+    statement = statement.execution_options(yield_per=PROFILE_STREAM_BATCH_SIZE)
+    async with session_factory() as session:
+        if projection is not None:
+            rows = await session.stream(statement)
+            async for partition in rows.partitions():
+                for item in await _to_projections(s3, partition, projection):
+                    yield to_json(item) + b"\n"
+            return
+
+        result = await session.stream_scalars(statement)
+        async for partition in result.partitions():
+            for profile_read in await _to_profile_reads(s3, partition):
+                yield profile_read.model_dump_json() + "\n"
 
 
 @router.get(
@@ -32,31 +328,18 @@ async def get_my_profile(  # noqa: PLR0915
     request: Request,
     user_id: CurrentUserUUID,
     session: AsyncSession = Depends(get_async_session),
-    redis: aioredis.Redis = Depends(get_redis_client),
+    redis: aioredis.Redis | None = Depends(get_redis_client),
 ):
     """Fetches the profile for the user identified by the JWT, including avatar URL from S3."""
-    cache_key = f"profile:me:{user_id}"
+    cache_key = profile_me_key(user_id)
     cache_ttl_seconds = 60
 
-    try:
-        cached_profile = await redis.get(cache_key)
-        if cached_profile:
-            logger.info(f"Cache HIT for user_id: {user_id}")
-            profile_data = ProfileRead.model_validate_json(cached_profile)
-            return profile_data
-    except aioredis.RedisError as e:
-        logger.error(f"Redis error: {e}")
-    except Exception as e:
-        logger.error(f"Error processing cached data for key '{cache_key}': {e}. Fetching from DB.")
+    cached_profile = await _read_cached(redis, cache_key, decode_profile)
+    if cached_profile:
+        logger.info(f"Cache HIT for user_id: {user_id}")
+        return cached_profile
 
-    try:
-        s3: S3Client = request.app.state.s3_client
-    except AttributeError:
-        logger.error("S3Client not found in application state. Check lifespan initialization.")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="S3 storage service is not configured correctly.",
-        )
+    s3 = _get_s3_client(request)
     # Fetch profile from the database
     statement = select(Profile).where(Profile.user_id == user_id)
     result = await session.execute(statement)
@@ -70,6 +353,7 @@ async def get_my_profile(  # noqa: PLR0915
             await session.commit()
             await session.refresh(profile)
             logger.info(f"Successfully created default profile for user_id: {user_id}")
+            await publish_profile_event(redis, "created", profile)
         except IntegrityError:
             await session.rollback()
             logger.error(f"Integrity error trying to create default profile for user_id: {user_id}")
@@ -90,100 +374,99 @@ async def get_my_profile(  # noqa: PLR0915
 
     avatar_url: str | None = None
     if profile.avatar_url:
-        try:
-            avatar_url = await s3.get_file_url(
-                object_key=profile.avatar_url, expires_in=ICON_URL_EXPIRY_SECONDS
-            )
-            logger.info(f"Successfully generated avatar URL for user {user_id}")
-        except Exception as e:
-            logger.exception(
-                f"Unexpected error generating pre-signed URL for user {user_id},"
-                f" key '{profile.avatar_url}': {e}"
-            )
+        avatar_url = await _presign_avatar(s3, profile.avatar_url, user_id)
 
     profile_read = ProfileRead.model_validate(profile)
     profile_read.avatar_url = avatar_url
 
-    try:
-        profile_json_to_cache = profile_read.model_dump_json()
-        await redis.set(cache_key, profile_json_to_cache, ex=cache_ttl_seconds)
-        logger.info(f"Stored profile in cache for user_id: {user_id} with TTL {cache_ttl_seconds}s")
-    except aioredis.RedisError as e:
-        logger.error(
-            f"Redis SET error for key '{cache_key}': {e}. Response served without caching."
-        )
-    except Exception as e:
-        logger.error(f"Error serializing profile data for caching key '{cache_key}': {e}")
+    # Don't pin a degraded response (missing avatar URL) in the cache.
+    if avatar_url or not profile.avatar_url:
+        await _write_cached(redis, cache_key, profile_codec.encode(profile_read), cache_ttl_seconds)
 
     logger.info(f"Retrieved profile for user_id: {user_id}")
     return profile_read
 
 
-@router.put(
-    "/me",
-    response_model=ProfileRead,
-    summary="Create or update current user's profile",
-    description=("Updates the existing profile for the authenticated user."),
-)
-async def create_or_update_my_profile(  # noqa: PLR0912, PLR0913, PLR0915 : TODO: Divide this func or find another solution to fix troubles
+async def _enforce_write_rate_limits(
     request: Request,
-    user_id: CurrentUserUUID,
-    session: AsyncSession = Depends(get_async_session),
-    redis: aioredis.Redis = Depends(get_redis_client),
-    display_name: Annotated[str | None, Form()] = None,
-    bio: Annotated[str | None, Form()] = None,
-    icon: Annotated[UploadFile | None, File()] = None,
-):
-    """Updates the profile for the user identified by the JWT."""
-    try:
-        s3: S3Client = request.app.state.s3_client
-    except AttributeError:
-        logger.error("S3Client not found in application state. Check lifespan initialization.")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="S3 storage service is not configured correctly.",
-        )
-    object_key: str | None = None
-
-    if icon:
-        try:
-            contents = await icon.read()
-
-            file_uuid, extension = await s3.upload_file(
-                file_content=contents,
-                content_type=icon.content_type,
-                prefix=USER_ICON_PREFIX,
-                original_filename=icon.filename,
-            )
-
-            object_key = f"{USER_ICON_PREFIX}{file_uuid}{extension}"
-        except Exception as e:
-            logger.error(f"Avatar upload failed: {e}")
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Could not determine file type for upload: {e}",
-            )
-        finally:
-            if icon:
-                await icon.close()
-
-    profile_data_to_update = {
-        "display_name": display_name,
-        "bio": bio,
-    }
-
-    if object_key:
-        profile_data_to_update["avatar_url"] = object_key
-
-    update_data_filtered = {k: v for k, v in profile_data_to_update.items() if v is not None}
-
-    if not update_data_filtered:
+    response: Response,
+    redis: aioredis.Redis | None,
+    user_id: uuid.UUID,
+    with_avatar: bool,
+) -> None:
+    """Rejects a write over the caller's per-user or per-IP budget before any S3 or DB work."""
+    if not settings.RATE_LIMIT_ENABLED:
+        return
+    client_ip = request.client.host if request.client else "unknown"
+    period = settings.RATE_LIMIT_PERIOD_SECONDS
+    limits = [
+        RateLimit(
+            f"ratelimit:profile_write:user:{user_id}",
+            settings.RATE_LIMIT_PROFILE_WRITE_PER_USER,
+            period,
+        ),
+        RateLimit(
+            f"ratelimit:profile_write:ip:{client_ip}",
+            settings.RATE_LIMIT_PROFILE_WRITE_PER_IP,
+            period,
+        ),
+    ]
+    if with_avatar:
+        limits += [
+            RateLimit(
+                f"ratelimit:avatar_upload:user:{user_id}",
+                settings.RATE_LIMIT_AVATAR_UPLOAD_PER_USER,
+                period,
+            ),
+            RateLimit(
+                f"ratelimit:avatar_upload:ip:{client_ip}",
+                settings.RATE_LIMIT_AVATAR_UPLOAD_PER_IP,
+                period,
+            ),
+        ]
+
+    decision = await consume(redis, limits)
+    if not decision.allowed:
+        logger.warning(f"Rate limit '{decision.limit.key}' exceeded by user {user_id}")
         raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="No update data provided.",
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many profile updates, retry later.",
+            headers=decision.headers(),
         )
-
-    # Fetch existing profile
+    response.headers.update(decision.headers())
+
+
+async def _upload_avatar(
+    s3: S3Client,
+    contents: bytes,
+    content_type: str | None,
+    filename: str | None,
+    file_uuid: str | None = None,
+) -> tuple[str, str | None]:
+    """
+    Stores an avatar in S3 and returns its object key and placeholder. The key is new unless
+    `file_uuid` names it.
+    """
+    # The placeholder is rendered in a worker thread while the upload is in flight.
+    placeholder_task = asyncio.create_task(asyncio.to_thread(build_avatar_placeholder, contents))
+    file_uuid, extension = await s3_breaker.call(
+        s3.upload_file,
+        file_content=contents,
+        content_type=content_type,
+        prefix=USER_ICON_PREFIX,
+        original_filename=filename,
+        file_uuid=file_uuid,
+    )
+    return f"{USER_ICON_PREFIX}{file_uuid}{extension}", await placeholder_task
+
+
+async def _save_profile_update(
+    session: AsyncSession,
+    redis: aioredis.Redis | None,
+    user_id: uuid.UUID,
+    update_data: dict[str, Any],
+) -> Profile:
+    """Applies `update_data` to the user's profile, commits, and invalidates its cache entry."""
     try:
         statement = select(Profile).where(Profile.user_id == user_id)
         result = await session.execute(statement)
@@ -198,30 +481,17 @@ async def create_or_update_my_profile(  # noqa: PLR0912, PLR0913, PLR0915 : TODO
 
         # Update existing profile
         logger.info(f"Updating profile for user_id: {user_id}")
-        for key, value in update_data_filtered.items():
+        for key, value in update_data.items():
             setattr(db_profile, key, value)
         session.add(db_profile)
-        profile_to_return = db_profile
 
         await session.commit()
-        await session.refresh(profile_to_return)
+        await session.refresh(db_profile)
         logger.info(f"Successfully committed profile update for user_id: {user_id}")
 
         # Invalidate cache after successful update
-        cache_key = f"profile:me:{user_id}"
-        try:
-            deleted_count = await redis.delete(cache_key)
-            if deleted_count > 0:
-                logger.info(f"Successfully invalidated cache for key: {cache_key}")
-            else:
-                logger.info(
-                    f"Cache key not found or already expired during"
-                    f" invalidation attempt: {cache_key}"
-                )
-        except aioredis.RedisError as e:
-            logger.error(f"Redis cache invalidation error for key '{cache_key}': {e}")
-        except Exception as e:
-            logger.error(f"Unexpected error during cache invalidation for key '{cache_key}': {e}")
+        await _invalidate_cached_profile(redis, profile_me_key(user_id))
+        await publish_profile_event(redis, "updated", db_profile)
 
     except IntegrityError:
         await session.rollback()
@@ -239,18 +509,177 @@ async def create_or_update_my_profile(  # noqa: PLR0912, PLR0913, PLR0915 : TODO
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Could not update profile.",
         )
+    return db_profile
 
-    avatar_url: str | None = None
-    if profile_to_return.avatar_url:
+
+def _avatar_update(object_key: str, avatar_placeholder: str | None) -> dict[str, Any]:
+    # Replaces the previous avatar's placeholder even when none could be rendered.
+    return {"avatar_url": object_key, "avatar_placeholder": avatar_placeholder}
+
+
+async def process_avatar_job(
+    session: AsyncSession,
+    s3: S3Client,
+    redis: aioredis.Redis | None,
+    job: AvatarJob,
+    contents: bytes,
+) -> None:
+    """Stores a queued avatar and points the profile at it, like a synchronous `PUT /me`."""
+    try:
+        # Named after the job, so a retried attempt overwrites the object of a failed one.
+        object_key, avatar_placeholder = await _upload_avatar(
+            s3, contents, job.content_type, job.filename, file_uuid=job.id
+        )
+    except ValueError as e:
+        raise AvatarJobFailedError(f"Could not determine file type for upload: {e}")
+    try:
+        await _save_profile_update(
+            session, redis, job.user_id, _avatar_update(object_key, avatar_placeholder)
+        )
+    except HTTPException as e:
+        if e.status_code >= status.HTTP_500_INTERNAL_SERVER_ERROR:
+            raise
+        raise AvatarJobFailedError(e.detail) from e
+
+
+def avatar_job_processor(
+    s3: S3Client, redis: aioredis.Redis | None
+) -> Callable[[AvatarJob, bytes], Awaitable[None]]:
+    """Processes avatar jobs, each in its own database session, for an `AvatarJobWorker`."""
+    session_factory = get_session_factory()
+
+    async def process(job: AvatarJob, contents: bytes) -> None:
+        async with session_factory() as session:
+            await process_avatar_job(session, s3, redis, job, contents)
+
+    return process
+
+
+def _prefers_async(request: Request) -> bool:
+    """Whether the client asked for a 202 with a job to poll (RFC 7240) and may get one."""
+    return settings.AVATAR_JOBS_ENABLED and "respond-async" in request.headers.get("prefer", "")
+
+
+async def _accept_avatar_job(  # noqa: PLR0913
+    request: Request,
+    response: Response,
+    redis: aioredis.Redis,
+    user_id: uuid.UUID,
+    *,
+    icon: UploadFile,
+    contents: bytes,
+) -> JSONResponse:
+    """Queues the avatar for a background worker and answers with `202` and the job."""
+    job = await redis_breaker.call(
+        enqueue_avatar_job, redis, user_id, contents, icon.content_type, icon.filename
+    )
+    location = str(request.url_for("get_my_avatar_job", job_id=job.id))
+    return JSONResponse(
+        AvatarJobRead.model_validate(job, from_attributes=True).model_dump(mode="json"),
+        status_code=status.HTTP_202_ACCEPTED,
+        # Returned responses don't get the headers set on `response`, e.g. rate limits.
+        headers={**response.headers, "Location": location},
+    )
+
+
+@router.put(
+    "/me",
+    response_model=ProfileRead,
+    summary="Create or update current user's profile",
+    description=(
+        "Updates the existing profile for the authenticated user. With `Prefer: respond-async`"
+        " an avatar is stored in the background: the response is `202` with a job to poll at"
+        " its `Location`, after any `display_name` and `bio` changes were saved."
+    ),
+    responses={status.HTTP_202_ACCEPTED: {"model": AvatarJobRead}},
+)
+async def create_or_update_my_profile(  # noqa: PLR0912, PLR0913
+    request: Request,
+    response: Response,
+    user_id: CurrentUserUUID,
+    session: AsyncSession = Depends(get_async_session),
+    redis: aioredis.Redis | None = Depends(get_redis_client),
+    display_name: Annotated[str | None, Form()] = None,
+    bio: Annotated[str | None, Form()] = None,
+    icon: Annotated[UploadFile | None, File()] = None,
+):
+    """Updates the profile for the user identified by the JWT."""
+    await _enforce_write_rate_limits(request, response, redis, user_id, with_avatar=bool(icon))
+    s3 = _get_s3_client(request)
+
+    profile_data_to_update = {
+        "display_name": display_name,
+        "bio": bio,
+    }
+    update_data_filtered = {k: v for k, v in profile_data_to_update.items() if v is not None}
+
+    contents: bytes | None = None
+    if icon:
+        try:
+            contents = await icon.read()
+        finally:
+            await icon.close()
+
+    if contents is not None and redis is not None and _prefers_async(request):
+        # Checked before anything is saved, so a rejected request changes nothing.
+        if len(contents) > settings.AVATAR_JOBS_MAX_UPLOAD_BYTES:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"Avatars are limited to {settings.AVATAR_JOBS_MAX_UPLOAD_BYTES} bytes.",
+            )
         try:
-            avatar_url = await s3.get_file_url(
-                object_key=profile_to_return.avatar_url, expires_in=ICON_URL_EXPIRY_SECONDS
+            accepted = await _accept_avatar_job(
+                request, response, redis, user_id, icon=icon, contents=contents
             )
+        except CircuitOpenError:
+            # Nothing was sent to Redis, so the avatar is stored now instead.
+            logger.warning(f"Redis circuit open, storing avatar for user {user_id} now")
         except Exception as e:
-            logger.error(
-                f"Failed to generate pre-signed URL for response after PUT for user {user_id}: {e}",
-                exc_info=True,
+            # The job may have been queued before the error, e.g. a timeout waiting for the
+            # reply, and storing the avatar now as well would store it twice.
+            logger.error(f"Could not queue avatar for user {user_id}: {e}")
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Avatar uploads are temporarily unavailable.",
+            )
+        else:
+            # Text changes don't wait for the avatar. They are saved only once it is queued, so
+            # an upload that falls back to storing it now saves both at once; a job for a
+            # profile that doesn't exist fails on its own.
+            if update_data_filtered:
+                await _save_profile_update(session, redis, user_id, update_data_filtered)
+            return accepted
+
+    if contents is not None:
+        try:
+            object_key, avatar_placeholder = await _upload_avatar(
+                s3, contents, icon.content_type, icon.filename
+            )
+        except CircuitOpenError:
+            logger.warning(f"S3 circuit open, rejecting avatar upload for user {user_id}")
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Avatar storage is temporarily unavailable.",
             )
+        except Exception as e:
+            logger.error(f"Avatar upload failed: {e}")
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Could not determine file type for upload: {e}",
+            )
+        update_data_filtered |= _avatar_update(object_key, avatar_placeholder)
+
+    if not update_data_filtered:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="No update data provided.",
+        )
+
+    profile_to_return = await _save_profile_update(session, redis, user_id, update_data_filtered)
+
+    avatar_url: str | None = None
+    if profile_to_return.avatar_url:
+        avatar_url = await _presign_avatar(s3, profile_to_return.avatar_url, user_id)
 
     response_data = ProfileRead.model_validate(profile_to_return).model_dump()
     response_data["avatar_url"] = avatar_url
@@ -259,6 +688,81 @@ async def create_or_update_my_profile(  # noqa: PLR0912, PLR0913, PLR0915 : TODO
     return response_data
 
 
+@router.get(
+    "/me/avatar-jobs/{job_id}",
+    response_model=AvatarJobRead,
+    summary="Get an avatar job",
+    description=(
+        "Reports the status of an avatar upload accepted with `202`. With `wait`, answers as"
+        " soon as the job finishes or after `wait` seconds, whichever comes first."
+    ),
+)
+async def get_my_avatar_job(
+    job_id: str,
+    user_id: CurrentUserUUID,
+    redis: aioredis.Redis | None = Depends(get_redis_client),
+    wait: Annotated[float, Query(ge=0, le=AVATAR_JOB_MAX_WAIT_SECONDS)] = 0,
+):
+    """Returns the job if it belongs to the user identified by the JWT."""
+    if redis is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Avatar jobs are temporarily unavailable.",
+        )
+    deadline = time.monotonic() + wait
+    while True:
+        try:
+            job = await redis_breaker.call(get_avatar_job, redis, job_id)
+        except Exception as e:
+            logger.warning(f"Could not read avatar job {job_id}: {e}")
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Avatar jobs are temporarily unavailable.",
+            )
+        if job is None or job.user_id != user_id:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+        if job.finished or time.monotonic() >= deadline:
+            return AvatarJobRead.model_validate(job, from_attributes=True)
+        await asyncio.sleep(min(AVATAR_JOB_POLL_SECONDS, deadline - time.monotonic()))
+
+
+async def _get_user_profile_projection(
+    request: Request,
+    user_id: uuid.UUID,
+    projection: tuple[str, ...],
+    session: AsyncSession,
+    redis: aioredis.Redis | None,
+) -> Response:
+    """Serves a subset of the profile fields, cached per projection in one hash per profile."""
+    cache_key = profile_fields_key(user_id)
+    cache_field = ",".join(projection)
+    cache_ttl_seconds = 60
+
+    cached_profile = await _read_cached(redis, cache_key, bytes, field=cache_field)
+    if cached_profile:
+        logger.info(f"Cache HIT for profile_id: {user_id}, fields: {cache_field}")
+        return Response(cached_profile, media_type="application/json")
+
+    s3 = _get_s3_client(request)
+    statement = _projection_statement(projection).where(Profile.user_id == user_id)
+    result = await session.execute(statement)
+    row = result.one_or_none()
+
+    if row is None:
+        logger.info(f"Profile not found for post_id: {user_id}")
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
+
+    [item] = await _to_projections(s3, [row], projection)
+    content = to_json(item)
+
+    # Don't pin a degraded response (missing avatar URL) in the cache.
+    if "avatar_url" not in projection or item["avatar_url"] or not row.avatar_url:
+        await _write_cached(redis, cache_key, content, cache_ttl_seconds, field=cache_field)
+
+    logger.info(f"Retrieved profile fields {cache_field} for user_id: {user_id}")
+    return Response(content, media_type="application/json")
+
+
 @router.get(
     "/profile/{user_id}",
     response_model=ProfileRead,
@@ -268,66 +772,189 @@ async def create_or_update_my_profile(  # noqa: PLR0912, PLR0913, PLR0915 : TODO
 async def get_user_profile(
     request: Request,
     user_id: uuid.UUID,
+    fields: FieldsQuery = None,
     session: AsyncSession = Depends(get_async_session),
-    redis: aioredis.Redis = Depends(get_redis_client),
+    redis: aioredis.Redis | None = Depends(get_redis_client),
 ):
     """Fetches the profile"""
-    cache_key = f"profile:user:{user_id}"
-    cache_ttl_seconds = 60
+    if settings.HOT_PROFILES_ENABLED:
+        hot_profiles.record(str(user_id))
+    projection = _parse_fields(fields)
+    if projection is not None:
+        return await _get_user_profile_projection(request, user_id, projection, session, redis)
+
+    cached_profile = await _read_cached(redis, profile_public_key(user_id), decode_profile_json)
+    if cached_profile:
+        logger.info(f"Cache HIT for profile_id: {user_id}")
+        return Response(cached_profile, media_type="application/json")
+
+    content = await render_public_profile(session, _get_s3_client(request), redis, user_id)
+    if content is None:
+        logger.info(f"Profile not found for post_id: {user_id}")
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
 
-    try:
-        cached_profile = await redis.get(cache_key)
-        if cached_profile:
-            logger.info(f"Cache HIT for profile_id: {user_id}")
-            profile_data = ProfileRead.model_validate_json(cached_profile)
-            return profile_data
-    except aioredis.RedisError as e:
-        logger.error(f"Redis error: {e}")
-    except Exception as e:
-        logger.error(f"Error processing cached data for key '{cache_key}': {e}. Fetching from DB.")
+    logger.info(f"Retrieved profile for user_id: {user_id}")
+    return Response(content, media_type="application/json")
 
-    try:
-        s3: S3Client = request.app.state.s3_client
-    except AttributeError:
-        logger.error("S3Client not found in application state. Check lifespan initialization.")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="S3 storage service is not configured correctly.",
-        )
-    statement = select(Profile).where(Profile.user_id == user_id)
-    result = await session.execute(statement)
-    profile = result.scalar_one_or_none()
 
-    if not profile:
-        logger.info(f"Profile not found for post_id: {user_id}")
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
+async def render_public_profile(
+    session: AsyncSession,
+    s3: S3Client,
+    redis: aioredis.Redis | None,
+    user_id: uuid.UUID,
+) -> bytes | None:
+    """
+    Renders the `GET /profile/{user_id}` body from the database and caches it.
+    Returns None if the profile doesn't exist. Also used to refresh hot profiles.
+    """
+    # Reads the precomputed document instead of hydrating and re-serializing the profile.
+    statement = select(Profile.public_document, Profile.avatar_url).where(
+        Profile.user_id == user_id
+    )
+    result = await session.execute(statement)
+    row = result.one_or_none()
+    if row is None:
+        return None
+
+    document = row.public_document
+    if document is None:
+        # Rows written outside the service have no document until they are rebuilt.
+        result = await session.execute(select(Profile).where(Profile.user_id == user_id))
+        profile = result.scalar_one_or_none()
+        if not profile:
+            return None
+        document = build_public_document(profile)
 
     avatar_url: str | None = None
-    if profile.avatar_url:
-        try:
-            avatar_url = await s3.get_file_url(
-                object_key=profile.avatar_url, expires_in=ICON_URL_EXPIRY_SECONDS
-            )
-            logger.info(f"Successfully generated avatar URL for user {user_id}")
-        except Exception as e:
-            logger.exception(
-                f"Unexpected error generating pre-signed URL for user {user_id},"
-                f" key '{profile.avatar_url}': {e}"
-            )
+    if row.avatar_url:
+        avatar_url = await _presign_avatar(s3, row.avatar_url, user_id)
 
-    profile_read = ProfileRead.model_validate(profile)
-    profile_read.avatar_url = avatar_url
+    content = render_public_document(document, avatar_url)
 
-    try:
-        profile_json_to_cache = profile_read.model_dump_json()
-        await redis.set(cache_key, profile_json_to_cache, ex=cache_ttl_seconds)
-        logger.info(f"Stored profile in cache for user_id: {user_id} with TTL {cache_ttl_seconds}s")
-    except aioredis.RedisError as e:
-        logger.error(
-            f"Redis SET error for key '{cache_key}': {e}. Response served without caching."
+    # Don't pin a degraded response (missing avatar URL) in the cache.
+    if avatar_url or not row.avatar_url:
+        entry = content
+        if not isinstance(profile_codec, JsonProfileCodec):
+            entry = profile_codec.encode(ProfileRead.model_validate_json(content))
+        await _write_cached(redis, profile_public_key(user_id), entry, PROFILE_CACHE_TTL_SECONDS)
+    return content
+
+
+@router.get(
+    "/",
+    response_model=ProfilePage,
+    summary="List profiles",
+    description=(
+        "Lists profiles ordered by creation time using keyset pagination. With"
+        " `format=ndjson` every profile after the cursor is streamed as newline-delimited JSON."
+    ),
+)
+async def list_profiles(  # noqa: PLR0913, PLR0917
+    request: Request,
+    session: AsyncSession = Depends(get_async_session),
+    session_factory: async_sessionmaker[AsyncSession] = Depends(get_session_factory),
+    limit: Annotated[int, Query(ge=1, le=PROFILE_LIST_MAX_LIMIT)] = PROFILE_LIST_DEFAULT_LIMIT,
+    cursor: str | None = None,
+    response_format: Annotated[Literal["json", "ndjson"], Query(alias="format")] = "json",
+    fields: FieldsQuery = None,
+):
+    """Lists profiles page by page, or streams all of them"""
+    s3 = _get_s3_client(request)
+    projection = _parse_fields(fields)
+    if projection is None:
+        statement = select(Profile).options(defer(Profile.public_document))
+    else:
+        # The cursor columns are always loaded, requested or not.
+        statement = _projection_statement(projection, "created_at", "id")
+    statement = statement.order_by(Profile.created_at, Profile.id)
+    if cursor:
+        created_at, profile_id = _decode_cursor(cursor)
+        statement = statement.where(
+            tuple_(Profile.created_at, Profile.id) > tuple_(created_at, profile_id)
         )
-    except Exception as e:
-        logger.error(f"Error serializing profile data for caching key '{cache_key}': {e}")
 
-    logger.info(f"Retrieved profile for user_id: {user_id}")
-    return profile_read
+    if response_format == "ndjson":
+        logger.info("Streaming profiles as NDJSON")
+        return StreamingResponse(
+            _stream_profiles_ndjson(session_factory, s3, statement, projection),
+            media_type="application/x-ndjson",
+        )
+
+    result = await session.execute(statement.limit(limit + 1))
+    profiles = result.all() if projection else result.scalars().all()
+    next_cursor = _encode_cursor(profiles[limit - 1]) if len(profiles) > limit else None
+    profiles = profiles[:limit]
+
+    logger.info(f"Listed {len(profiles)} profiles")
+    if projection:
+        items = await _to_projections(s3, profiles, projection)
+        return Response(
+            to_json({"items": items, "next_cursor": next_cursor}), media_type="application/json"
+        )
+    return ProfilePage(items=await _to_profile_reads(s3, profiles), next_cursor=next_cursor)
+
+
+@router.get(
+    "/search",
+    response_model=list[ProfileRead],
+    summary="Search profiles by display name",
+    description=(
+        "Returns profiles whose display name starts with the query, followed by fuzzy matches."
+    ),
+)
+async def search_profiles(
+    request: Request,
+    q: Annotated[str, Query(min_length=1, max_length=100)],
+    limit: Annotated[int, Query(ge=1, le=SEARCH_MAX_LIMIT)] = SEARCH_DEFAULT_LIMIT,
+    session: AsyncSession = Depends(get_async_session),
+    redis: aioredis.Redis | None = Depends(get_redis_client),
+):
+    """Prefix and fuzzy display name lookup for autocomplete"""
+    query = q.strip().lower()
+    if not query:
+        return []
+
+    cache_key = f"profile:search:{limit}:{query}"
+    cached_results = await _read_cached(redis, cache_key, ProfileReadList.validate_json)
+    if cached_results is not None:
+        logger.info(f"Cache HIT for search query: '{query}'")
+        return cached_results
+
+    s3 = _get_s3_client(request)
+    result = await session.execute(build_search_statement(query, limit))
+    profile_reads = await _to_profile_reads(s3, result.scalars().all())
+
+    await _write_cached(
+        redis, cache_key, ProfileReadList.dump_json(profile_reads), SEARCH_CACHE_TTL_SECONDS
+    )
+    logger.info(f"Found {len(profile_reads)} profiles for search query: '{query}'")
+    return profile_reads
+
+
+@router.get(
+    "/events/cursor",
+    response_model=ProfileEventCursor,
+    summary="Get the profile event stream cursor",
+    description=(
+        "Returns the ID of the newest entry in the profile change stream. Take it before a"
+        " backfill with `format=ndjson`, then read the stream from it to catch up."
+    ),
+)
+async def get_profile_event_cursor(
+    redis: aioredis.Redis | None = Depends(get_redis_client),
+):
+    """Starting point for consumers of the profile change stream"""
+    if redis is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Profile event stream is unavailable.",
+        )
+    try:
+        last_id = await redis_breaker.call(latest_event_id, redis)
+    except (CircuitOpenError, aioredis.RedisError, TimeoutError) as e:
+        logger.error(f"Could not read profile event stream cursor: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Profile event stream is unavailable.",
+        )
+    return ProfileEventCursor(stream=settings.PROFILE_EVENTS_STREAM, last_id=last_id)
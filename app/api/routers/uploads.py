@@ -0,0 +1,285 @@
+import asyncio
+import logging
+import uuid
+from typing import Annotated
+
+import redis.asyncio as aioredis
+from auth_lib.auth import CurrentUserUUID
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, status
+from fastapi.responses import Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.avatar_uploads import (
+    AvatarUpload,
+    AvatarUploadStore,
+    UploadBusyError,
+    UploadIncompleteError,
+    UploadOffsetMismatchError,
+)
+from app.core.circuit_breaker import CircuitOpenError
+from app.core.config import settings
+from app.core.database import get_async_session
+from app.core.placeholders import build_avatar_placeholder
+from app.core.redis_client import get_redis_client
+from app.core.s3_client import S3Client
+from app.schemas.profile import AvatarUploadCreate, AvatarUploadRead, ProfileRead
+
+from .endpoints import (
+    USER_ICON_PREFIX,
+    _avatar_update,
+    _enforce_write_rate_limits,
+    _get_s3_client,
+    _presign_avatar,
+    _save_profile_update,
+)
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+# Failures of S3 or of Redis, which holds the uploads' state, answered with 503.
+UNAVAILABLE_ERRORS = (CircuitOpenError, aioredis.RedisError, TimeoutError)
+
+
+def _get_upload_store(request: Request) -> AvatarUploadStore:
+    store = getattr(request.app.state, "avatar_upload_store", None)
+    if store is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Resumable uploads are temporarily unavailable.",
+        )
+    return store
+
+
+UploadStore = Annotated[AvatarUploadStore, Depends(_get_upload_store)]
+
+
+def _read_upload(upload: AvatarUpload) -> AvatarUploadRead:
+    return AvatarUploadRead.model_validate(upload, from_attributes=True)
+
+
+def _progress_headers(upload: AvatarUpload) -> dict[str, str]:
+    return {"Upload-Offset": str(upload.offset), "Upload-Length": str(upload.length)}
+
+
+async def _get_own_upload(
+    store: AvatarUploadStore, upload_id: str, user_id: uuid.UUID
+) -> AvatarUpload:
+    try:
+        upload = await store.get(upload_id)
+    except UNAVAILABLE_ERRORS as e:
+        raise _storage_unavailable(user_id, e)
+    if upload is None or upload.user_id != user_id:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Upload not found")
+    return upload
+
+
+async def _read_chunk(request: Request) -> bytes:
+    """Reads the request body, refusing it as soon as it exceeds the chunk limit."""
+    chunk = bytearray()
+    async for data in request.stream():
+        chunk += data
+        if len(chunk) > settings.AVATAR_UPLOADS_MAX_CHUNK_BYTES:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"Chunks are limited to {settings.AVATAR_UPLOADS_MAX_CHUNK_BYTES} bytes.",
+            )
+    return bytes(chunk)
+
+
+async def _render_placeholder(s3: S3Client, upload: AvatarUpload) -> str | None:
+    """
+    Builds the placeholder from the stored object; a failure only costs the placeholder.
+
+    The parts were never held together, so the object is read back, but only up to
+    `AVATAR_UPLOADS_PLACEHOLDER_MAX_BYTES`: larger uploads get no placeholder.
+    """
+    max_bytes = settings.AVATAR_UPLOADS_PLACEHOLDER_MAX_BYTES
+    if upload.length > max_bytes:
+        return None
+    try:
+        async with s3.open_object(
+            upload.object_key, byte_range=f"bytes=0-{max_bytes - 1}"
+        ) as s3_object:
+            contents = await s3_object["Body"].read()
+    except Exception as e:
+        logger.warning(f"Could not read {upload.object_key} back for its placeholder: {e}")
+        return None
+    return await asyncio.to_thread(build_avatar_placeholder, contents)
+
+
+def _storage_unavailable(user_id: uuid.UUID, error: Exception) -> HTTPException:
+    logger.warning(f"Rejecting avatar upload for user {user_id}, storage unavailable: {error!r}")
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Avatar storage is temporarily unavailable.",
+    )
+
+
+def _upload_busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail="Another request is writing to this upload.",
+    )
+
+
+@router.post(
+    "/me/uploads",
+    response_model=AvatarUploadRead,
+    status_code=status.HTTP_201_CREATED,
+    summary="Start a resumable avatar upload",
+    description=(
+        "Starts an upload of `length` bytes. Send the avatar in chunks with `PATCH` to the"
+        " returned `Location`, then finalize it with `POST {Location}/complete`."
+    ),
+)
+async def create_avatar_upload(  # noqa: PLR0913, PLR0917
+    request: Request,
+    response: Response,
+    user_id: CurrentUserUUID,
+    store: UploadStore,
+    upload: AvatarUploadCreate,
+    redis: aioredis.Redis | None = Depends(get_redis_client),
+):
+    await _enforce_write_rate_limits(request, response, redis, user_id, with_avatar=True)
+    if upload.length > settings.AVATAR_UPLOADS_MAX_BYTES:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Avatars are limited to {settings.AVATAR_UPLOADS_MAX_BYTES} bytes.",
+        )
+    try:
+        created = await store.create(
+            user_id, upload.length, upload.content_type, USER_ICON_PREFIX, upload.filename
+        )
+    except UNAVAILABLE_ERRORS as e:
+        raise _storage_unavailable(user_id, e)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Could not determine file type for upload: {e}",
+        )
+    response.headers["Location"] = str(request.url_for("get_avatar_upload", upload_id=created.id))
+    response.headers.update(_progress_headers(created))
+    return _read_upload(created)
+
+
+@router.get(
+    "/me/uploads/{upload_id}",
+    response_model=AvatarUploadRead,
+    summary="Get the progress of an avatar upload",
+    description="Reports how many bytes arrived; a resumed upload continues at `offset`.",
+)
+async def get_avatar_upload(
+    upload_id: str, response: Response, user_id: CurrentUserUUID, store: UploadStore
+):
+    upload = await _get_own_upload(store, upload_id, user_id)
+    response.headers.update(_progress_headers(upload))
+    return _read_upload(upload)
+
+
+@router.patch(
+    "/me/uploads/{upload_id}",
+    status_code=status.HTTP_204_NO_CONTENT,
+    summary="Upload a chunk of an avatar",
+    description=(
+        "Appends the raw request body at `Upload-Offset`, which must equal the upload's current"
+        " offset. A mismatch is answered with `409` and the current `Upload-Offset`."
+    ),
+)
+async def upload_avatar_chunk(
+    request: Request,
+    upload_id: str,
+    user_id: CurrentUserUUID,
+    store: UploadStore,
+    upload_offset: Annotated[int, Header(ge=0)],
+):
+    upload = await _get_own_upload(store, upload_id, user_id)
+    chunk = await _read_chunk(request)
+    try:
+        upload = await store.append(upload, upload_offset, chunk)
+    except UploadOffsetMismatchError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e),
+            headers={"Upload-Offset": str(e.offset)},
+        )
+    except UploadBusyError:
+        raise _upload_busy()
+    except LookupError:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Upload not found")
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except UNAVAILABLE_ERRORS as e:
+        raise _storage_unavailable(user_id, e)
+    except Exception as e:
+        logger.error(f"Storing a chunk of upload {upload_id} failed: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Could not store the chunk, retry it.",
+        )
+    return Response(status_code=status.HTTP_204_NO_CONTENT, headers=_progress_headers(upload))
+
+
+@router.post(
+    "/me/uploads/{upload_id}/complete",
+    response_model=ProfileRead,
+    summary="Finalize an avatar upload",
+    description="Makes the completed upload the user's avatar and returns the updated profile.",
+)
+async def complete_avatar_upload(  # noqa: PLR0913, PLR0917
+    request: Request,
+    upload_id: str,
+    user_id: CurrentUserUUID,
+    store: UploadStore,
+    session: AsyncSession = Depends(get_async_session),
+    redis: aioredis.Redis | None = Depends(get_redis_client),
+):
+    s3 = _get_s3_client(request)
+    upload = await _get_own_upload(store, upload_id, user_id)
+    try:
+        upload = await store.assemble(upload)
+    except UploadIncompleteError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"The upload is incomplete: {e}",
+            headers=_progress_headers(upload),
+        )
+    except UploadBusyError:
+        raise _upload_busy()
+    except UNAVAILABLE_ERRORS as e:
+        raise _storage_unavailable(user_id, e)
+    except Exception as e:
+        logger.error(f"Assembling upload {upload_id} failed: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Could not finalize the upload, retry it.",
+        )
+
+    avatar_placeholder = await _render_placeholder(s3, upload)
+    profile = await _save_profile_update(
+        session, redis, user_id, _avatar_update(upload.object_key, avatar_placeholder)
+    )
+    try:
+        await store.delete(upload)
+    except Exception as e:
+        # Its keys expire on their own.
+        logger.warning(f"Could not delete finalized upload {upload_id}: {e}")
+
+    response_data = ProfileRead.model_validate(profile).model_dump()
+    response_data["avatar_url"] = await _presign_avatar(s3, upload.object_key, user_id)
+    logger.info(f"Avatar upload {upload_id} finalized for user_id: {user_id}")
+    return response_data
+
+
+@router.delete(
+    "/me/uploads/{upload_id}",
+    status_code=status.HTTP_204_NO_CONTENT,
+    summary="Cancel an avatar upload",
+)
+async def cancel_avatar_upload(upload_id: str, user_id: CurrentUserUUID, store: UploadStore):
+    upload = await _get_own_upload(store, upload_id, user_id)
+    try:
+        await store.delete(upload)
+    except UploadBusyError:
+        raise _upload_busy()
+    except UNAVAILABLE_ERRORS as e:
+        raise _storage_unavailable(user_id, e)
@@ -0,0 +1,396 @@
+"""
+Bulk profile import/export and maintenance.
+
+    python -m app.cli profiles export --output profiles.csv
+    python -m app.cli profiles import --input legacy.ndjson --upload-workers 16
+    python -m app.cli profiles rebuild-documents
+    python -m app.cli avatars work
+
+Import and export work in bounded batches through asyncpg COPY and write a checkpoint after
+every committed batch, so an interrupted run resumes where it stopped when restarted with
+the same arguments.
+"""
+
+import argparse
+import asyncio
+import csv
+import io
+import json
+import logging
+import mimetypes
+import os
+import uuid
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+import asyncpg
+import redis.asyncio as aioredis
+
+from app.core.avatar_jobs import create_avatar_job_worker
+from app.core.cache_invalidation import invalidate_profiles
+from app.core.config import settings
+from app.core.database import get_asyncpg_dsn
+from app.core.ids import uuid7
+from app.core.redis_client import create_redis_client
+from app.core.s3_client import S3Client, create_s3_client
+from app.models.profile import ProfileBase
+from app.schemas.profile import build_public_document
+
+logger = logging.getLogger(__name__)
+
+USER_ICON_PREFIX = "icons/"
+EXPORT_COLUMNS = ["id", "user_id", "display_name", "bio", "avatar_url", "created_at", "updated_at"]
+IMPORT_COLUMNS = ["id", "user_id", "display_name", "bio", "avatar_url", "row_index"]
+UPLOAD_ATTEMPTS = 3
+
+
+@dataclass
+class Checkpoint:
+    """Progress of an import or export run, persisted after every batch."""
+
+    path: Path | None
+    processed: int = 0
+    last_key: list[str] | None = None
+    failed_rows: list[int] = field(default_factory=list)
+
+    @classmethod
+    def load(cls, path: Path | None) -> "Checkpoint":
+        if path is None or not path.exists():
+            return cls(path=path)
+        data = json.loads(path.read_text())
+        return cls(path=path, **data)
+
+    def save(self) -> None:
+        if self.path is None:
+            return
+        tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        data = {
+            "processed": self.processed,
+            "last_key": self.last_key,
+            "failed_rows": self.failed_rows,
+        }
+        tmp_path.write_text(json.dumps(data))
+        os.replace(tmp_path, self.path)
+
+
+def _detect_format(path: Path, requested: str | None) -> str:
+    if requested:
+        return requested
+    return "csv" if path.suffix.lower() == ".csv" else "ndjson"
+
+
+def read_rows(path: Path, file_format: str, skip: int = 0) -> Iterator[dict[str, Any]]:
+    """Yields input rows as dicts, skipping the first `skip` already-imported rows."""
+    with path.open(newline="", encoding="utf-8") as source:
+        if file_format == "csv":
+            rows: Iterator[dict[str, Any]] = csv.DictReader(source)
+        else:
+            rows = (json.loads(line) for line in source if line.strip())
+        for index, row in enumerate(rows):
+            if index >= skip:
+                yield row
+
+
+def batched(rows: Iterator[dict[str, Any]], batch_size: int) -> Iterator[list[dict[str, Any]]]:
+    batch: list[dict[str, Any]] = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+async def _upload_avatar(s3: S3Client, avatar_file: Path) -> str:
+    """Uploads a local avatar file with retries and returns its object key."""
+    contents = await asyncio.to_thread(avatar_file.read_bytes)
+    content_type = mimetypes.guess_type(avatar_file.name)[0] or "application/octet-stream"
+    attempt = 1
+    while True:
+        try:
+            file_uuid, extension = await s3.upload_file(
+                file_content=contents,
+                content_type=content_type,
+                prefix=USER_ICON_PREFIX,
+                original_filename=avatar_file.name,
+            )
+            return f"{USER_ICON_PREFIX}{file_uuid}{extension}"
+        except ValueError:
+            raise
+        except Exception as e:
+            if attempt >= UPLOAD_ATTEMPTS:
+                raise
+            logger.warning(f"Upload of {avatar_file} failed (attempt {attempt}): {e}")
+            await asyncio.sleep(2**attempt)
+            attempt += 1
+
+
+async def _prepare_records(
+    batch: list[dict[str, Any]], first_row: int, s3: S3Client, upload_workers: int
+) -> tuple[list[tuple], list[int]]:
+    """Validates rows and uploads avatars concurrently. Returns COPY records and failed rows."""
+    semaphore = asyncio.Semaphore(upload_workers)
+
+    async def prepare(row: dict[str, Any], row_index: int) -> tuple:
+        # Checked per row: one value over a column's length would make Postgres reject the
+        # whole COPY, and the batch would fail again on every resume.
+        fields = ProfileBase.model_validate(
+            {
+                "display_name": row.get("display_name") or None,
+                "bio": row.get("bio") or None,
+                "avatar_url": row.get("avatar_url") or None,
+            }
+        )
+        avatar_url = fields.avatar_url
+        if row.get("avatar_file"):
+            async with semaphore:
+                avatar_url = await _upload_avatar(s3, Path(row["avatar_file"]))
+        return (
+            uuid7(),
+            uuid.UUID(str(row["user_id"])),
+            fields.display_name,
+            fields.bio,
+            avatar_url,
+            row_index,
+        )
+
+    results = await asyncio.gather(
+        *(prepare(row, first_row + offset) for offset, row in enumerate(batch)),
+        return_exceptions=True,
+    )
+    records: list[tuple] = []
+    failed_rows: list[int] = []
+    for offset, result in enumerate(results):
+        if isinstance(result, Exception):
+            logger.error(f"Skipping input row {first_row + offset}: {result}")
+            failed_rows.append(first_row + offset)
+        else:
+            records.append(result)
+    return records, failed_rows
+
+
+async def _upsert_batch(conn: asyncpg.Connection, records: list[tuple]) -> list[uuid.UUID]:
+    """COPYs records into a staging table and upserts them into `profile`."""
+    async with conn.transaction():
+        await conn.execute(
+            """
+            CREATE TEMP TABLE profile_import (
+                id uuid, user_id uuid, display_name varchar(100), bio varchar(500),
+                avatar_url varchar(255), row_index bigint
+            ) ON COMMIT DROP
+            """
+        )
+        await conn.copy_records_to_table("profile_import", records=records, columns=IMPORT_COLUMNS)
+        rows = await conn.fetch(
+            """
+            INSERT INTO profile (id, user_id, display_name, bio, avatar_url, created_at, updated_at)
+            SELECT DISTINCT ON (user_id) id, user_id, display_name, bio, avatar_url, now(), now()
+            FROM profile_import
+            -- A user listed more than once gets the last of their rows in the file.
+            ORDER BY user_id, row_index DESC
+            ON CONFLICT (user_id) DO UPDATE SET
+                display_name = COALESCE(EXCLUDED.display_name, profile.display_name),
+                bio = COALESCE(EXCLUDED.bio, profile.bio),
+                avatar_url = COALESCE(EXCLUDED.avatar_url, profile.avatar_url),
+                -- The placeholder belongs to the previous avatar.
+                avatar_placeholder = CASE
+                    WHEN EXCLUDED.avatar_url IS DISTINCT FROM profile.avatar_url
+                        AND EXCLUDED.avatar_url IS NOT NULL THEN NULL
+                    ELSE profile.avatar_placeholder
+                END,
+                updated_at = now()
+            RETURNING user_id
+            """
+        )
+    return [row["user_id"] for row in rows]
+
+
+async def import_profiles(args: argparse.Namespace) -> None:
+    input_path = Path(args.input)
+    file_format = _detect_format(input_path, args.format)
+    checkpoint = Checkpoint.load(Path(args.checkpoint) if args.checkpoint else None)
+    if checkpoint.processed:
+        logger.info(f"Resuming import after {checkpoint.processed} rows")
+
+    s3 = create_s3_client()
+    await s3.connect()
+    redis = create_redis_client()
+    conn = await asyncpg.connect(get_asyncpg_dsn())
+    try:
+        rows = read_rows(input_path, file_format, skip=checkpoint.processed)
+        for batch in batched(rows, args.batch_size):
+            records, failed_rows = await _prepare_records(
+                batch, checkpoint.processed, s3, args.upload_workers
+            )
+            user_ids = await _upsert_batch(conn, records) if records else []
+            try:
+                await invalidate_profiles(redis, user_ids)
+            except aioredis.RedisError as e:
+                logger.error(f"Cache invalidation failed for batch: {e}")
+
+            checkpoint.processed += len(batch)
+            checkpoint.failed_rows.extend(failed_rows)
+            checkpoint.save()
+            logger.info(f"Imported {checkpoint.processed} rows ({len(failed_rows)} failed)")
+    finally:
+        await conn.close()
+        await redis.close()
+        await s3.close()
+
+    if checkpoint.failed_rows:
+        logger.warning(f"Rows that failed to import: {checkpoint.failed_rows}")
+
+
+async def export_profiles(args: argparse.Namespace) -> None:
+    output_path = Path(args.output)
+    file_format = _detect_format(output_path, args.format)
+    checkpoint = Checkpoint.load(Path(args.checkpoint) if args.checkpoint else None)
+    resuming = checkpoint.last_key is not None
+    if resuming:
+        logger.info(f"Resuming export after {checkpoint.processed} rows")
+
+    columns = ", ".join(EXPORT_COLUMNS)
+    first_batch_query = f"SELECT {columns} FROM profile ORDER BY created_at, id LIMIT $1"
+    next_batch_query = (
+        f"SELECT {columns} FROM profile"
+        " WHERE (created_at, id) > ($2::text::timestamptz, $3::text::uuid)"
+        " ORDER BY created_at, id LIMIT $1"
+    )
+
+    conn = await asyncpg.connect(get_asyncpg_dsn())
+    try:
+        with output_path.open("a" if resuming else "w", newline="", encoding="utf-8") as output:
+            if file_format == "csv" and not resuming:
+                csv.writer(output).writerow(EXPORT_COLUMNS)
+            while True:
+                buffer = io.BytesIO()
+                if checkpoint.last_key is None:
+                    await conn.copy_from_query(
+                        first_batch_query, args.batch_size, output=buffer, format="csv"
+                    )
+                else:
+                    await conn.copy_from_query(
+                        next_batch_query,
+                        args.batch_size,
+                        *checkpoint.last_key,
+                        output=buffer,
+                        format="csv",
+                    )
+                batch = list(csv.reader(io.StringIO(buffer.getvalue().decode("utf-8"))))
+                if not batch:
+                    break
+
+                if file_format == "csv":
+                    csv.writer(output).writerows(batch)
+                else:
+                    for row in batch:
+                        record = {key: value or None for key, value in zip(EXPORT_COLUMNS, row)}
+                        output.write(json.dumps(record) + "\n")
+                output.flush()
+
+                last_row = dict(zip(EXPORT_COLUMNS, batch[-1]))
+                checkpoint.last_key = [last_row["created_at"], last_row["id"]]
+                checkpoint.processed += len(batch)
+                checkpoint.save()
+                logger.info(f"Exported {checkpoint.processed} rows")
+    finally:
+        await conn.close()
+
+
+async def rebuild_documents(args: argparse.Namespace) -> None:
+    """Builds the public document of every profile that doesn't have one, in id order."""
+    columns = ", ".join([*EXPORT_COLUMNS, "avatar_placeholder"])
+    query = (
+        f"SELECT {columns} FROM profile"
+        " WHERE public_document IS NULL AND id > $2 ORDER BY id LIMIT $1"
+    )
+    # A row changed since it was read keeps its state; its writer already handled it.
+    update = (
+        "UPDATE profile SET public_document = $3"
+        " WHERE id = $1 AND updated_at = $2 AND public_document IS NULL"
+    )
+    last_id = uuid.UUID(int=0)
+    rebuilt = 0
+    conn = await asyncpg.connect(get_asyncpg_dsn())
+    try:
+        while rows := await conn.fetch(query, args.batch_size, last_id):
+            documents = [
+                (row["id"], row["updated_at"], build_public_document(dict(row))) for row in rows
+            ]
+            await conn.executemany(update, documents)
+            last_id = rows[-1]["id"]
+            rebuilt += len(rows)
+            logger.info(f"Rebuilt {rebuilt} profile documents")
+    finally:
+        await conn.close()
+
+
+async def work_avatar_jobs(args: argparse.Namespace) -> None:
+    """Processes avatar jobs queued by `PUT /profiles/me` until interrupted."""
+    # Imported here: the API module pulls in FastAPI, which the other commands don't need.
+    from app.api.routers.endpoints import avatar_job_processor  # noqa: PLC0415
+
+    redis = create_redis_client()
+    # Reading jobs blocks longer than the socket timeout of the client used for the rest.
+    queue_redis = create_redis_client(block=settings.AVATAR_JOBS_BLOCK_SECONDS)
+    s3 = create_s3_client()
+    await s3.connect()
+    worker = create_avatar_job_worker(queue_redis, avatar_job_processor(s3, redis))
+    try:
+        await worker.run()
+    finally:
+        await s3.close()
+        await queue_redis.close()
+        await redis.close()
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m app.cli",
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    commands = parser.add_subparsers(dest="resource", required=True)
+    profiles = commands.add_parser("profiles", help="Bulk profile operations")
+    actions = profiles.add_subparsers(dest="action", required=True)
+
+    import_parser = actions.add_parser("import", help="Import profiles from CSV or NDJSON")
+    import_parser.add_argument("--input", required=True)
+    import_parser.add_argument("--upload-workers", type=int, default=8)
+    import_parser.set_defaults(handler=import_profiles)
+
+    export_parser = actions.add_parser("export", help="Export profiles to CSV or NDJSON")
+    export_parser.add_argument("--output", required=True)
+    export_parser.set_defaults(handler=export_profiles)
+
+    for action_parser in (import_parser, export_parser):
+        action_parser.add_argument("--format", choices=["csv", "ndjson"])
+        action_parser.add_argument("--batch-size", type=int, default=5000)
+        action_parser.add_argument("--checkpoint", help="Progress file used to resume a run")
+
+    rebuild_parser = actions.add_parser(
+        "rebuild-documents", help="Build missing precomputed public profile documents"
+    )
+    rebuild_parser.add_argument("--batch-size", type=int, default=5000)
+    rebuild_parser.set_defaults(handler=rebuild_documents)
+
+    avatars = commands.add_parser("avatars", help="Avatar processing")
+    avatar_actions = avatars.add_subparsers(dest="action", required=True)
+    work_parser = avatar_actions.add_parser(
+        "work", help="Process queued avatar uploads (AVATAR_JOBS_* settings apply)"
+    )
+    work_parser.set_defaults(handler=work_avatar_jobs)
+    return parser
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(args.handler(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+METADATA_SUFFIX = ".json"
+PARTIAL_PREFIX = ".partial-"
+# Partial files this old belong to a worker that died while filling them.
+STALE_PARTIAL_SECONDS = 3600
+# Evicting down to this share of the budget leaves room for new entries before the next scan.
+EVICTION_LOW_WATERMARK = 0.9
+
+
+@dataclass(frozen=True)
+class AvatarMetadata:
+    content_type: str
+    etag: str
+    last_modified: str
+
+
+@dataclass(frozen=True)
+class CachedAvatar:
+    path: Path
+    size: int
+    metadata: AvatarMetadata
+
+
+class AvatarCacheWriter:
+    """Fills a temporary file that only becomes visible to readers once committed."""
+
+    def __init__(self, cache: "AvatarDiskCache", object_key: str, metadata: AvatarMetadata):
+        self.cache = cache
+        self.object_key = object_key
+        self.metadata = metadata
+        self.size = 0
+        fd, name = tempfile.mkstemp(dir=cache.directory, prefix=PARTIAL_PREFIX)
+        self._file = os.fdopen(fd, "wb")
+        self._path = Path(name)
+
+    def write(self, chunk: bytes) -> None:
+        self._file.write(chunk)
+        self.size += len(chunk)
+
+    def commit(self) -> None:
+        self._file.close()
+        data_path, metadata_path = self.cache.paths(self.object_key)
+        metadata_path.write_text(json.dumps(asdict(self.metadata)))
+        # The data file is renamed last: a reader that finds it also finds its metadata.
+        os.replace(self._path, data_path)
+        self.cache.added(self.size)
+
+    def abort(self) -> None:
+        if not self._file.closed:
+            self._file.close()
+        self._path.unlink(missing_ok=True)
+
+
+class AvatarDiskCache:
+    """
+    Size-bounded LRU cache of avatar objects on the local disk, shared by all workers.
+
+    Entries are named after a hash of the object key; avatar keys are never reused, so an
+    entry never goes stale. A hit refreshes the file's mtime, and once the running total passes
+    `max_bytes` the least recently used entries are deleted. Each worker counts only its own
+    writes between scans, so the directory can briefly exceed the budget.
+    """
+
+    def __init__(self, directory: str | Path, max_bytes: int):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._remove_stale_partials()
+        self._size = self._scan()[1]
+
+    def paths(self, object_key: str) -> tuple[Path, Path]:
+        digest = hashlib.sha256(object_key.encode()).hexdigest()
+        return self.directory / digest, self.directory / f"{digest}{METADATA_SUFFIX}"
+
+    def get(self, object_key: str) -> CachedAvatar | None:
+        data_path, metadata_path = self.paths(object_key)
+        try:
+            size = data_path.stat().st_size
+            metadata = AvatarMetadata(**json.loads(metadata_path.read_text()))
+            os.utime(data_path)
+        except (OSError, ValueError, TypeError):
+            return None
+        return CachedAvatar(data_path, size, metadata)
+
+    def open_writer(self, object_key: str, metadata: AvatarMetadata) -> AvatarCacheWriter:
+        return AvatarCacheWriter(self, object_key, metadata)
+
+    def added(self, size: int) -> None:
+        self._size += size
+        if self._size > self.max_bytes:
+            self.evict()
+
+    def evict(self) -> None:
+        entries, total = self._scan()
+        target = self.max_bytes * EVICTION_LOW_WATERMARK
+        evicted = 0
+        for _mtime, size, data_path in sorted(entries):
+            if total <= target:
+                break
+            # Another worker may have evicted the same entry already.
+            data_path.unlink(missing_ok=True)
+            data_path.with_name(data_path.name + METADATA_SUFFIX).unlink(missing_ok=True)
+            total -= size
+            evicted += 1
+        self._size = total
+        logger.info(f"Evicted {evicted} avatars from the disk cache, {total} bytes remain")
+
+    def _remove_stale_partials(self) -> None:
+        cutoff = time.time() - STALE_PARTIAL_SECONDS
+        for partial in self.directory.glob(f"{PARTIAL_PREFIX}*"):
+            try:
+                if partial.stat().st_mtime < cutoff:
+                    partial.unlink()
+            except FileNotFoundError:
+                continue
+
+    def _scan(self) -> tuple[list[tuple[float, int, Path]], int]:
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.startswith(".") or entry.name.endswith(METADATA_SUFFIX):
+                continue
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, Path(entry.path)))
+        return entries, sum(size for _mtime, size, _path in entries)
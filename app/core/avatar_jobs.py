@@ -0,0 +1,287 @@
+import asyncio
+import datetime
+import logging
+import os
+import socket
+import uuid
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from typing import Literal
+
+import redis.asyncio as aioredis
+from redis.asyncio.cluster import RedisCluster
+from redis.exceptions import ResponseError
+
+from .config import settings
+from .ids import uuid7
+
+logger = logging.getLogger(__name__)
+
+JOB_ID_FIELD = b"job_id"
+# Seconds to wait before reading again after the queue itself failed, e.g. Redis went away.
+ERROR_BACKOFF_SECONDS = 1.0
+
+AvatarJobStatus = Literal["queued", "processing", "succeeded", "failed"]
+FINISHED_STATUSES = ("succeeded", "failed")
+
+
+class AvatarJobFailedError(Exception):
+    """Raised by job processing for uploads that can never succeed, e.g. of an unknown type."""
+
+
+def avatar_job_key(job_id: str) -> str:
+    # The hash tag keeps a job and its staged upload in one cluster slot.
+    return f"avatar:job:{{{job_id}}}"
+
+
+def avatar_job_contents_key(job_id: str) -> str:
+    return f"{avatar_job_key(job_id)}:upload"
+
+
+def _now() -> str:
+    return datetime.datetime.now(datetime.UTC).isoformat()
+
+
+@dataclass(frozen=True)
+class AvatarJob:
+    id: str
+    user_id: uuid.UUID
+    status: AvatarJobStatus
+    content_type: str | None
+    filename: str | None
+    attempts: int
+    error: str | None
+    created_at: datetime.datetime
+    updated_at: datetime.datetime
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED_STATUSES
+
+    @classmethod
+    def from_hash(cls, job_id: str, fields: dict[bytes, bytes]) -> "AvatarJob":
+        values = {key.decode(): value.decode() for key, value in fields.items()}
+        return cls(
+            id=job_id,
+            user_id=uuid.UUID(values["user_id"]),
+            status=values["status"],
+            content_type=values.get("content_type") or None,
+            filename=values.get("filename") or None,
+            attempts=int(values.get("attempts", 0)),
+            error=values.get("error") or None,
+            created_at=datetime.datetime.fromisoformat(values["created_at"]),
+            updated_at=datetime.datetime.fromisoformat(values["updated_at"]),
+        )
+
+
+async def enqueue_avatar_job(
+    redis: aioredis.Redis | RedisCluster,
+    user_id: uuid.UUID,
+    contents: bytes,
+    content_type: str | None,
+    filename: str | None,
+) -> AvatarJob:
+    """Stages the upload in Redis and queues a job to store it; both expire with the job."""
+    job = AvatarJob(
+        id=str(uuid7()),
+        user_id=user_id,
+        status="queued",
+        content_type=content_type,
+        filename=filename,
+        attempts=0,
+        error=None,
+        created_at=(now := datetime.datetime.now(datetime.UTC)),
+        updated_at=now,
+    )
+    job_id = job.id
+    ttl = settings.AVATAR_JOBS_TTL_SECONDS
+    fields = {
+        "user_id": str(user_id),
+        "status": job.status,
+        "content_type": content_type or "",
+        "filename": filename or "",
+        "attempts": 0,
+        "created_at": now.isoformat(),
+        "updated_at": now.isoformat(),
+    }
+    async with redis.pipeline(transaction=False) as pipe:
+        pipe.set(avatar_job_contents_key(job_id), contents, ex=ttl)
+        pipe.hset(avatar_job_key(job_id), mapping=fields)
+        pipe.expire(avatar_job_key(job_id), ttl)
+        pipe.xadd(
+            settings.AVATAR_JOBS_STREAM,
+            {JOB_ID_FIELD: job_id},
+            maxlen=settings.AVATAR_JOBS_MAXLEN,
+            approximate=True,
+        )
+        await pipe.execute()
+    logger.info(f"Queued avatar job {job_id} for user {user_id}")
+    return job
+
+
+async def get_avatar_job(redis: aioredis.Redis | RedisCluster, job_id: str) -> AvatarJob | None:
+    fields = await redis.hgetall(avatar_job_key(job_id))
+    return AvatarJob.from_hash(job_id, fields) if fields else None
+
+
+class AvatarJobWorker:
+    """
+    Processes queued avatar jobs from a Redis stream consumer group.
+
+    Any number of workers, in the API processes or standalone (`python -m app.cli avatars
+    work`), share the group and each job is delivered to one of them. `process` stores the
+    staged upload; an `AvatarJobFailedError` fails the job at once, while any other error leaves
+    it pending, and after `retry_after` seconds a worker claims it again, up to `max_attempts`
+    times. Jobs of a worker that died mid-way are picked up the same way.
+
+    Reads block for up to `block` seconds, so `redis` must be a client whose socket timeout
+    allows for that, from `create_redis_client(block=...)`.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        redis: aioredis.Redis | RedisCluster,
+        process: Callable[[AvatarJob, bytes], Awaitable[None]],
+        *,
+        stream: str = "avatar:jobs",
+        group: str = "avatar-workers",
+        consumer: str | None = None,
+        concurrency: int = 4,
+        max_attempts: int = 3,
+        retry_after: float = 30.0,
+        block: float = 5.0,
+    ):
+        self.redis = redis
+        self.process = process
+        self.stream = stream
+        self.group = group
+        self.consumer = consumer or f"{socket.gethostname()}:{os.getpid()}"
+        self.concurrency = concurrency
+        self.max_attempts = max_attempts
+        self.retry_after = retry_after
+        self.block = block
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self.run(), name="avatar-job-worker")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def ensure_group(self) -> None:
+        try:
+            await self.redis.xgroup_create(self.stream, self.group, id="0", mkstream=True)
+        except ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+
+    async def _set_status(self, job_id: str, status: AvatarJobStatus, error: str | None = None):
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.hset(
+                avatar_job_key(job_id),
+                mapping={"status": status, "error": error or "", "updated_at": _now()},
+            )
+            if status in FINISHED_STATUSES:
+                pipe.delete(avatar_job_contents_key(job_id))
+            await pipe.execute()
+
+    async def handle(self, job_id: str) -> bool:
+        """Runs one delivery of a job; returns whether it is done with and can be acknowledged."""
+        job = await get_avatar_job(self.redis, job_id)
+        if job is None or job.finished:
+            # Expired, or a redelivery of a job that another worker finished.
+            return True
+        attempts = await self.redis.hincrby(avatar_job_key(job_id), "attempts", 1)
+        contents = await self.redis.get(avatar_job_contents_key(job_id))
+        if contents is None:
+            await self._set_status(job_id, "failed", "The staged upload expired")
+            return True
+        await self._set_status(job_id, "processing")
+        try:
+            await self.process(job, contents)
+        except AvatarJobFailedError as e:
+            logger.warning(f"Avatar job {job_id} failed: {e}")
+            await self._set_status(job_id, "failed", str(e))
+            return True
+        except Exception as e:
+            if attempts >= self.max_attempts:
+                logger.error(f"Avatar job {job_id} failed after {attempts} attempts: {e}")
+                await self._set_status(job_id, "failed", "Could not process the upload")
+                return True
+            logger.warning(f"Avatar job {job_id} attempt {attempts} failed, will retry: {e}")
+            await self._set_status(job_id, "queued")
+            return False
+        await self._set_status(job_id, "succeeded")
+        logger.info(f"Avatar job {job_id} succeeded for user {job.user_id}")
+        return True
+
+    async def _handle_entry(self, entry_id: bytes, fields: dict[bytes, bytes] | None) -> None:
+        # Entries trimmed from the stream while pending come back without fields.
+        done = fields is None or await self.handle(fields[JOB_ID_FIELD].decode())
+        if done:
+            await self.redis.xack(self.stream, self.group, entry_id)
+
+    async def _read(self) -> list[tuple[bytes, dict[bytes, bytes] | None]]:
+        """Claims jobs left unfinished for `retry_after` seconds, otherwise waits for new ones."""
+        _next_id, entries, *_deleted = await self.redis.xautoclaim(
+            self.stream,
+            self.group,
+            self.consumer,
+            min_idle_time=int(self.retry_after * 1000),
+            count=self.concurrency,
+        )
+        if entries:
+            return entries
+        response = await self.redis.xreadgroup(
+            self.group,
+            self.consumer,
+            {self.stream: ">"},
+            count=self.concurrency,
+            block=int(self.block * 1000),
+        )
+        return [entry for _stream, stream_entries in response for entry in stream_entries]
+
+    async def run_once(self) -> int:
+        """Processes up to `concurrency` jobs concurrently and returns how many were read."""
+        entries = await self._read()
+        results = await asyncio.gather(
+            *(self._handle_entry(entry_id, fields) for entry_id, fields in entries),
+            return_exceptions=True,
+        )
+        for (entry_id, _fields), result in zip(entries, results):
+            if isinstance(result, Exception):
+                logger.error(f"Handling avatar job entry {entry_id!r} failed: {result}")
+        return len(entries)
+
+    async def run(self) -> None:
+        while True:
+            try:
+                await self.ensure_group()
+                while True:
+                    await self.run_once()
+            except Exception as e:
+                logger.error(f"Avatar job worker error, retrying: {e}")
+                await asyncio.sleep(ERROR_BACKOFF_SECONDS)
+
+
+def create_avatar_job_worker(
+    redis: aioredis.Redis | RedisCluster,
+    process: Callable[[AvatarJob, bytes], Awaitable[None]],
+) -> AvatarJobWorker:
+    return AvatarJobWorker(
+        redis,
+        process,
+        stream=settings.AVATAR_JOBS_STREAM,
+        group=settings.AVATAR_JOBS_GROUP,
+        concurrency=settings.AVATAR_JOBS_CONCURRENCY,
+        max_attempts=settings.AVATAR_JOBS_MAX_ATTEMPTS,
+        retry_after=settings.AVATAR_JOBS_RETRY_AFTER_SECONDS,
+        block=settings.AVATAR_JOBS_BLOCK_SECONDS,
+    )
@@ -0,0 +1,346 @@
+import asyncio
+import datetime
+import logging
+import time
+import uuid
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, replace
+
+import redis.asyncio as aioredis
+from redis.asyncio.cluster import RedisCluster
+
+from .ids import uuid7
+from .redis_client import redis_breaker
+from .s3_client import S3Client, s3_breaker
+
+logger = logging.getLogger(__name__)
+
+# S3 requires every part of a multipart upload except the last to be at least 5 MiB.
+S3_MIN_PART_BYTES = 5 * 1024 * 1024
+# Sorted set of "<object key> <S3 upload ID>" scored by expiry, read by the sweeper.
+EXPIRING_UPLOADS_KEY = "avatar:uploads:expiring"
+# Longer than any S3 call can take, so a lock only outlives a crashed holder.
+LOCK_SECONDS = 60
+SWEEP_BATCH_SIZE = 100
+
+# Deletes a lock only while it still holds the caller's token, so a request whose lock expired
+# doesn't release the one another request took since.
+RELEASE_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class UploadOffsetMismatchError(Exception):
+    """Raised when a chunk doesn't start where the upload currently ends."""
+
+    def __init__(self, offset: int):
+        super().__init__(f"The upload continues at offset {offset}")
+        self.offset = offset
+
+
+class UploadBusyError(Exception):
+    """Raised while another request is writing to the same upload."""
+
+
+class UploadIncompleteError(Exception):
+    """Raised when an upload is finalized before all of its bytes arrived."""
+
+
+def avatar_upload_key(upload_id: str) -> str:
+    # The hash tag keeps all keys of an upload in one cluster slot.
+    return f"avatar:upload:{{{upload_id}}}"
+
+
+def _parts_key(upload_id: str) -> str:
+    return f"{avatar_upload_key(upload_id)}:parts"
+
+
+def _pending_key(upload_id: str) -> str:
+    return f"{avatar_upload_key(upload_id)}:pending"
+
+
+def _lock_key(upload_id: str) -> str:
+    return f"{avatar_upload_key(upload_id)}:lock"
+
+
+@dataclass(frozen=True)
+class AvatarUpload:
+    id: str
+    user_id: uuid.UUID
+    object_key: str
+    s3_upload_id: str
+    length: int
+    offset: int
+    parts: int
+    assembled: bool
+    expires_at: datetime.datetime
+
+    @property
+    def expiry_member(self) -> str:
+        return f"{self.object_key} {self.s3_upload_id}"
+
+    @classmethod
+    def from_hash(cls, upload_id: str, fields: dict[bytes, bytes]) -> "AvatarUpload":
+        values = {key.decode(): value.decode() for key, value in fields.items()}
+        return cls(
+            id=upload_id,
+            user_id=uuid.UUID(values["user_id"]),
+            object_key=values["object_key"],
+            s3_upload_id=values["s3_upload_id"],
+            length=int(values["length"]),
+            offset=int(values["offset"]),
+            parts=int(values["parts"]),
+            assembled=values["assembled"] == "1",
+            expires_at=datetime.datetime.fromtimestamp(float(values["expires_at"]), datetime.UTC),
+        )
+
+
+class AvatarUploadStore:
+    """
+    Resumable avatar uploads backed by S3 multipart uploads, with their state in Redis.
+
+    Chunks must arrive in order at the offset the upload has reached. They are collected in
+    Redis until at least `part_size` bytes are pending, which S3 requires of every part but
+    the last, and then sent to S3 as one part; the rest is sent when the upload is assembled.
+    A request holds its chunk in memory and, when the chunk completes a part, the whole part as
+    well: the pending bytes are read back from Redis and sent with the chunk, so a part is under
+    `part_size` plus one chunk. An upload's keys expire `ttl` seconds after it was created, and
+    `sweep` aborts the S3 side of expired uploads.
+    """
+
+    def __init__(
+        self,
+        redis: aioredis.Redis | RedisCluster,
+        s3: S3Client,
+        *,
+        part_size: int = S3_MIN_PART_BYTES,
+        ttl: int = 24 * 3600,
+    ):
+        self.redis = redis
+        self.s3 = s3
+        self.part_size = part_size
+        self.ttl = ttl
+        self._release_lock = redis.register_script(RELEASE_LOCK_SCRIPT)
+
+    async def create(
+        self,
+        user_id: uuid.UUID,
+        length: int,
+        content_type: str,
+        prefix: str,
+        filename: str | None = None,
+    ) -> AvatarUpload:
+        """Starts an upload of `length` bytes. Raises ValueError for unknown file types."""
+        object_key, s3_upload_id = await s3_breaker.call(
+            self.s3.create_multipart_upload, content_type, prefix, filename
+        )
+        expires_at = int(time.time()) + self.ttl
+        upload = AvatarUpload(
+            id=str(uuid7()),
+            user_id=user_id,
+            object_key=object_key,
+            s3_upload_id=s3_upload_id,
+            length=length,
+            offset=0,
+            parts=0,
+            assembled=False,
+            expires_at=datetime.datetime.fromtimestamp(expires_at, datetime.UTC),
+        )
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.hset(
+                avatar_upload_key(upload.id),
+                mapping={
+                    "user_id": str(user_id),
+                    "object_key": object_key,
+                    "s3_upload_id": s3_upload_id,
+                    "length": length,
+                    "offset": 0,
+                    "parts": 0,
+                    "assembled": 0,
+                    "expires_at": expires_at,
+                },
+            )
+            pipe.expireat(avatar_upload_key(upload.id), expires_at)
+            pipe.zadd(EXPIRING_UPLOADS_KEY, {upload.expiry_member: expires_at})
+            await redis_breaker.call(pipe.execute)
+        logger.info(f"Started avatar upload {upload.id} of {length} bytes for user {user_id}")
+        return upload
+
+    async def get(self, upload_id: str) -> AvatarUpload | None:
+        fields = await redis_breaker.call(self.redis.hgetall, avatar_upload_key(upload_id))
+        return AvatarUpload.from_hash(upload_id, fields) if fields else None
+
+    @asynccontextmanager
+    async def _locked(self, upload_id: str):
+        token = uuid.uuid4().hex
+        if not await redis_breaker.call(
+            self.redis.set, _lock_key(upload_id), token, nx=True, ex=LOCK_SECONDS
+        ):
+            raise UploadBusyError(f"Upload {upload_id} is being written to")
+        try:
+            yield
+        finally:
+            await redis_breaker.call(self._release_lock, keys=[_lock_key(upload_id)], args=[token])
+
+    async def _current(self, upload_id: str) -> AvatarUpload:
+        upload = await self.get(upload_id)
+        if upload is None:
+            raise LookupError(f"Upload {upload_id} expired")
+        return upload
+
+    async def append(self, upload: AvatarUpload, offset: int, chunk: bytes) -> AvatarUpload:
+        """
+        Adds a chunk starting at `offset` and returns the upload with its new offset.
+
+        Raises UploadOffsetMismatchError if the upload ends elsewhere, and ValueError for a
+        chunk past the declared length. A failed S3 call leaves the upload as it was.
+        """
+        async with self._locked(upload.id):
+            upload = await self._current(upload.id)
+            if offset != upload.offset:
+                raise UploadOffsetMismatchError(upload.offset)
+            if upload.offset + len(chunk) > upload.length:
+                raise ValueError(f"The upload is {upload.length} bytes long")
+            expires_at = int(upload.expires_at.timestamp())
+            pending_bytes = await redis_breaker.call(self.redis.strlen, _pending_key(upload.id))
+            if pending_bytes + len(chunk) < self.part_size:
+                async with self.redis.pipeline(transaction=False) as pipe:
+                    pipe.append(_pending_key(upload.id), chunk)
+                    pipe.expireat(_pending_key(upload.id), expires_at)
+                    pipe.hincrby(avatar_upload_key(upload.id), "offset", len(chunk))
+                    await redis_breaker.call(pipe.execute)
+                return replace(upload, offset=upload.offset + len(chunk))
+
+            # The buffer is only read once it completes a part, so each byte is read back once.
+            pending = await redis_breaker.call(self.redis.get, _pending_key(upload.id)) or b""
+            etag = await s3_breaker.call(
+                self.s3.upload_part,
+                upload.object_key,
+                upload.s3_upload_id,
+                upload.parts + 1,
+                pending + chunk,
+            )
+            async with self.redis.pipeline(transaction=False) as pipe:
+                pipe.rpush(_parts_key(upload.id), etag)
+                pipe.expireat(_parts_key(upload.id), expires_at)
+                pipe.delete(_pending_key(upload.id))
+                pipe.hincrby(avatar_upload_key(upload.id), "offset", len(chunk))
+                pipe.hincrby(avatar_upload_key(upload.id), "parts", 1)
+                await redis_breaker.call(pipe.execute)
+            return replace(upload, offset=upload.offset + len(chunk), parts=upload.parts + 1)
+
+    async def assemble(self, upload: AvatarUpload) -> AvatarUpload:
+        """
+        Completes the S3 upload once every byte arrived and returns the assembled upload.
+
+        Assembling again after it succeeded does nothing, so a caller may retry whatever it
+        does next.
+        """
+        if upload.offset != upload.length:
+            raise UploadIncompleteError(f"{upload.offset} of {upload.length} bytes were uploaded")
+        async with self._locked(upload.id):
+            upload = await self._current(upload.id)
+            if upload.assembled:
+                return upload
+            etags = await redis_breaker.call(self.redis.lrange, _parts_key(upload.id), 0, -1)
+            parts = [(number, etag.decode()) for number, etag in enumerate(etags, start=1)]
+            pending = await redis_breaker.call(self.redis.get, _pending_key(upload.id))
+            if pending:
+                etag = await s3_breaker.call(
+                    self.s3.upload_part,
+                    upload.object_key,
+                    upload.s3_upload_id,
+                    len(parts) + 1,
+                    pending,
+                )
+                parts.append((len(parts) + 1, etag))
+            await s3_breaker.call(
+                self.s3.complete_multipart_upload, upload.object_key, upload.s3_upload_id, parts
+            )
+            async with self.redis.pipeline(transaction=False) as pipe:
+                pipe.hset(avatar_upload_key(upload.id), "assembled", 1)
+                pipe.delete(_pending_key(upload.id), _parts_key(upload.id))
+                pipe.zrem(EXPIRING_UPLOADS_KEY, upload.expiry_member)
+                await redis_breaker.call(pipe.execute)
+        logger.info(f"Assembled avatar upload {upload.id} into {upload.object_key}")
+        return replace(upload, assembled=True)
+
+    async def delete(self, upload: AvatarUpload) -> None:
+        """
+        Forgets an upload; its S3 upload is aborted unless it was assembled.
+
+        Raises UploadBusyError while a chunk is being stored or the upload assembled.
+        """
+        async with self._locked(upload.id):
+            upload = await self.get(upload.id)
+            if upload is None:
+                # Expired; the sweeper aborts its S3 upload.
+                return
+            if not upload.assembled:
+                await s3_breaker.call(
+                    self.s3.abort_multipart_upload, upload.object_key, upload.s3_upload_id
+                )
+            async with self.redis.pipeline(transaction=False) as pipe:
+                pipe.delete(
+                    avatar_upload_key(upload.id), _parts_key(upload.id), _pending_key(upload.id)
+                )
+                pipe.zrem(EXPIRING_UPLOADS_KEY, upload.expiry_member)
+                await redis_breaker.call(pipe.execute)
+
+    async def sweep(self) -> int:
+        """Aborts the S3 uploads of expired sessions and returns how many."""
+        expired = await redis_breaker.call(
+            self.redis.zrangebyscore,
+            EXPIRING_UPLOADS_KEY,
+            0,
+            time.time(),
+            start=0,
+            num=SWEEP_BATCH_SIZE,
+        )
+        aborted = 0
+        for member in expired:
+            # Only the worker whose ZREM removed the entry aborts it.
+            if not await redis_breaker.call(self.redis.zrem, EXPIRING_UPLOADS_KEY, member):
+                continue
+            object_key, s3_upload_id = member.decode().split(" ")
+            try:
+                await s3_breaker.call(self.s3.abort_multipart_upload, object_key, s3_upload_id)
+                aborted += 1
+            except Exception as e:
+                logger.error(f"Aborting expired upload to {object_key} failed: {e}")
+        return aborted
+
+
+class AvatarUploadSweeper:
+    """Periodically aborts the S3 multipart uploads of expired upload sessions."""
+
+    def __init__(self, store: AvatarUploadStore, interval: float = 300.0):
+        self.store = store
+        self.interval = interval
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run(), name="avatar-upload-sweeper")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                aborted = await self.store.sweep()
+                if aborted:
+                    logger.info(f"Aborted {aborted} expired avatar uploads")
+            except Exception as e:
+                logger.warning(f"Sweeping expired avatar uploads failed: {e}")
@@ -0,0 +1,151 @@
+import base64
+import binascii
+import datetime
+import uuid
+import zlib
+from typing import Any, Literal, Protocol
+
+import msgpack
+from pydantic_core import to_json
+
+from app.schemas.profile import ProfileRead
+
+from .config import settings
+
+# The first byte of an entry identifies its format. JSON entries start with "{", which no
+# binary version uses, so entries written before the codec existed stay readable.
+JSON_PREFIX = b"{"
+MSGPACK_V1 = 1
+MSGPACK_V1_ZLIB = 2
+
+PLACEHOLDER_PREFIX = "data:image/webp;base64,"
+EPOCH = datetime.datetime(1970, 1, 1, tzinfo=datetime.UTC)
+
+
+class ProfileCodec(Protocol):
+    def encode(self, profile: ProfileRead) -> bytes: ...
+
+
+class JsonProfileCodec:
+    """The response body itself: the largest entries, but hits are served without decoding."""
+
+    def encode(self, profile: ProfileRead) -> bytes:
+        return profile.model_dump_json().encode()
+
+
+def _to_micros(value: datetime.datetime) -> int:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=datetime.UTC)
+    return (value - EPOCH) // datetime.timedelta(microseconds=1)
+
+
+def _from_micros(micros: int) -> datetime.datetime:
+    return EPOCH + datetime.timedelta(microseconds=micros)
+
+
+def _pack_placeholder(placeholder: str | None) -> str | bytes | None:
+    """Stores placeholders as raw image bytes, a quarter smaller than base64."""
+    if not placeholder or not placeholder.startswith(PLACEHOLDER_PREFIX):
+        return placeholder
+    encoded = placeholder.removeprefix(PLACEHOLDER_PREFIX)
+    try:
+        image = base64.b64decode(encoded, validate=True)
+    except binascii.Error:
+        return placeholder
+    # Only canonical base64 survives the round trip unchanged.
+    return image if base64.b64encode(image).decode() == encoded else placeholder
+
+
+class MsgpackProfileCodec:
+    """
+    Profiles as a msgpack array in a fixed field order, behind a version byte.
+
+    UUIDs are stored as 16 raw bytes, timestamps as integer microseconds and the avatar
+    placeholder as raw WebP bytes. Payloads over `compress_min_bytes` are zlib-compressed when
+    that makes them smaller. Adding or reordering fields needs a new version.
+    """
+
+    def __init__(self, compress_min_bytes: int = 512, compress_level: int = 6):
+        self.compress_min_bytes = compress_min_bytes
+        self.compress_level = compress_level
+
+    def encode(self, profile: ProfileRead) -> bytes:
+        payload = msgpack.packb(
+            [
+                profile.id.bytes,
+                profile.user_id.bytes,
+                profile.display_name,
+                profile.bio,
+                profile.avatar_url,
+                _pack_placeholder(profile.avatar_placeholder),
+                _to_micros(profile.created_at),
+                _to_micros(profile.updated_at),
+            ]
+        )
+        if len(payload) >= self.compress_min_bytes:
+            compressed = zlib.compress(payload, self.compress_level)
+            if len(compressed) < len(payload):
+                return bytes([MSGPACK_V1_ZLIB]) + compressed
+        return bytes([MSGPACK_V1]) + payload
+
+
+def _unpack_fields(payload: bytes) -> dict[str, Any]:
+    """Returns the profile fields in `ProfileRead` order, so they serialize like it does."""
+    (
+        profile_id,
+        user_id,
+        display_name,
+        bio,
+        avatar_url,
+        placeholder,
+        created_at,
+        updated_at,
+    ) = msgpack.unpackb(payload)
+    if isinstance(placeholder, bytes):
+        placeholder = PLACEHOLDER_PREFIX + base64.b64encode(placeholder).decode()
+    return {
+        "display_name": display_name,
+        "bio": bio,
+        "avatar_url": avatar_url,
+        "id": uuid.UUID(bytes=profile_id),
+        "user_id": uuid.UUID(bytes=user_id),
+        "created_at": _from_micros(created_at),
+        "updated_at": _from_micros(updated_at),
+        "avatar_placeholder": placeholder,
+    }
+
+
+def _unpack(data: bytes) -> dict[str, Any]:
+    version = data[:1]
+    if version == bytes([MSGPACK_V1]):
+        return _unpack_fields(data[1:])
+    if version == bytes([MSGPACK_V1_ZLIB]):
+        return _unpack_fields(zlib.decompress(data[1:]))
+    raise ValueError(f"Unknown cache entry format {version!r}")
+
+
+def decode_profile(data: bytes) -> ProfileRead:
+    """Decodes a cached profile written by any codec. Raises ValueError for unknown formats."""
+    if data[:1] == JSON_PREFIX:
+        return ProfileRead.model_validate_json(data)
+    # Entries were validated when they were encoded.
+    return ProfileRead.model_construct(**_unpack(data))
+
+
+def decode_profile_json(data: bytes) -> bytes:
+    """Returns the JSON body for a cached profile; JSON entries are returned as they are."""
+    if data[:1] == JSON_PREFIX:
+        return data
+    # Serializing the fields directly skips building a model, which costs more than the rest.
+    return to_json(_unpack(data))
+
+
+def create_profile_codec(
+    name: Literal["json", "msgpack"], compress_min_bytes: int = 512
+) -> ProfileCodec:
+    if name == "msgpack":
+        return MsgpackProfileCodec(compress_min_bytes)
+    return JsonProfileCodec()
+
+
+profile_codec = create_profile_codec(settings.CACHE_CODEC, settings.CACHE_COMPRESS_MIN_BYTES)
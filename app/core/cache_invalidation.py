@@ -0,0 +1,129 @@
+import asyncio
+import logging
+import uuid
+from collections.abc import Iterable
+
+import asyncpg
+import redis.asyncio as aioredis
+from redis.asyncio.cluster import RedisCluster
+
+from .cache_keys import profile_cache_keys
+from .redis_client import batch_keys, redis_breaker
+
+logger = logging.getLogger(__name__)
+
+# Must match the channel used by the `notify_profile_change` trigger function.
+PROFILE_CHANGES_CHANNEL = "profile_changes"
+
+
+async def invalidate_profiles(
+    redis: aioredis.Redis | RedisCluster,
+    user_ids: Iterable[uuid.UUID | str],
+    batch_size: int = 500,
+) -> None:
+    """Deletes every cached entry of the given profiles, at most `batch_size` keys per DEL."""
+    keys = [key for user_id in user_ids for key in profile_cache_keys(user_id)]
+    batches = batch_keys(redis, keys, batch_size)
+    if isinstance(redis, RedisCluster):
+        # One DEL per slot: the pipeline sends them to all nodes concurrently.
+        async with redis.pipeline() as pipe:
+            for batch in batches:
+                pipe.delete(*batch)
+            await pipe.execute()
+        return
+    for batch in batches:
+        await redis.delete(*batch)
+
+
+class ProfileChangeListener:
+    """
+    Evicts cached profiles changed by any writer, including manual SQL and admin scripts.
+
+    Holds a dedicated asyncpg connection that LISTENs for notifications from the
+    `notify_profile_change` trigger. Notifications arriving within `flush_interval` of each
+    other are coalesced and evicted together. Notifications sent while the connection is
+    down are lost; those entries expire with their TTL.
+    """
+
+    def __init__(
+        self,
+        redis: aioredis.Redis,
+        dsn: str,
+        batch_size: int = 500,
+        flush_interval: float = 0.1,
+        reconnect_delay: float = 5.0,
+    ):
+        self.redis = redis
+        self.dsn = dsn
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.reconnect_delay = reconnect_delay
+        self._pending: set[str] = set()
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run(), name="profile-change-listener")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def _on_notification(
+        self, connection: asyncpg.Connection, pid: int, channel: str, payload: str
+    ) -> None:
+        self._pending.add(payload)
+        self._wakeup.set()
+
+    async def flush(self) -> bool:
+        """Evicts all pending profiles. On failure they stay pending for the next attempt."""
+        if not self._pending:
+            return True
+        user_ids, self._pending = self._pending, set()
+        try:
+            await redis_breaker.call(invalidate_profiles, self.redis, user_ids, self.batch_size)
+        except Exception as e:
+            logger.error(f"Could not evict {len(user_ids)} changed profiles from cache: {e}")
+            self._pending |= user_ids
+            return False
+        logger.info(f"Evicted {len(user_ids)} changed profiles from cache")
+        return True
+
+    async def _listen(self, conn: asyncpg.Connection) -> None:
+        await conn.add_listener(PROFILE_CHANGES_CHANNEL, self._on_notification)
+        logger.info(f"Listening for profile changes on channel '{PROFILE_CHANGES_CHANNEL}'")
+        while not conn.is_closed():
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.reconnect_delay)
+            except TimeoutError:
+                continue
+            # Give a burst of writes (e.g. a bulk import) time to arrive as one batch.
+            await asyncio.sleep(self.flush_interval)
+            self._wakeup.clear()
+            if not await self.flush():
+                await asyncio.sleep(self.reconnect_delay)
+                self._wakeup.set()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                conn = await asyncpg.connect(self.dsn)
+            except Exception as e:
+                logger.error(f"Profile change listener could not connect: {e}")
+                await asyncio.sleep(self.reconnect_delay)
+                continue
+            try:
+                await self._listen(conn)
+                logger.warning("Profile change listener lost its connection, reconnecting")
+            except Exception as e:
+                logger.error(f"Profile change listener failed: {e}")
+                await asyncio.sleep(self.reconnect_delay)
+            finally:
+                if not conn.is_closed():
+                    conn.terminate()
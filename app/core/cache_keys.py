@@ -0,0 +1,27 @@
+import uuid
+
+# Every cached entry of a profile shares the `{<user_id>}` hash tag, so Redis Cluster keeps
+# them in one slot and per-profile multi-key commands and pipelines stay on a single node.
+
+
+def profile_key_prefix(user_id: uuid.UUID | str) -> str:
+    return f"profile:{{{user_id}}}"
+
+
+def profile_me_key(user_id: uuid.UUID | str) -> str:
+    """`GET /me` response."""
+    return f"{profile_key_prefix(user_id)}:me"
+
+
+def profile_public_key(user_id: uuid.UUID | str) -> str:
+    """`GET /profile/{user_id}` response."""
+    return f"{profile_key_prefix(user_id)}:user"
+
+
+def profile_fields_key(user_id: uuid.UUID | str) -> str:
+    """Hash of `GET /profile/{user_id}?fields=` responses, keyed by projection."""
+    return f"{profile_key_prefix(user_id)}:fields"
+
+
+def profile_cache_keys(user_id: uuid.UUID | str) -> tuple[str, str, str]:
+    return profile_me_key(user_id), profile_public_key(user_id), profile_fields_key(user_id)
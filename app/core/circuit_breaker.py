@@ -0,0 +1,107 @@
+import asyncio
+import enum
+import logging
+import time
+from collections.abc import Awaitable, Callable
+from typing import ParamSpec, TypeVar
+
+logger = logging.getLogger(__name__)
+
+P = ParamSpec("P")
+T = TypeVar("T")
+
+
+class CircuitOpenError(Exception):
+    """Raised when a call is rejected because the breaker is open."""
+
+
+class CircuitState(enum.StrEnum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Guards calls to an unreliable dependency.
+
+    After `failure_threshold` consecutive failures the breaker opens and rejects calls
+    immediately for `recovery_timeout` seconds. Then a single probe call is let through
+    (half-open): success closes the breaker, failure opens it again. Exceptions listed in
+    `excluded_exceptions` are caller errors and don't count as failures.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        recovery_timeout: float = 5.0,
+        call_timeout: float | None = None,
+        excluded_exceptions: tuple[type[Exception], ...] = (),
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.call_timeout = call_timeout
+        self.excluded_exceptions = excluded_exceptions
+        self._state = CircuitState.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+
+    @property
+    def state(self) -> CircuitState:
+        if (
+            self._state == CircuitState.OPEN
+            and time.monotonic() - self._opened_at >= self.recovery_timeout
+        ):
+            return CircuitState.HALF_OPEN
+        return self._state
+
+    @property
+    def is_open(self) -> bool:
+        """True while calls would be rejected without reaching the dependency."""
+        state = self.state
+        return state == CircuitState.OPEN or (
+            state == CircuitState.HALF_OPEN and self._probe_in_flight
+        )
+
+    async def call(self, func: Callable[P, Awaitable[T]], *args: P.args, **kwargs: P.kwargs) -> T:
+        """Runs `func` through the breaker, applying `call_timeout` if configured."""
+        if self.is_open:
+            raise CircuitOpenError(f"Circuit '{self.name}' is open")
+
+        is_probe = self.state == CircuitState.HALF_OPEN
+        if is_probe:
+            self._probe_in_flight = True
+            logger.info(f"Circuit '{self.name}' half-open, sending probe")
+        try:
+            if self.call_timeout is None:
+                result = await func(*args, **kwargs)
+            else:
+                result = await asyncio.wait_for(func(*args, **kwargs), timeout=self.call_timeout)
+        except self.excluded_exceptions:
+            self._record_success()
+            raise
+        except Exception:
+            self._record_failure()
+            raise
+        finally:
+            if is_probe:
+                self._probe_in_flight = False
+        self._record_success()
+        return result
+
+    def _record_success(self) -> None:
+        if self._state != CircuitState.CLOSED:
+            logger.info(f"Circuit '{self.name}' closed")
+        self._state = CircuitState.CLOSED
+        self._failures = 0
+
+    def _record_failure(self) -> None:
+        self._failures += 1
+        if self._state == CircuitState.OPEN or self._failures >= self.failure_threshold:
+            if self._state != CircuitState.OPEN:
+                logger.warning(f"Circuit '{self.name}' opened after {self._failures} failures")
+            self._state = CircuitState.OPEN
+            self._opened_at = time.monotonic()
@@ -1,5 +1,5 @@
 import os
-from typing import Any
+from typing import Any, Literal
 
 from pydantic import PostgresDsn, field_validator
 from pydantic_core import MultiHostUrl
@@ -14,6 +14,19 @@ class Settings(BaseSettings):
 
     APP_ENV: str = "development"
 
+    # Server Configuration (`python -m app.server`)
+    SERVER_HOST: str = "0.0.0.0"
+    SERVER_PORT: int = 8001
+    SERVER_ROOT_PATH: str = ""
+    SERVER_WORKERS: int | None = None  # defaults to the CPUs available to the container
+    SERVER_LOOP: str = "uvloop"
+    SERVER_HTTP: str = "httptools"
+    SERVER_BACKLOG: int = 2048
+    SERVER_KEEPALIVE_SECONDS: int = 5
+    SERVER_LIMIT_MAX_REQUESTS: int | None = None
+    SERVER_MAX_REQUESTS_JITTER: int = 0
+    SERVER_GRACEFUL_SHUTDOWN_SECONDS: int = 25
+
     # Postgres Database Config
     POSTGRES_SERVER: str
     POSTGRES_PORT: int = 5432
@@ -23,16 +36,137 @@ class Settings(BaseSettings):
 
     SQLALCHEMY_DATABASE_URI: PostgresDsn | None = None
 
+    # Database Pool Config
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 1800  # seconds, -1 disables recycling
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_CACHE_SIZE: int = 100
+    DB_COMMAND_TIMEOUT: float | None = 10.0
+    DB_PGBOUNCER_MODE: bool = False
+    # Postgres connections one pod may hold across all of its workers; unset keeps the pool as is.
+    DB_MAX_CONNECTIONS: int | None = None
+
     # AWS S3 Configuration
     AWS_ACCESS_KEY_ID: str
     AWS_SECRET_ACCESS_KEY: str
     AWS_S3_BUCKET_NAME: str = "fastboosty-profile-bucket"
     AWS_S3_REGION: str = "eu-north-1"
+    S3_TIMEOUT_SECONDS: float = 10.0
+    S3_FAILURE_THRESHOLD: int = 5
+    S3_RECOVERY_SECONDS: float = 15.0
+
+    # Avatar Proxy Configuration (`GET /profiles/avatar/{object_key}`)
+    AVATAR_PROXY_ENABLED: bool = False
+    AVATAR_CACHE_DIR: str = "/tmp/profile-avatar-cache"
+    AVATAR_CACHE_MAX_BYTES: int = 512 * 1024 * 1024
+    AVATAR_CACHE_MAX_OBJECT_BYTES: int = 5 * 1024 * 1024
+    AVATAR_CACHE_MAX_AGE_SECONDS: int = 365 * 24 * 3600
 
     # Redis Configuration
+    # In cluster mode REDIS_HOST/REDIS_PORT name any node and REDIS_DATABASE must be 0; in
+    # sentinel mode the master of REDIS_SENTINEL_SERVICE is found through REDIS_SENTINEL_HOSTS.
+    REDIS_MODE: Literal["standalone", "cluster", "sentinel"] = "standalone"
     REDIS_HOST: str
     REDIS_PORT: int = 6379
     REDIS_DATABASE: int
+    REDIS_SENTINEL_HOSTS: str = ""  # comma-separated host:port pairs
+    REDIS_SENTINEL_SERVICE: str = "mymaster"
+    REDIS_SOCKET_TIMEOUT: float = 0.5
+    REDIS_FAILURE_THRESHOLD: int = 5
+    REDIS_RECOVERY_SECONDS: float = 5.0
+
+    # Cache Entry Encoding. Readers accept every format, so roll out new code before switching.
+    CACHE_CODEC: Literal["json", "msgpack"] = "json"
+    CACHE_COMPRESS_MIN_BYTES: int = 512
+
+    # Profile Event Stream Configuration
+    PROFILE_EVENTS_STREAM: str = "profile:events"
+    PROFILE_EVENTS_MAXLEN: int = 100_000
+
+    # Cache Invalidation Listener Configuration
+    # LISTEN needs a session-level connection: point it past PgBouncer in transaction mode.
+    CACHE_INVALIDATION_LISTENER_ENABLED: bool = True
+    CACHE_INVALIDATION_BATCH_SIZE: int = 500
+    CACHE_INVALIDATION_FLUSH_SECONDS: float = 0.1
+    CACHE_INVALIDATION_DSN: str | None = None
+
+    # Hot Profile Configuration (per worker: a Count-Min Sketch plus the top-K profiles)
+    HOT_PROFILES_ENABLED: bool = True
+    HOT_PROFILES_CAPACITY: int = 100
+    HOT_PROFILES_SKETCH_WIDTH: int = 2048
+    HOT_PROFILES_SKETCH_DEPTH: int = 4
+    HOT_PROFILES_DECAY_EVERY: int = 100_000  # reads between halving all counts
+    HOT_PROFILES_MIN_HITS: int = 10
+    HOT_PROFILES_REFRESH_INTERVAL_SECONDS: float = 5.0
+    HOT_PROFILES_REFRESH_AHEAD_SECONDS: float = 15.0  # must stay below the 60s profile TTL
+    HOT_PROFILES_REFRESH_BATCH: int = 20  # refreshes per interval at most
+    HOT_PROFILES_WARM_COUNT: int = 100
+
+    # Asynchronous Avatar Processing (`PUT /profiles/me` with `Prefer: respond-async`)
+    AVATAR_JOBS_ENABLED: bool = False
+    AVATAR_JOBS_WORKER_ENABLED: bool = True  # process jobs in the API workers as well
+    AVATAR_JOBS_STREAM: str = "avatar:jobs"
+    AVATAR_JOBS_GROUP: str = "avatar-workers"
+    AVATAR_JOBS_MAXLEN: int = 100_000
+    AVATAR_JOBS_CONCURRENCY: int = 4  # jobs processed at once per worker
+    AVATAR_JOBS_MAX_ATTEMPTS: int = 3
+    AVATAR_JOBS_RETRY_AFTER_SECONDS: float = 30.0  # redelivers jobs unfinished for this long
+    AVATAR_JOBS_BLOCK_SECONDS: float = 5.0  # how long a worker waits for new jobs per read
+    AVATAR_JOBS_TTL_SECONDS: int = 3600  # job status and staged upload lifetime
+    AVATAR_JOBS_MAX_UPLOAD_BYTES: int = 5 * 1024 * 1024
+
+    # Resumable Avatar Uploads (`/profiles/me/uploads`, backed by S3 multipart uploads)
+    AVATAR_UPLOADS_ENABLED: bool = False
+    AVATAR_UPLOADS_MAX_BYTES: int = 10 * 1024 * 1024
+    AVATAR_UPLOADS_MAX_CHUNK_BYTES: int = 5 * 1024 * 1024
+    AVATAR_UPLOADS_PLACEHOLDER_MAX_BYTES: int = 1024 * 1024  # larger ones get no placeholder
+    AVATAR_UPLOADS_TTL_SECONDS: int = 24 * 3600
+    AVATAR_UPLOADS_SWEEP_INTERVAL_SECONDS: float = 300.0
+
+    # Load Shedding Configuration (limits are per worker and adapt to latency)
+    LOAD_SHEDDING_ENABLED: bool = True
+    LOAD_SHEDDING_READ_INITIAL_LIMIT: int = 50
+    LOAD_SHEDDING_READ_MAX_LIMIT: int = 500
+    LOAD_SHEDDING_WRITE_INITIAL_LIMIT: int = 10
+    LOAD_SHEDDING_WRITE_MAX_LIMIT: int = 50
+    LOAD_SHEDDING_MIN_LIMIT: int = 2
+    LOAD_SHEDDING_QUEUE_SIZE: int = 100
+    LOAD_SHEDDING_QUEUE_TIMEOUT_SECONDS: float = 1.0
+    LOAD_SHEDDING_RETRY_AFTER_SECONDS: int = 1
+
+    # Rate Limiting Configuration (requests per RATE_LIMIT_PERIOD_SECONDS, per user and per IP)
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_PERIOD_SECONDS: float = 60.0
+    RATE_LIMIT_PROFILE_WRITE_PER_USER: int = 30
+    RATE_LIMIT_PROFILE_WRITE_PER_IP: int = 120
+    RATE_LIMIT_AVATAR_UPLOAD_PER_USER: int = 5
+    RATE_LIMIT_AVATAR_UPLOAD_PER_IP: int = 20
+    RATE_LIMIT_LOCAL_MAX_KEYS: int = 10_000
+
+    # Health Probe Configuration (`GET /ready` serves the results of background probes)
+    HEALTH_PROBE_INTERVAL_SECONDS: float = 5.0
+    HEALTH_PROBE_TIMEOUT_SECONDS: float = 2.0
+    HEALTH_PROBE_MAX_AGE_SECONDS: float = 30.0
+    # Comma-separated subset of postgres,redis,s3; the service degrades without the others.
+    HEALTH_REQUIRED_DEPENDENCIES: str = "postgres"
+
+    # Admin Configuration
+    ADMIN_USER_IDS: str = ""  # comma-separated user IDs allowed to call /admin endpoints
+    # Sampling profiler (`POST /admin/profile`); when disabled its route and middleware are absent
+    PROFILER_ENABLED: bool = False
+    PROFILER_SAMPLE_INTERVAL_SECONDS: float = 0.005
+    PROFILER_MAX_SECONDS: float = 60.0
+    # Memory diagnostics (`/admin/memory`, tracemalloc snapshots and diffs)
+    MEMORY_DIAGNOSTICS_ENABLED: bool = False
+
+    # Startup Warm-up Configuration
+    WARMUP_ENABLED: bool = True
+    WARMUP_DB_CONNECTIONS: int = 5
+    WARMUP_REDIS_CONNECTIONS: int = 5
+    WARMUP_S3: bool = True
+    WARMUP_TIMEOUT_SECONDS: float = 15.0
 
     @field_validator("SQLALCHEMY_DATABASE_URI", mode="before")
     @classmethod
@@ -1,16 +1,71 @@
 import logging
+import uuid
 from collections.abc import AsyncGenerator
+from typing import Any
 
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 
-from .config import settings
+from .config import Settings, settings
 
 logger = logging.getLogger(__name__)
 
 
+def build_connect_args(config: Settings) -> dict[str, Any]:
+    """Builds asyncpg connection arguments from settings."""
+    connect_args: dict[str, Any] = {
+        "command_timeout": config.DB_COMMAND_TIMEOUT,
+        "statement_cache_size": config.DB_STATEMENT_CACHE_SIZE,
+        "prepared_statement_cache_size": config.DB_STATEMENT_CACHE_SIZE,
+    }
+    if config.DB_PGBOUNCER_MODE:
+        # PgBouncer in transaction mode can hand each transaction a different server
+        # connection, so named prepared statements must be disabled and unique.
+        connect_args["statement_cache_size"] = 0
+        connect_args["prepared_statement_cache_size"] = 0
+        connect_args["prepared_statement_name_func"] = lambda: f"__asyncpg_{uuid.uuid4()}__"
+    return connect_args
+
+
+def build_pool_limits(config: Settings) -> tuple[int, int]:
+    """
+    Returns (pool_size, max_overflow) for one worker process.
+
+    With `DB_MAX_CONNECTIONS` set, the pod's connection budget is split evenly between its
+    `SERVER_WORKERS` workers, less the connection each one holds for the cache invalidation
+    listener, so scaling workers out cannot exhaust Postgres `max_connections`.
+    """
+    if config.DB_MAX_CONNECTIONS is None:
+        return config.DB_POOL_SIZE, config.DB_MAX_OVERFLOW
+    # QueuePool treats pool_size=0 and max_overflow=-1 as unlimited, which no budget can bound.
+    if config.DB_POOL_SIZE < 1 or config.DB_MAX_OVERFLOW < 0:
+        raise ValueError(
+            f"DB_POOL_SIZE={config.DB_POOL_SIZE} and DB_MAX_OVERFLOW={config.DB_MAX_OVERFLOW} "
+            "make the pool unbounded; with DB_MAX_CONNECTIONS set they must be at least 1 and 0"
+        )
+    # app.server exports the resolved worker count; any other launcher runs a single process.
+    workers = config.SERVER_WORKERS or 1
+    budget = config.DB_MAX_CONNECTIONS // workers
+    if config.CACHE_INVALIDATION_LISTENER_ENABLED:
+        budget -= 1
+    if budget < 1:
+        raise ValueError(
+            f"DB_MAX_CONNECTIONS={config.DB_MAX_CONNECTIONS} leaves no pooled connection "
+            f"for each of {workers} workers"
+        )
+    pool_size = min(config.DB_POOL_SIZE, budget)
+    return pool_size, min(config.DB_MAX_OVERFLOW, budget - pool_size)
+
+
+pool_size, max_overflow = build_pool_limits(settings)
+
 async_engine = create_async_engine(
     str(settings.SQLALCHEMY_DATABASE_URI),
-    pool_pre_ping=True,
+    pool_size=pool_size,
+    max_overflow=max_overflow,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
+    connect_args=build_connect_args(settings),
     echo=settings.APP_ENV == "development",
     future=True,
 )
@@ -24,6 +79,30 @@ AsyncSessionFactory = async_sessionmaker(
 )
 
 
+def get_asyncpg_dsn() -> str:
+    """Database URL in the plain `postgresql://` form accepted by asyncpg.connect."""
+    return str(settings.SQLALCHEMY_DATABASE_URI).replace("postgresql+asyncpg://", "postgresql://")
+
+
+def get_pool_stats() -> dict[str, int]:
+    """Returns a snapshot of the engine connection pool usage."""
+    pool = async_engine.pool
+    size = pool.size()
+    return {
+        "size": size,
+        "max_overflow": max_overflow,
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+        "capacity": size + max_overflow,
+    }
+
+
+def get_session_factory() -> async_sessionmaker[AsyncSession]:
+    """FastAPI dependency for code that must manage its own session, e.g. streaming responses."""
+    return AsyncSessionFactory
+
+
 async def get_async_session() -> AsyncGenerator[AsyncSession]:
     """FastAPI dependency for async session."""
     logger.debug("Creating profile async session")
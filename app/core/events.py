@@ -0,0 +1,101 @@
+import logging
+from collections.abc import AsyncGenerator
+from typing import Literal
+
+import redis.asyncio as aioredis
+from redis.asyncio.cluster import RedisCluster
+
+from app.models.profile import Profile
+from app.schemas.profile import ProfileEvent
+
+from .circuit_breaker import CircuitOpenError
+from .config import settings
+from .redis_client import redis_breaker
+
+logger = logging.getLogger(__name__)
+
+EVENT_FIELD = b"event"
+
+
+async def publish_profile_event(
+    redis: aioredis.Redis | None,
+    event_type: Literal["created", "updated"],
+    profile: Profile,
+) -> str | None:
+    """
+    Appends a change event for a committed profile write to the event stream.
+
+    Publishing is best effort: failures are logged and never fail the request.
+    Returns the stream entry ID, or None if the event was not published.
+    """
+    if redis is None:
+        return None
+    event = ProfileEvent(
+        type=event_type,
+        profile_id=profile.id,
+        user_id=profile.user_id,
+        display_name=profile.display_name,
+        avatar_key=profile.avatar_url,
+        updated_at=profile.updated_at,
+    )
+    try:
+        entry_id = await redis_breaker.call(
+            redis.xadd,
+            settings.PROFILE_EVENTS_STREAM,
+            {EVENT_FIELD: event.model_dump_json()},
+            maxlen=settings.PROFILE_EVENTS_MAXLEN,
+            approximate=True,
+        )
+        logger.info(f"Published '{event_type}' event for user_id: {profile.user_id}")
+        return entry_id.decode() if isinstance(entry_id, bytes) else entry_id
+    except CircuitOpenError:
+        logger.warning(f"Redis circuit open, dropped '{event_type}' event for {profile.user_id}")
+    except Exception as e:
+        logger.error(f"Failed to publish '{event_type}' event for user_id {profile.user_id}: {e}")
+    return None
+
+
+async def latest_event_id(redis: aioredis.Redis) -> str:
+    """
+    Returns the ID of the newest stream entry, or "0-0" for an empty stream.
+
+    Consumers take this cursor before backfilling from `GET /profiles/?format=ndjson`,
+    then read events after it, so no change made during the backfill is missed.
+    """
+    entries = await redis.xrevrange(settings.PROFILE_EVENTS_STREAM, count=1)
+    if not entries:
+        return "0-0"
+    entry_id = entries[0][0]
+    return entry_id.decode() if isinstance(entry_id, bytes) else entry_id
+
+
+async def iter_profile_events(
+    redis: aioredis.Redis | RedisCluster,
+    last_id: str = "$",
+    batch_size: int = 100,
+    block_ms: int = 5000,
+) -> AsyncGenerator[tuple[str, ProfileEvent]]:
+    """
+    Yields (entry_id, event) pairs after `last_id`, blocking while the stream is idle.
+
+    Persist the yielded entry ID to resume after a restart. If it has already been
+    trimmed from the stream, backfill again starting from `latest_event_id`.
+
+    A read can't block longer than the client's socket timeout, or an idle stream would end
+    it with a timeout error, so with a short timeout the stream is polled more often. Use
+    `create_redis_client(block=block_ms / 1000)` for a client that waits the full `block_ms`.
+    """
+    # Both clients expose this; a cluster has no single connection pool to read it from.
+    socket_timeout = redis.get_connection_kwargs().get("socket_timeout")
+    if socket_timeout is not None:
+        # Leaves the usual socket timeout, or half of a shorter one, for the reply to arrive.
+        reply_seconds = min(settings.REDIS_SOCKET_TIMEOUT, socket_timeout / 2)
+        block_ms = max(1, min(block_ms, int((socket_timeout - reply_seconds) * 1000)))
+    while True:
+        response = await redis.xread(
+            {settings.PROFILE_EVENTS_STREAM: last_id}, count=batch_size, block=block_ms
+        )
+        for _stream, entries in response:
+            for entry_id, fields in entries:
+                last_id = entry_id.decode() if isinstance(entry_id, bytes) else entry_id
+                yield last_id, ProfileEvent.model_validate_json(fields[EVENT_FIELD])
@@ -0,0 +1,113 @@
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import asdict, dataclass
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+# Between probe rounds the loop wakes this often to measure how late its sleeps end.
+LAG_SAMPLE_SECONDS = 0.25
+
+
+@dataclass(frozen=True)
+class ProbeResult:
+    ok: bool
+    latency_ms: float
+    checked_at: float  # wall-clock time, so it can be compared across workers
+    error: str | None = None
+
+
+class DependencyProber:
+    """
+    Checks dependencies in the background and keeps the latest result of each.
+
+    Every `interval` seconds each probe runs concurrently with a `timeout`; health endpoints
+    only read the cached results, so probe traffic never reaches a dependency and costs
+    nothing however often Kubernetes polls. A result older than `max_age` counts as failed,
+    which catches a prober that got stuck. Between rounds the prober measures how late its
+    sleeps wake up and reports the worst delay as event-loop lag, a direct sign of blocking
+    code or CPU starvation.
+    """
+
+    def __init__(
+        self,
+        probes: dict[str, Callable[[], Awaitable[Any]]],
+        interval: float = 5.0,
+        timeout: float = 2.0,
+        max_age: float = 30.0,
+    ):
+        self.probes = probes
+        self.interval = interval
+        self.timeout = timeout
+        self.max_age = max_age
+        self.results: dict[str, ProbeResult] = {}
+        self.event_loop_lag_ms = 0.0
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run(), name="dependency-prober")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _probe(self, name: str, probe: Callable[[], Awaitable[Any]]) -> None:
+        started = time.perf_counter()
+        error = None
+        try:
+            await asyncio.wait_for(probe(), timeout=self.timeout)
+        except TimeoutError:
+            error = f"timed out after {self.timeout}s"
+        except Exception as e:
+            error = str(e) or type(e).__name__
+        latency_ms = (time.perf_counter() - started) * 1000
+        previous = self.results.get(name)
+        if error is not None and (previous is None or previous.ok):
+            logger.warning(f"Dependency '{name}' became unhealthy: {error}")
+        self.results[name] = ProbeResult(error is None, latency_ms, time.time(), error)
+
+    async def probe_all(self) -> None:
+        await asyncio.gather(*(self._probe(name, probe) for name, probe in self.probes.items()))
+
+    def is_healthy(self, name: str) -> bool:
+        result = self.results.get(name)
+        return result is not None and result.ok and time.time() - result.checked_at <= self.max_age
+
+    def snapshot(self) -> dict[str, Any]:
+        dependencies = {}
+        for name in self.probes:
+            result = self.results.get(name)
+            dependencies[name] = (
+                {**asdict(result), "ok": self.is_healthy(name)}
+                if result is not None
+                else {"ok": False, "error": "not probed yet"}
+            )
+        return {"dependencies": dependencies, "event_loop_lag_ms": self.event_loop_lag_ms}
+
+    async def _measure_lag(self, duration: float) -> float:
+        """Sleeps for `duration` in short steps and returns the worst wake-up delay in ms."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + duration
+        worst = 0.0
+        while (remaining := deadline - loop.time()) > 0:
+            step = min(LAG_SAMPLE_SECONDS, remaining)
+            started = loop.time()
+            await asyncio.sleep(step)
+            worst = max(worst, loop.time() - started - step)
+        return worst * 1000
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.probe_all()
+            except Exception as e:
+                logger.error(f"Dependency probing failed: {e}")
+            self.event_loop_lag_ms = await self._measure_lag(self.interval)
@@ -0,0 +1,236 @@
+import asyncio
+import logging
+from array import array
+from collections.abc import Awaitable, Callable
+
+import redis.asyncio as aioredis
+from redis.asyncio.cluster import RedisCluster
+
+from .config import settings
+from .redis_client import redis_breaker
+
+logger = logging.getLogger(__name__)
+
+# Sorted set of recently hot keys shared by all instances, read to pre-warm at startup.
+HOT_KEYS_REDIS_KEY = "profile:hot"
+HOT_KEYS_REDIS_TTL_SECONDS = 3600
+# TTL reported for a key that doesn't exist.
+TTL_MISSING = -2
+
+
+class CountMinSketch:
+    """
+    Approximate per-key counters in `width * depth` fixed-size cells.
+
+    Every key increments one cell per row; its estimate is the smallest of those cells. Hash
+    collisions can only inflate an estimate, never deflate it.
+    """
+
+    def __init__(self, width: int, depth: int):
+        self.width = width
+        self.depth = depth
+        self._rows = [array("I", bytes(4 * width)) for _ in range(depth)]
+
+    @property
+    def nbytes(self) -> int:
+        return sum(row.itemsize * len(row) for row in self._rows)
+
+    def _cells(self, key: str) -> list[int]:
+        # str hashes are salted per process, which is fine for counters that never leave it.
+        return [hash((seed, key)) % self.width for seed in range(self.depth)]
+
+    def add(self, key: str) -> int:
+        """Counts one occurrence of `key` and returns its new estimate."""
+        estimate = None
+        for row, cell in zip(self._rows, self._cells(key)):
+            row[cell] += 1
+            estimate = row[cell] if estimate is None else min(estimate, row[cell])
+        return estimate or 0
+
+    def estimate(self, key: str) -> int:
+        return min(row[cell] for row, cell in zip(self._rows, self._cells(key)))
+
+    def halve(self) -> None:
+        for row in self._rows:
+            for cell, count in enumerate(row):
+                if count:
+                    row[cell] = count >> 1
+
+
+class HotKeyTracker:
+    """
+    Heavy-hitter detection: a Count-Min Sketch plus the `capacity` keys with the highest counts.
+
+    Memory is bounded by the sketch size and `capacity`, however many distinct keys are seen.
+    Every `decay_every` recorded accesses all counts are halved, so keys that stop being read
+    fall out of the top list.
+    """
+
+    def __init__(self, capacity: int, width: int, depth: int, decay_every: int):
+        self.capacity = capacity
+        self.decay_every = decay_every
+        self.sketch = CountMinSketch(width, depth)
+        self._top: dict[str, int] = {}
+        # A lower bound of the smallest count in `_top`; checking it keeps most accesses O(1).
+        self._floor = 0
+        self._recorded = 0
+
+    def record(self, key: str) -> None:
+        estimate = self.sketch.add(key)
+        if key in self._top or len(self._top) < self.capacity:
+            self._top[key] = estimate
+        elif estimate > self._floor:
+            coldest = min(self._top, key=self._top.__getitem__)
+            self._floor = self._top[coldest]
+            if estimate > self._floor:
+                del self._top[coldest]
+                self._top[key] = estimate
+        self._recorded += 1
+        if self._recorded >= self.decay_every:
+            self.decay()
+
+    def seed(self, counts: dict[str, int]) -> None:
+        """Adds keys known to be hot elsewhere, e.g. by other instances, if there is room."""
+        for key, count in counts.items():
+            if len(self._top) >= self.capacity:
+                break
+            self._top.setdefault(key, count)
+
+    def decay(self) -> None:
+        self.sketch.halve()
+        self._top = {key: count >> 1 for key, count in self._top.items() if count >> 1}
+        self._floor = 0
+        self._recorded = 0
+
+    def hot(self, limit: int | None = None, min_count: int = 1) -> list[tuple[str, int]]:
+        """Returns the hottest keys with their approximate counts, hottest first."""
+        ranked = sorted(self._top.items(), key=lambda item: item[1], reverse=True)
+        return [(key, count) for key, count in ranked[:limit] if count >= min_count]
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "tracked": len(self._top),
+            "capacity": self.capacity,
+            "sketch_bytes": self.sketch.nbytes,
+            "recorded_since_decay": self._recorded,
+        }
+
+
+hot_profiles = HotKeyTracker(
+    settings.HOT_PROFILES_CAPACITY,
+    width=settings.HOT_PROFILES_SKETCH_WIDTH,
+    depth=settings.HOT_PROFILES_SKETCH_DEPTH,
+    decay_every=settings.HOT_PROFILES_DECAY_EVERY,
+)
+
+
+class HotKeyRefresher:
+    """
+    Re-renders cache entries of hot keys shortly before they expire, so the hottest profiles
+    never miss.
+
+    Every `interval` seconds the TTLs of the hottest keys are checked in one round trip and at
+    most `batch_size` entries with less than `refresh_ahead` seconds left are refreshed through
+    `refresh`, which bounds the extra database load. The hot list is also published to Redis so
+    that freshly started instances can pre-warm it with `warm`.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        tracker: HotKeyTracker,
+        redis: aioredis.Redis | RedisCluster,
+        refresh: Callable[[str], Awaitable[None]],
+        cache_key: Callable[[str], str],
+        *,
+        interval: float = 5.0,
+        refresh_ahead: float = 15.0,
+        batch_size: int = 20,
+        min_count: int = 10,
+    ):
+        self.tracker = tracker
+        self.redis = redis
+        self.refresh = refresh
+        self.cache_key = cache_key
+        self.interval = interval
+        self.refresh_ahead = refresh_ahead
+        self.batch_size = batch_size
+        self.min_count = min_count
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run(), name="hot-key-refresher")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _expiring(self, keys: list[str]) -> list[str]:
+        """Returns the keys whose cache entries are missing or expire within `refresh_ahead`."""
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for key in keys:
+                pipe.ttl(self.cache_key(key))
+            ttls = await pipe.execute()
+        # An entry without expiry (TTL -1) is never refreshed.
+        return [
+            key
+            for key, ttl in zip(keys, ttls)
+            if ttl == TTL_MISSING or 0 <= ttl < self.refresh_ahead
+        ]
+
+    async def _refresh_all(self, keys: list[str]) -> int:
+        results = await asyncio.gather(*(self.refresh(key) for key in keys), return_exceptions=True)
+        for key, result in zip(keys, results):
+            if isinstance(result, Exception):
+                logger.error(f"Refreshing hot key '{key}' failed: {result}")
+        return sum(not isinstance(result, Exception) for result in results)
+
+    async def _publish(self, hot: list[tuple[str, int]]) -> None:
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.zadd(HOT_KEYS_REDIS_KEY, dict(hot))
+            pipe.zremrangebyrank(HOT_KEYS_REDIS_KEY, 0, -self.tracker.capacity - 1)
+            pipe.expire(HOT_KEYS_REDIS_KEY, HOT_KEYS_REDIS_TTL_SECONDS)
+            await pipe.execute()
+
+    async def refresh_once(self) -> int:
+        """Refreshes the expiring entries among the hottest keys and returns how many."""
+        hot = self.tracker.hot(min_count=self.min_count)
+        if not hot:
+            return 0
+        await redis_breaker.call(self._publish, hot)
+        expiring = await redis_breaker.call(self._expiring, [key for key, _count in hot])
+        return await self._refresh_all(expiring[: self.batch_size])
+
+    async def warm(self, count: int) -> int:
+        """Seeds the tracker with the hot keys published by any instance and fills their entries."""
+        if count <= 0:
+            # ZREVRANGE 0 -1 would return the whole set.
+            return 0
+        published = await redis_breaker.call(
+            self.redis.zrevrange, HOT_KEYS_REDIS_KEY, 0, count - 1, withscores=True
+        )
+        counts = {key.decode(): int(score) for key, score in published}
+        if not counts:
+            return 0
+        self.tracker.seed(counts)
+        expiring = await redis_breaker.call(self._expiring, list(counts))
+        warmed = 0
+        for start in range(0, len(expiring), self.batch_size):
+            warmed += await self._refresh_all(expiring[start : start + self.batch_size])
+        logger.info(f"Warmed {warmed} of {len(counts)} hot cache entries")
+        return warmed
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                refreshed = await self.refresh_once()
+                if refreshed:
+                    logger.debug(f"Refreshed {refreshed} hot cache entries ahead of expiry")
+            except Exception as e:
+                logger.warning(f"Hot key refresh failed: {e}")
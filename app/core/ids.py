@@ -0,0 +1,45 @@
+import os
+import threading
+import time
+import uuid
+
+_lock = threading.Lock()
+_last_timestamp_ms = 0
+_counter = 0
+
+_COUNTER_BITS = 12
+_MAX_COUNTER = (1 << _COUNTER_BITS) - 1
+
+
+def uuid7() -> uuid.UUID:
+    """
+    Generates a time-ordered UUID version 7 (RFC 9562).
+
+    The 48-bit millisecond timestamp leads, so new keys land at the right edge of the
+    primary-key B-tree. The 12-bit `rand_a` field is a counter that keeps keys generated
+    in the same millisecond monotonic within this process.
+    """
+    global _last_timestamp_ms, _counter  # noqa: PLW0603
+
+    with _lock:
+        timestamp_ms = time.time_ns() // 1_000_000
+        if timestamp_ms > _last_timestamp_ms:
+            _last_timestamp_ms = timestamp_ms
+            _counter = int.from_bytes(os.urandom(2)) & (_MAX_COUNTER >> 1)
+        else:
+            # Same millisecond (or the clock went backwards): advance the counter, and borrow
+            # the next millisecond once it overflows.
+            _counter += 1
+            if _counter > _MAX_COUNTER:
+                _last_timestamp_ms += 1
+                _counter = 0
+            timestamp_ms = _last_timestamp_ms
+        counter = _counter
+
+    rand_b = int.from_bytes(os.urandom(8)) & ((1 << 62) - 1)
+    value = (timestamp_ms & ((1 << 48) - 1)) << 80
+    value |= 0x7 << 76
+    value |= counter << 64
+    value |= 0b10 << 62
+    value |= rand_b
+    return uuid.UUID(int=value)
@@ -0,0 +1,181 @@
+import asyncio
+import logging
+import math
+import time
+from collections import deque
+from collections.abc import Callable
+
+from fastapi import status
+from fastapi.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+
+class LimitExceededError(Exception):
+    """Raised when a request finds both the concurrency limit and the wait queue full."""
+
+
+class AdaptiveLimiter:
+    """
+    Caps concurrent requests at a limit that follows observed latency (gradient algorithm).
+
+    A long-term average latency tracks what the service normally achieves and a short-term
+    one what it achieves right now. When the short-term latency rises above `tolerance` times
+    the long-term one, requests are queueing somewhere downstream (the DB pool, S3), so the
+    limit shrinks proportionally; otherwise it grows by about sqrt(limit). Requests over the
+    limit wait up to `queue_timeout` seconds in a queue of `max_queue`; beyond that they are
+    rejected so the service fails fast instead of slowing down for everyone.
+    """
+
+    tolerance = 1.5
+    smoothing = 0.2
+    short_window = 10
+    long_window = 600
+
+    def __init__(  # noqa: PLR0913
+        self,
+        name: str,
+        *,
+        initial_limit: int = 20,
+        min_limit: int = 2,
+        max_limit: int = 200,
+        max_queue: int = 50,
+        queue_timeout: float = 1.0,
+    ):
+        self.name = name
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.limit = float(initial_limit)
+        self.in_flight = 0
+        self._short_rtt = 0.0
+        self._long_rtt = 0.0
+        self._waiters: deque[asyncio.Future[None]] = deque()
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self) -> None:
+        if self.in_flight < int(self.limit) and not self._waiters:
+            self.in_flight += 1
+            return
+        if len(self._waiters) >= self.max_queue:
+            raise LimitExceededError(f"Limiter '{self.name}' queue is full")
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            # The slot is handed over by release(), which counts it as in flight.
+            await asyncio.wait_for(asyncio.shield(waiter), timeout=self.queue_timeout)
+        except TimeoutError:
+            if waiter.done():
+                return
+            self._waiters.remove(waiter)
+            raise LimitExceededError(f"Limiter '{self.name}' queue wait timed out") from None
+        except asyncio.CancelledError:
+            if waiter.done():
+                self.release()
+            else:
+                self._waiters.remove(waiter)
+            raise
+
+    def release(self, rtt: float | None = None) -> None:
+        """Frees a slot. `rtt` is the request latency in seconds, if it should be sampled."""
+        if rtt is not None:
+            self._update(rtt)
+        self.in_flight -= 1
+        while self._waiters and self.in_flight < int(self.limit):
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.in_flight += 1
+                waiter.set_result(None)
+
+    def _update(self, rtt: float) -> None:
+        if self._long_rtt == 0.0:
+            self._short_rtt = self._long_rtt = rtt
+            return
+        self._short_rtt += (rtt - self._short_rtt) * 2 / (self.short_window + 1)
+        self._long_rtt += (rtt - self._long_rtt) / self.long_window
+        # After a sustained slowdown the long-term average has crept up; let it recover.
+        if self._long_rtt / self._short_rtt > 2:  # noqa: PLR2004
+            self._long_rtt *= 0.95
+        # Little traffic says nothing about how much more the service could take.
+        if self.in_flight < self.limit / 2:
+            return
+        gradient = max(0.5, min(1.0, self.tolerance * self._long_rtt / self._short_rtt))
+        new_limit = self.limit * gradient + math.sqrt(self.limit)
+        new_limit = self.limit * (1 - self.smoothing) + new_limit * self.smoothing
+        self.limit = max(self.min_limit, min(self.max_limit, new_limit))
+
+    def stats(self) -> dict[str, float | int]:
+        return {
+            "limit": int(self.limit),
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "short_rtt_ms": round(self._short_rtt * 1000, 2),
+            "long_rtt_ms": round(self._long_rtt * 1000, 2),
+        }
+
+
+class LoadSheddingMiddleware:
+    """
+    Limits in-flight requests per route class and sheds the excess with 503 + Retry-After.
+
+    `classify` maps an HTTP scope to a limiter name; None (or an exempt path such as a health
+    check) bypasses limiting. Latency is sampled when the response starts, so a long-running
+    stream holds its slot without skewing the limit.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        *,
+        limiters: dict[str, AdaptiveLimiter],
+        classify: Callable[[Scope], str | None],
+        exempt_paths: frozenset[str] = frozenset(),
+        retry_after: int = 1,
+    ):
+        self.app = app
+        self.limiters = limiters
+        self.classify = classify
+        self.exempt_paths = exempt_paths
+        self.retry_after = retry_after
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        path = scope["path"].removeprefix(scope.get("root_path", "")) or "/"
+        limiter_name = None if path in self.exempt_paths else self.classify(scope)
+        if limiter_name is None:
+            await self.app(scope, receive, send)
+            return
+
+        limiter = self.limiters[limiter_name]
+        try:
+            await limiter.acquire()
+        except LimitExceededError as e:
+            logger.warning(f"Shedding {scope['method']} {path}: {e}")
+            response = JSONResponse(
+                {"detail": "Service is overloaded, retry later."},
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                headers={"Retry-After": str(self.retry_after)},
+            )
+            await response(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        rtt: float | None = None
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal rtt
+            if message["type"] == "http.response.start":
+                rtt = time.perf_counter() - started
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            limiter.release(rtt)
@@ -0,0 +1,133 @@
+import gc
+import linecache
+import os
+import resource
+import sys
+import tracemalloc
+from collections import Counter
+from pathlib import Path
+from typing import Any
+
+PROC_STATUS = Path("/proc/self/status")
+
+# Allocations made while importing modules or by tracemalloc itself aren't leaks.
+TRACE_FILTERS = [
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, linecache.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+]
+
+
+class TracingStateError(Exception):
+    """Raised when tracing is started twice, or diffed or stopped while not running."""
+
+
+def _location(frame: tracemalloc.Frame) -> str:
+    filename = frame.filename
+    for prefix in sorted(sys.path, key=len, reverse=True):
+        if prefix and filename.startswith(prefix + os.sep):
+            filename = filename.removeprefix(prefix + os.sep)
+            break
+    return f"{filename}:{frame.lineno}"
+
+
+class MemoryTracer:
+    """
+    Starts and stops `tracemalloc` and diffs the live heap against a baseline snapshot.
+
+    Tracing slows allocations down noticeably and its traces take memory of their own, so it
+    only runs between `start` and `stop`; the baseline is the heap when tracing started.
+    """
+
+    def __init__(self):
+        self._baseline: tracemalloc.Snapshot | None = None
+
+    @property
+    def tracing(self) -> bool:
+        return tracemalloc.is_tracing()
+
+    @staticmethod
+    def _snapshot() -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces(TRACE_FILTERS)
+
+    def start(self, frames: int = 1) -> None:
+        if self.tracing:
+            raise TracingStateError("Memory tracing is already running in this worker")
+        tracemalloc.start(frames)
+        self._baseline = self._snapshot()
+
+    def stop(self) -> None:
+        if not self.tracing:
+            raise TracingStateError("Memory tracing is not running in this worker")
+        tracemalloc.stop()
+        self._baseline = None
+
+    def diff(self, limit: int = 20, reset: bool = False) -> dict[str, Any]:
+        """
+        Lists the source lines whose live allocations grew most since the baseline.
+
+        With `reset` the current heap becomes the new baseline, so consecutive calls show the
+        growth between them.
+        """
+        if not self.tracing or self._baseline is None:
+            raise TracingStateError("Memory tracing is not running in this worker")
+        snapshot = self._snapshot()
+        stats = snapshot.compare_to(self._baseline, "lineno")
+        if reset:
+            self._baseline = snapshot
+        current, peak = tracemalloc.get_traced_memory()
+        return {
+            "traced_bytes": current,
+            "traced_peak_bytes": peak,
+            "tracemalloc_overhead_bytes": tracemalloc.get_tracemalloc_memory(),
+            "top": [
+                {
+                    "location": _location(stat.traceback[0]),
+                    "size_diff_bytes": stat.size_diff,
+                    "size_bytes": stat.size,
+                    "count_diff": stat.count_diff,
+                    "count": stat.count,
+                }
+                for stat in stats[:limit]
+            ],
+        }
+
+
+memory_tracer = MemoryTracer()
+
+
+def process_memory() -> dict[str, int]:
+    """Current and peak resident set size of this process."""
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS.
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    stats = {"peak_rss_bytes": peak if sys.platform == "darwin" else peak * 1024}
+    try:
+        for line in PROC_STATUS.read_text().splitlines():
+            if line.startswith("VmRSS:"):
+                stats["rss_bytes"] = int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return stats
+
+
+def gc_stats() -> dict[str, Any]:
+    return {
+        "counts": gc.get_count(),
+        "thresholds": gc.get_threshold(),
+        "generations": gc.get_stats(),
+        "uncollectable": len(gc.garbage),
+        "frozen": gc.get_freeze_count(),
+    }
+
+
+def object_counts(limit: int = 30) -> list[dict[str, Any]]:
+    """
+    Counts live objects tracked by the garbage collector by type, most common first.
+
+    Only containers are tracked, so ints and strings don't appear, but sessions, model
+    instances, upload files and HTTP responses do.
+    """
+    counts = Counter(f"{type(obj).__module__}.{type(obj).__qualname__}" for obj in gc.get_objects())
+    return [{"type": name, "count": count} for name, count in counts.most_common(limit)]
@@ -0,0 +1,59 @@
+"""
+Checks whether the database schema is at the Alembic head revision.
+
+    python -m app.core.migrations  # exits with 0 when at head, 1 otherwise
+
+`entrypoint.sh` uses it to skip `alembic upgrade head`, which loads the whole application,
+when a container restarts or scales out and there is nothing to migrate.
+"""
+
+import asyncio
+import logging
+import sys
+from pathlib import Path
+
+import asyncpg
+from alembic.config import Config
+from alembic.script import ScriptDirectory
+
+from .database import get_asyncpg_dsn
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
+
+def get_head_revisions() -> set[str]:
+    config = Config(str(PROJECT_ROOT / "alembic.ini"))
+    config.set_main_option("script_location", str(PROJECT_ROOT / "app" / "alembic"))
+    return set(ScriptDirectory.from_config(config).get_heads())
+
+
+async def get_current_revisions(dsn: str) -> set[str]:
+    conn = await asyncpg.connect(dsn)
+    try:
+        rows = await conn.fetch("SELECT version_num FROM alembic_version")
+    except asyncpg.UndefinedTableError:
+        return set()
+    finally:
+        await conn.close()
+    return {row["version_num"] for row in rows}
+
+
+def main() -> int:
+    logging.basicConfig(level=logging.INFO)
+    heads = get_head_revisions()
+    try:
+        current = asyncio.run(get_current_revisions(get_asyncpg_dsn()))
+    except Exception as e:
+        logger.warning(f"Could not read the current schema revision: {e}")
+        return 1
+    if current != heads:
+        logger.info(f"Schema revision {sorted(current)} differs from head {sorted(heads)}")
+        return 1
+    logger.info(f"Schema is at head {sorted(heads)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
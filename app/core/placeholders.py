@@ -0,0 +1,43 @@
+import base64
+import io
+import logging
+import warnings
+
+logger = logging.getLogger(__name__)
+
+PLACEHOLDER_MAX_SIDE = 16
+PLACEHOLDER_QUALITY = 30
+PLACEHOLDER_MAX_LENGTH = 1024
+
+
+def build_avatar_placeholder(contents: bytes) -> str | None:
+    """
+    Renders an image as a tiny inline WebP (a `data:` URI of a few hundred bytes at most).
+
+    Clients show it, scaled up and blurred, until the full avatar arrives. CPU bound, so call it
+    off the event loop. Returns None for content that can't be decoded as an image.
+    """
+    # Imported here rather than at module level: only avatar writes need Pillow, so the
+    # application doesn't load it at startup.
+    from PIL import Image, ImageOps  # noqa: PLC0415
+
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("error", Image.DecompressionBombWarning)
+            with Image.open(io.BytesIO(contents)) as image:
+                # Lets JPEG decode at a fraction of the size instead of in full.
+                image.draft("RGB", (PLACEHOLDER_MAX_SIDE, PLACEHOLDER_MAX_SIDE))
+                thumbnail = ImageOps.exif_transpose(image)
+                thumbnail.thumbnail((PLACEHOLDER_MAX_SIDE, PLACEHOLDER_MAX_SIDE))
+                has_alpha = "A" in thumbnail.getbands() or "transparency" in thumbnail.info
+                thumbnail = thumbnail.convert("RGBA" if has_alpha else "RGB")
+        buffer = io.BytesIO()
+        thumbnail.save(buffer, format="WEBP", quality=PLACEHOLDER_QUALITY, method=6)
+    except Exception as e:
+        # Pillow's decoders raise a range of exception types for malformed input.
+        logger.warning(f"Could not build an avatar placeholder: {e}")
+        return None
+    placeholder = "data:image/webp;base64," + base64.b64encode(buffer.getvalue()).decode()
+    if len(placeholder) > PLACEHOLDER_MAX_LENGTH:
+        return None
+    return placeholder
@@ -0,0 +1,176 @@
+import asyncio
+import logging
+import math
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+import redis.asyncio as aioredis
+
+from .circuit_breaker import CircuitOpenError
+from .config import settings
+from .redis_client import redis_breaker
+
+logger = logging.getLogger(__name__)
+
+# Refills the bucket for the time elapsed since it was last touched, then takes one token if
+# there is one. Redis' own clock is used so that every instance agrees on elapsed time.
+# Returns {allowed, tokens left}; tokens are a string because Lua numbers become integers.
+TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1]) or capacity
+local ts = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil((capacity - tokens) / rate * 1000) + 1000)
+return {allowed, tostring(tokens)}
+"""
+
+# Gives back a token taken by TOKEN_BUCKET_SCRIPT; a bucket that expired meanwhile is full.
+REFUND_TOKEN_SCRIPT = """
+local tokens = tonumber(redis.call('HGET', KEYS[1], 'tokens'))
+if tokens then
+    redis.call('HSET', KEYS[1], 'tokens', tostring(math.min(tonumber(ARGV[1]), tokens + 1)))
+end
+"""
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    """A token bucket holding up to `capacity` requests, refilled over `period` seconds."""
+
+    key: str
+    capacity: int
+    period: float
+
+    @property
+    def rate(self) -> float:
+        return self.capacity / self.period
+
+
+@dataclass(frozen=True)
+class RateLimitDecision:
+    allowed: bool
+    limit: RateLimit
+    tokens: float
+
+    @property
+    def retry_after(self) -> int:
+        return 0 if self.allowed else math.ceil((1 - self.tokens) / self.limit.rate)
+
+    def headers(self) -> dict[str, str]:
+        """IETF `RateLimit-*` headers, plus `Retry-After` when the request is rejected."""
+        headers = {
+            "RateLimit-Limit": str(self.limit.capacity),
+            "RateLimit-Remaining": str(math.floor(self.tokens)),
+            "RateLimit-Reset": str(
+                math.ceil((self.limit.capacity - self.tokens) / self.limit.rate)
+            ),
+        }
+        if not self.allowed:
+            headers["Retry-After"] = str(self.retry_after)
+        return headers
+
+
+class LocalTokenBuckets:
+    """
+    In-process token buckets used while Redis is unavailable.
+
+    Limits are enforced per worker instead of globally, which is looser but keeps a single
+    client from saturating the pod. The least recently used buckets are dropped past `max_keys`.
+    """
+
+    def __init__(self, max_keys: int = 10_000):
+        self.max_keys = max_keys
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+
+    def consume(self, limit: RateLimit) -> RateLimitDecision:
+        now = time.monotonic()
+        tokens, updated_at = self._buckets.pop(limit.key, (limit.capacity, now))
+        tokens = min(limit.capacity, tokens + (now - updated_at) * limit.rate)
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        self._buckets[limit.key] = (tokens, now)
+        if len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return RateLimitDecision(allowed, limit, tokens)
+
+    def refund(self, limit: RateLimit) -> None:
+        if limit.key in self._buckets:
+            tokens, updated_at = self._buckets[limit.key]
+            self._buckets[limit.key] = (min(limit.capacity, tokens + 1), updated_at)
+
+    def stats(self) -> dict[str, int]:
+        return {"buckets": len(self._buckets), "max_keys": self.max_keys}
+
+
+local_buckets = LocalTokenBuckets(settings.RATE_LIMIT_LOCAL_MAX_KEYS)
+
+
+async def _consume_in_redis(
+    redis: aioredis.Redis, limits: list[RateLimit]
+) -> list[RateLimitDecision]:
+    script = redis.register_script(TOKEN_BUCKET_SCRIPT)
+    results = await asyncio.gather(
+        *(script(keys=[limit.key], args=[limit.capacity, limit.rate]) for limit in limits)
+    )
+    decisions = [
+        RateLimitDecision(bool(allowed), limit, float(tokens))
+        for limit, (allowed, tokens) in zip(limits, results, strict=True)
+    ]
+    if not all(decision.allowed for decision in decisions):
+        refund = redis.register_script(REFUND_TOKEN_SCRIPT)
+        await asyncio.gather(
+            *(
+                refund(keys=[decision.limit.key], args=[decision.limit.capacity])
+                for decision in decisions
+                if decision.allowed
+            )
+        )
+    return decisions
+
+
+def _consume_locally(limits: list[RateLimit]) -> list[RateLimitDecision]:
+    decisions = [local_buckets.consume(limit) for limit in limits]
+    if not all(decision.allowed for decision in decisions):
+        for decision in decisions:
+            if decision.allowed:
+                local_buckets.refund(decision.limit)
+    return decisions
+
+
+async def consume(redis: aioredis.Redis | None, limits: list[RateLimit]) -> RateLimitDecision:
+    """
+    Takes a token from each bucket concurrently and returns the deciding one.
+
+    That is the bucket with the longest wait if any rejected the request, otherwise the one
+    with the fewest tokens left, so response headers describe the tightest limit. A rejected
+    request gives its tokens back to the buckets that allowed it, so retrying against one
+    exhausted limit doesn't drain the others. The buckets live on different cluster nodes
+    (a client's IP bucket is shared with other users), so they can't be checked in one script.
+    """
+    decisions: list[RateLimitDecision] | None = None
+    if redis is not None:
+        try:
+            decisions = await redis_breaker.call(_consume_in_redis, redis, limits)
+        except CircuitOpenError:
+            logger.debug("Redis circuit open, rate limiting locally")
+        except Exception as e:
+            logger.warning(f"Rate limiting in Redis failed, limiting locally: {e}")
+    if decisions is None:
+        decisions = _consume_locally(limits)
+
+    rejected = [decision for decision in decisions if not decision.allowed]
+    if rejected:
+        return max(rejected, key=lambda decision: decision.retry_after)
+    return min(decisions, key=lambda decision: decision.tokens)
@@ -1,15 +1,117 @@
 import logging
+from collections import defaultdict
+from collections.abc import Iterable
 
-from fastapi import HTTPException, Request, status
+import redis.asyncio as aioredis
+from fastapi import Request
+from redis.asyncio.cluster import RedisCluster
+from redis.asyncio.sentinel import Sentinel
+from redis.crc import key_slot
+
+from .circuit_breaker import CircuitBreaker
+from .config import settings
 
 logger = logging.getLogger(__name__)
 
+redis_breaker = CircuitBreaker(
+    "redis",
+    failure_threshold=settings.REDIS_FAILURE_THRESHOLD,
+    recovery_timeout=settings.REDIS_RECOVERY_SECONDS,
+    call_timeout=settings.REDIS_SOCKET_TIMEOUT,
+)
+
+
+def _parse_hosts(hosts: str) -> list[tuple[str, int]]:
+    """Parses comma-separated `host:port` pairs, defaulting to the Sentinel port."""
+    parsed = []
+    for entry in filter(None, (part.strip() for part in hosts.split(","))):
+        host, _, port = entry.rpartition(":") if ":" in entry else (entry, "", "26379")
+        parsed.append((host, int(port)))
+    return parsed
+
 
-async def get_redis_client(request: Request):
-    if not hasattr(request.app.state, "redis_client") or request.app.state.redis_client is None:
-        logger.error("Redis client not found in application state.")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Redis service is not available.",
+def create_redis_client(block: float = 0.0) -> aioredis.Redis | RedisCluster:
+    """
+    Creates a Redis client for the configured `REDIS_MODE`, with short socket timeouts so
+    outages fail fast. Cluster and Sentinel clients follow failovers and resharding on their own.
+
+    Clients for blocking reads such as `XREADGROUP ... BLOCK` pass the longest time a command
+    blocks as `block` seconds; it is added to the socket timeout, which would otherwise end
+    every read of an idle stream with a timeout error.
+    """
+    sentinel_timeouts = {
+        "socket_timeout": settings.REDIS_SOCKET_TIMEOUT,
+        "socket_connect_timeout": settings.REDIS_SOCKET_TIMEOUT,
+    }
+    timeouts = {**sentinel_timeouts, "socket_timeout": settings.REDIS_SOCKET_TIMEOUT + block}
+    if settings.REDIS_MODE == "cluster":
+        if settings.REDIS_DATABASE != 0:
+            raise ValueError("Redis Cluster only has database 0, set REDIS_DATABASE=0")
+        return RedisCluster(host=settings.REDIS_HOST, port=settings.REDIS_PORT, **timeouts)
+    if settings.REDIS_MODE == "sentinel":
+        sentinels = _parse_hosts(settings.REDIS_SENTINEL_HOSTS)
+        if not sentinels:
+            raise ValueError("REDIS_SENTINEL_HOSTS is required in sentinel mode")
+        sentinel = Sentinel(sentinels, sentinel_kwargs=sentinel_timeouts)
+        return sentinel.master_for(
+            settings.REDIS_SENTINEL_SERVICE, db=settings.REDIS_DATABASE, **timeouts
         )
-    return request.app.state.redis_client
+    redis_url = f"redis://{settings.REDIS_HOST}:{settings.REDIS_PORT}/{settings.REDIS_DATABASE}"
+    return aioredis.from_url(redis_url, **timeouts)
+
+
+def batch_keys(
+    redis: aioredis.Redis | RedisCluster, keys: Iterable[str], batch_size: int
+) -> list[list[str]]:
+    """
+    Splits keys into batches of at most `batch_size` for multi-key commands.
+
+    A cluster only accepts multi-key commands within one hash slot, so there every batch
+    holds keys of a single slot.
+    """
+    keys = list(keys)
+    groups: Iterable[list[str]] = [keys]
+    if isinstance(redis, RedisCluster):
+        by_slot: defaultdict[int, list[str]] = defaultdict(list)
+        for key in keys:
+            by_slot[key_slot(key.encode())].append(key)
+        groups = by_slot.values()
+    return [
+        group[start : start + batch_size]
+        for group in groups
+        for start in range(0, len(group), batch_size)
+    ]
+
+
+async def get_many(redis: aioredis.Redis | RedisCluster, keys: list[str]) -> list[bytes | None]:
+    """Reads several keys in one round trip per node, in the order given."""
+    if not keys:
+        return []
+    if isinstance(redis, RedisCluster):
+        # Sends one MGET per slot, to all nodes concurrently.
+        return await redis.mget_nonatomic(keys)
+    return await redis.mget(keys)
+
+
+def get_pool_stats(redis: aioredis.Redis | RedisCluster) -> dict[str, int]:
+    """Counts the client's pooled connections; redis-py keeps them in private attributes."""
+    if isinstance(redis, RedisCluster):
+        nodes = redis.get_nodes()
+        return {
+            "nodes": len(nodes),
+            "connections": sum(len(node._connections) for node in nodes),
+            "idle": sum(len(node._free) for node in nodes),
+        }
+    pool = redis.connection_pool
+    return {
+        "in_use": len(pool._in_use_connections),
+        "idle": len(pool._available_connections),
+        "max_connections": pool.max_connections,
+    }
+
+
+async def get_redis_client(request: Request) -> aioredis.Redis | None:
+    redis_client = getattr(request.app.state, "redis_client", None)
+    if redis_client is None:
+        logger.warning("Redis client not found in application state. Serving without cache.")
+    return redis_client
@@ -1,14 +1,43 @@
+import asyncio
 import logging
 import mimetypes
 import uuid
-from contextlib import asynccontextmanager
+from contextlib import AsyncExitStack, asynccontextmanager
 
-import aioboto3
 from botocore.exceptions import BotoCoreError, ClientError
 
+from .circuit_breaker import CircuitBreaker
+from .config import settings
+
 logger = logging.getLogger(__name__)
 
 
+class S3ObjectNotFoundError(Exception):
+    """Raised when the requested object does not exist in the bucket."""
+
+
+class S3ObjectNotModifiedError(Exception):
+    """Raised when a conditional read finds the caller's copy of the object current."""
+
+
+class S3RangeNotSatisfiableError(Exception):
+    """Raised when a ranged read starts beyond the end of the object."""
+
+
+s3_breaker = CircuitBreaker(
+    "s3",
+    failure_threshold=settings.S3_FAILURE_THRESHOLD,
+    recovery_timeout=settings.S3_RECOVERY_SECONDS,
+    call_timeout=settings.S3_TIMEOUT_SECONDS,
+    excluded_exceptions=(
+        ValueError,
+        S3ObjectNotFoundError,
+        S3ObjectNotModifiedError,
+        S3RangeNotSatisfiableError,
+    ),
+)
+
+
 class S3Client:
     """
     AWS Client
@@ -29,21 +58,64 @@ class S3Client:
         self.bucket_name = BUCKET_NAME
         self.region_name = REGION_NAME
 
+        # Imported here rather than at module level: aioboto3 pulls in aiobotocore and aiohttp,
+        # the largest share of the application's import time.
+        import aioboto3  # noqa: PLC0415
+
         # Creating async session
         self.session = aioboto3.Session(
             aws_access_key_id=self.aws_access_key_id,
             aws_secret_access_key=self.aws_secret_access_key,
             region_name=self.region_name,
         )
+        self._exit_stack: AsyncExitStack | None = None
+        self._client = None
+        self._connect_lock = asyncio.Lock()
         logger.info(
             f"S3Client initialized for bucket '{self.bucket_name}' in region '{self.region_name}'"
         )
 
+    async def connect(self) -> None:
+        """
+        Opens a long-lived S3 client that is reused by all subsequent operations
+        """
+        if self._client is not None:
+            return
+        # Concurrent first requests would otherwise each open a client and leak all but one.
+        async with self._connect_lock:
+            if self._client is not None:
+                return
+            exit_stack = AsyncExitStack()
+            self._client = await exit_stack.enter_async_context(
+                self.session.client(service_name="s3")
+            )
+            self._exit_stack = exit_stack
+        logger.info("S3 client connected")
+
+    async def close(self) -> None:
+        """
+        Closes the long-lived S3 client if it was opened
+        """
+        if self._exit_stack is not None:
+            await self._exit_stack.aclose()
+        self._exit_stack = None
+        self._client = None
+
+    async def ping(self) -> None:
+        """
+        Issues a cheap HEAD request against the bucket
+        """
+        async with self._get_client() as s3_client:
+            await s3_client.head_bucket(Bucket=self.bucket_name)
+
     @asynccontextmanager
     async def _get_client(self):
         """
         Provides an S3 client
         """
+        if self._client is not None:
+            yield self._client
+            return
         try:
             async with self.session.client(service_name="s3") as s3_client:
                 yield s3_client
@@ -82,30 +154,46 @@ class S3Client:
             f" filename='{filename}'"
         )
 
-    async def upload_file(
+    def _new_object_key(
         self,
-        file_content: bytes,
-        content_type: str,
+        content_type: str | None,
         prefix: str,
-        original_filename: str | None = None,
-    ) -> tuple[str, str]:
+        original_filename: str | None,
+        file_uuid: str | None = None,
+    ) -> tuple[str, str, str]:
         """
-        Uploads file content to the S3 bucket with a unique name
+        Returns a unique (uuid, extension, object key), or one for `file_uuid` if given;
+        raises ValueError for unknown types
         """
-        file_uuid = uuid.uuid4()
+        file_uuid = file_uuid or str(uuid.uuid4())
 
         try:
             extension = self._get_file_extension(content_type, original_filename)
             logger.info(f"Determined extension: {extension}")
         except Exception as e:
             logger.info(f"Failed to determine file extension for content type {content_type}.")
-            raise Exception(f"Unexpected error creating S3 client: {e}")
+            raise ValueError(f"Unexpected error creating S3 client: {e}")
 
         if prefix and not prefix.endswith("/"):
             prefix += "/"
             logger.debug(f"Added trailing slash to prefix: {prefix}")
 
-        object_key = f"{prefix}{str(file_uuid)}{extension}"
+        return file_uuid, extension, f"{prefix}{file_uuid}{extension}"
+
+    async def upload_file(
+        self,
+        file_content: bytes,
+        content_type: str,
+        prefix: str,
+        original_filename: str | None = None,
+        file_uuid: str | None = None,
+    ) -> tuple[str, str]:
+        """
+        Uploads file content to the S3 bucket with a unique name, or the one for `file_uuid`
+        """
+        file_uuid, extension, object_key = self._new_object_key(
+            content_type, prefix, original_filename, file_uuid
+        )
         logger.info(
             f"Attempting to upload to S3: Bucket='{self.bucket_name}',"
             f" Key='{object_key}', ContentType='{content_type}'"
@@ -120,7 +208,7 @@ class S3Client:
                     ContentType=content_type,
                 )
             logger.info(f"Successfully uploaded file to s3://{self.bucket_name}/{object_key}")
-            return str(file_uuid), extension
+            return file_uuid, extension
 
         except (ClientError, BotoCoreError) as e:
             logger.error(
@@ -131,6 +219,124 @@ class S3Client:
             logger.error(f"Unexpected error during upload to {object_key}: {e}", exc_info=True)
             raise Exception(f"Unexpected error during upload for key {object_key}: {e}")
 
+    async def create_multipart_upload(
+        self,
+        content_type: str,
+        prefix: str,
+        original_filename: str | None = None,
+    ) -> tuple[str, str]:
+        """
+        Starts a multipart upload to a new unique key and returns (object key, upload ID)
+        """
+        _file_uuid, _extension, object_key = self._new_object_key(
+            content_type, prefix, original_filename
+        )
+        try:
+            async with self._get_client() as s3_client:
+                response = await s3_client.create_multipart_upload(
+                    Bucket=self.bucket_name, Key=object_key, ContentType=content_type
+                )
+            logger.info(f"Started multipart upload to s3://{self.bucket_name}/{object_key}")
+            return object_key, response["UploadId"]
+        except (ClientError, BotoCoreError) as e:
+            logger.error(f"S3 CreateMultipartUpload failed for Key='{object_key}': {e}")
+            raise Exception(f"Failed to start multipart upload for key {object_key}: {e}")
+
+    async def upload_part(
+        self, object_key: str, upload_id: str, part_number: int, body: bytes
+    ) -> str:
+        """
+        Uploads one part of a multipart upload and returns its ETag
+        """
+        try:
+            async with self._get_client() as s3_client:
+                response = await s3_client.upload_part(
+                    Bucket=self.bucket_name,
+                    Key=object_key,
+                    UploadId=upload_id,
+                    PartNumber=part_number,
+                    Body=body,
+                )
+            return response["ETag"]
+        except (ClientError, BotoCoreError) as e:
+            logger.error(f"S3 UploadPart {part_number} failed for Key='{object_key}': {e}")
+            raise Exception(f"Failed to upload part {part_number} of key {object_key}: {e}")
+
+    async def complete_multipart_upload(
+        self, object_key: str, upload_id: str, parts: list[tuple[int, str]]
+    ) -> None:
+        """
+        Assembles the uploaded (part number, ETag) parts into the object
+        """
+        try:
+            async with self._get_client() as s3_client:
+                await s3_client.complete_multipart_upload(
+                    Bucket=self.bucket_name,
+                    Key=object_key,
+                    UploadId=upload_id,
+                    MultipartUpload={
+                        "Parts": [
+                            {"PartNumber": part_number, "ETag": etag} for part_number, etag in parts
+                        ]
+                    },
+                )
+            logger.info(f"Completed multipart upload to s3://{self.bucket_name}/{object_key}")
+        except (ClientError, BotoCoreError) as e:
+            logger.error(f"S3 CompleteMultipartUpload failed for Key='{object_key}': {e}")
+            raise Exception(f"Failed to complete multipart upload for key {object_key}: {e}")
+
+    async def abort_multipart_upload(self, object_key: str, upload_id: str) -> None:
+        """
+        Discards a multipart upload and its parts; aborting twice is not an error
+        """
+        try:
+            async with self._get_client() as s3_client:
+                await s3_client.abort_multipart_upload(
+                    Bucket=self.bucket_name, Key=object_key, UploadId=upload_id
+                )
+            logger.info(f"Aborted multipart upload to s3://{self.bucket_name}/{object_key}")
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") == "NoSuchUpload":
+                return
+            logger.error(f"S3 AbortMultipartUpload failed for Key='{object_key}': {e}")
+            raise Exception(f"Failed to abort multipart upload for key {object_key}: {e}")
+
+    @asynccontextmanager
+    async def open_object(
+        self,
+        object_key: str,
+        byte_range: str | None = None,
+        if_none_match: str | None = None,
+    ):
+        """
+        Yields the GetObject response; its `Body` streams the object until the context exits.
+        Streams always go through the pooled long-lived client.
+        """
+        await self.connect()
+        params = {"Bucket": self.bucket_name, "Key": object_key}
+        if byte_range:
+            params["Range"] = byte_range
+        if if_none_match:
+            params["IfNoneMatch"] = if_none_match
+
+        try:
+            response = await self._client.get_object(**params)
+        except ClientError as e:
+            error_code = e.response.get("Error", {}).get("Code")
+            status_code = e.response.get("ResponseMetadata", {}).get("HTTPStatusCode")
+            if error_code in ("NoSuchKey", "404"):
+                raise S3ObjectNotFoundError(object_key) from e
+            if status_code == 304:  # noqa: PLR2004
+                raise S3ObjectNotModifiedError(object_key) from e
+            if error_code == "InvalidRange":
+                raise S3RangeNotSatisfiableError(object_key) from e
+            logger.error(f"S3 GetObject failed for Key='{object_key}': {e}")
+            raise Exception(f"Failed to read key {object_key}: {e}")
+        try:
+            yield response
+        finally:
+            response["Body"].close()
+
     async def get_file_url(
         self,
         object_key: str,
@@ -159,3 +365,13 @@ class S3Client:
         except Exception as e:
             logger.error(f"Unexpected error during pre-signed URL generation for {object_key}")
             raise Exception(f"Unexpected error generating URL for key {object_key}: {e}")
+
+
+def create_s3_client() -> S3Client:
+    """Creates the S3 client configured by settings."""
+    return S3Client(
+        AWS_ACCESS_KEY_ID=settings.AWS_ACCESS_KEY_ID,
+        AWS_SECRET_ACCESS_KEY=settings.AWS_SECRET_ACCESS_KEY,
+        BUCKET_NAME=settings.AWS_S3_BUCKET_NAME,
+        REGION_NAME=settings.AWS_S3_REGION,
+    )
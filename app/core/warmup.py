@@ -0,0 +1,66 @@
+import asyncio
+import logging
+import uuid
+
+import redis.asyncio as aioredis
+from redis.asyncio.cluster import RedisCluster
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlmodel import select
+
+from app.models.profile import Profile
+
+from .s3_client import S3Client
+
+logger = logging.getLogger(__name__)
+
+
+async def warm_database(engine: AsyncEngine, connections: int) -> None:
+    """Opens pooled connections concurrently and prepares the profile lookup on each."""
+    # Overflow connections are discarded on check-in, so only the core pool is worth warming.
+    connections = min(connections, engine.pool.size())
+    if connections <= 0:
+        return
+    statement = select(Profile).where(Profile.user_id == uuid.UUID(int=0))
+    barrier = asyncio.Barrier(connections)
+
+    async def open_connection() -> None:
+        try:
+            async with engine.connect() as conn:
+                await conn.execute(statement)
+                # Hold every connection until all are open so each task gets its own.
+                await barrier.wait()
+        except Exception:
+            await barrier.abort()
+            raise
+
+    await asyncio.gather(*(open_connection() for _ in range(connections)))
+    logger.info(f"Warmed {connections} database connections")
+
+
+async def warm_redis(redis_client: aioredis.Redis | RedisCluster, connections: int) -> None:
+    """Fills the Redis connection pool with live connections."""
+    if connections <= 0:
+        return
+    if isinstance(redis_client, RedisCluster):
+        # Cluster clients keep a pool per node: concurrent pings open connections on each primary.
+        await asyncio.gather(
+            *(redis_client.ping(target_nodes=RedisCluster.PRIMARIES) for _ in range(connections))
+        )
+        logger.info(f"Warmed {connections} Redis connections per cluster primary")
+        return
+    pool = redis_client.connection_pool
+    acquired = []
+    try:
+        for _ in range(connections):
+            acquired.append(await pool.get_connection("PING"))
+    finally:
+        for connection in acquired:
+            await pool.release(connection)
+    logger.info(f"Warmed {len(acquired)} Redis connections")
+
+
+async def warm_s3(s3_client: S3Client) -> None:
+    """Opens the shared S3 client and performs a no-op request to establish TLS."""
+    await s3_client.connect()
+    await s3_client.ping()
+    logger.info("Warmed S3 client")
@@ -1,18 +1,41 @@
+import asyncio
 import logging
+import uuid
 from contextlib import asynccontextmanager
 from importlib.metadata import PackageNotFoundError, version
 
-import redis.asyncio as aioredis
-from fastapi import Depends, FastAPI, HTTPException
-from sqlalchemy import select
+from fastapi import Depends, FastAPI, HTTPException, Request, status
+from fastapi.responses import JSONResponse
+from sqlalchemy import select, text
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.profile import Profile
 
+from .api.routers.admin import hot_profiles_router, memory_router, profiler_router
+from .api.routers.avatars import router as avatar_router
+from .api.routers.endpoints import avatar_job_processor, render_public_profile
 from .api.routers.endpoints import router as profile_router
+from .api.routers.uploads import router as upload_router
+from .core.avatar_cache import AvatarDiskCache
+from .core.avatar_jobs import AvatarJobWorker, create_avatar_job_worker
+from .core.avatar_uploads import AvatarUploadStore, AvatarUploadSweeper
+from .core.cache_invalidation import ProfileChangeListener
+from .core.cache_keys import profile_public_key
 from .core.config import settings
-from .core.database import async_engine, get_async_session
-from .core.s3_client import S3Client
+from .core.database import (
+    async_engine,
+    get_async_session,
+    get_asyncpg_dsn,
+    get_pool_stats,
+    get_session_factory,
+)
+from .core.health import DependencyProber
+from .core.hot_keys import HotKeyRefresher, hot_profiles
+from .core.load_shedding import AdaptiveLimiter, LoadSheddingMiddleware
+from .core.profiler import ProfilerMiddleware
+from .core.redis_client import create_redis_client, redis_breaker
+from .core.s3_client import create_s3_client
+from .core.warmup import warm_database, warm_redis, warm_s3
 
 logging.basicConfig(level=logging.INFO if settings.APP_ENV == "production" else logging.DEBUG)
 logger = logging.getLogger(__name__)
@@ -23,9 +46,80 @@ except PackageNotFoundError:
     __version__ = "0.0.0"
 
 
+async def warm_up(app: FastAPI) -> None:
+    """Pre-opens pooled connections so the first requests after a deploy don't pay for them."""
+    tasks = [
+        warm_database(async_engine, settings.WARMUP_DB_CONNECTIONS),
+        warm_redis(app.state.redis_client, settings.WARMUP_REDIS_CONNECTIONS),
+    ]
+    if settings.WARMUP_S3:
+        tasks.append(warm_s3(app.state.s3_client))
+
+    results = await asyncio.wait_for(
+        asyncio.gather(*tasks, return_exceptions=True),
+        timeout=settings.WARMUP_TIMEOUT_SECONDS,
+    )
+    for result in results:
+        if isinstance(result, Exception):
+            logger.error(f"Warm-up step failed: {result}")
+
+    if settings.HOT_PROFILES_ENABLED:
+        # Runs last: filling cache entries uses the connections opened above.
+        try:
+            await asyncio.wait_for(
+                app.state.hot_profile_refresher.warm(settings.HOT_PROFILES_WARM_COUNT),
+                timeout=settings.WARMUP_TIMEOUT_SECONDS,
+            )
+        except Exception as e:
+            logger.error(f"Warming hot profiles failed: {e}")
+
+
+def create_dependency_prober(app: FastAPI) -> DependencyProber:
+    async def probe_postgres() -> None:
+        async with async_engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    return DependencyProber(
+        {
+            "postgres": probe_postgres,
+            "redis": app.state.redis_client.ping,
+            "s3": app.state.s3_client.ping,
+        },
+        interval=settings.HEALTH_PROBE_INTERVAL_SECONDS,
+        timeout=settings.HEALTH_PROBE_TIMEOUT_SECONDS,
+        max_age=settings.HEALTH_PROBE_MAX_AGE_SECONDS,
+    )
+
+
+def create_hot_profile_refresher(app: FastAPI) -> HotKeyRefresher:
+    session_factory = get_session_factory()
+
+    async def refresh(user_id: str) -> None:
+        async with session_factory() as session:
+            await render_public_profile(
+                session, app.state.s3_client, app.state.redis_client, uuid.UUID(user_id)
+            )
+
+    return HotKeyRefresher(
+        hot_profiles,
+        app.state.redis_client,
+        refresh,
+        profile_public_key,
+        interval=settings.HOT_PROFILES_REFRESH_INTERVAL_SECONDS,
+        refresh_ahead=settings.HOT_PROFILES_REFRESH_AHEAD_SECONDS,
+        batch_size=settings.HOT_PROFILES_REFRESH_BATCH,
+        min_count=settings.HOT_PROFILES_MIN_HITS,
+    )
+
+
 @asynccontextmanager
-async def lifespan(app: FastAPI):
+async def lifespan(app: FastAPI):  # noqa: PLR0912, PLR0915
     logger.info("Application startup...")
+    app.state.ready = False
+    # Importing aioboto3 and building its session is the slowest startup step, so it runs
+    # in a worker thread while the database and Redis connections are established.
+    s3_client_task = asyncio.create_task(asyncio.to_thread(create_s3_client))
+
     # You can add startup logic here, like checking DB connection
     try:
         async with async_engine.connect():
@@ -33,33 +127,93 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.error(f"Database connection failed during startup: {e}")
 
+    # The client is kept even if Redis is down: it reconnects on demand and the
+    # circuit breaker keeps requests from waiting on it in the meantime.
+    redis_client = create_redis_client()
+    app.state.redis_client = redis_client
     try:
-        s3_client = S3Client(
-            AWS_ACCESS_KEY_ID=settings.AWS_ACCESS_KEY_ID,
-            AWS_SECRET_ACCESS_KEY=settings.AWS_SECRET_ACCESS_KEY,
-            BUCKET_NAME=settings.AWS_S3_BUCKET_NAME,
-            REGION_NAME=settings.AWS_S3_REGION,
-        )
+        await redis_breaker.call(redis_client.ping)
+        logger.info("Redis client connected successfully.")
+    except Exception as e:
+        logger.error(f"Redis connection failed during startup, serving without cache: {e}")
+
+    try:
+        s3_client = await s3_client_task
         app.state.s3_client = s3_client
         logger.info("S3 Client initialized successfully.")
     except Exception as e:
         logger.error(f"S3 Client initialization failed during startup: {e}")
         raise RuntimeError()
 
-    try:
-        redis_url = f"redis://{settings.REDIS_HOST}:{settings.REDIS_PORT}/{settings.REDIS_DATABASE}"
-        redis_client = aioredis.from_url(redis_url)
-        await redis_client.ping()
-        app.state.redis_client = redis_client
-        logger.info(f"Redis client connected successfully to {redis_url}")
-    except Exception as e:
-        logger.error(f"Redis connection failed during startup: {e}")
-        app.state.redis_client = None
+    dependency_prober = create_dependency_prober(app)
+    app.state.dependency_prober = dependency_prober
+    dependency_prober.start()
+
+    if settings.AVATAR_PROXY_ENABLED:
+        app.state.avatar_cache = AvatarDiskCache(
+            settings.AVATAR_CACHE_DIR, settings.AVATAR_CACHE_MAX_BYTES
+        )
+
+    change_listener: ProfileChangeListener | None = None
+    if settings.CACHE_INVALIDATION_LISTENER_ENABLED:
+        change_listener = ProfileChangeListener(
+            redis_client,
+            settings.CACHE_INVALIDATION_DSN or get_asyncpg_dsn(),
+            batch_size=settings.CACHE_INVALIDATION_BATCH_SIZE,
+            flush_interval=settings.CACHE_INVALIDATION_FLUSH_SECONDS,
+        )
+        change_listener.start()
+
+    upload_sweeper: AvatarUploadSweeper | None = None
+    if settings.AVATAR_UPLOADS_ENABLED:
+        app.state.avatar_upload_store = AvatarUploadStore(
+            redis_client, s3_client, ttl=settings.AVATAR_UPLOADS_TTL_SECONDS
+        )
+        upload_sweeper = AvatarUploadSweeper(
+            app.state.avatar_upload_store, settings.AVATAR_UPLOADS_SWEEP_INTERVAL_SECONDS
+        )
+        upload_sweeper.start()
+
+    avatar_job_worker: AvatarJobWorker | None = None
+    if settings.AVATAR_JOBS_ENABLED and settings.AVATAR_JOBS_WORKER_ENABLED:
+        # Reading jobs blocks longer than the shared client's socket timeout allows.
+        avatar_job_worker = create_avatar_job_worker(
+            create_redis_client(block=settings.AVATAR_JOBS_BLOCK_SECONDS),
+            avatar_job_processor(s3_client, redis_client),
+        )
+        avatar_job_worker.start()
+
+    hot_profile_refresher = (
+        create_hot_profile_refresher(app) if settings.HOT_PROFILES_ENABLED else None
+    )
+    app.state.hot_profile_refresher = hot_profile_refresher
+
+    if settings.WARMUP_ENABLED:
+        try:
+            await warm_up(app)
+            logger.info("Warm-up finished.")
+        except TimeoutError:
+            logger.error(f"Warm-up did not finish within {settings.WARMUP_TIMEOUT_SECONDS}s")
+    app.state.ready = True
+    if hot_profile_refresher is not None:
+        hot_profile_refresher.start()
 
     yield
 
     logger.info("Application shutdown...")
+    app.state.ready = False
+    if change_listener is not None:
+        await change_listener.stop()
+    if avatar_job_worker is not None:
+        await avatar_job_worker.stop()
+        await avatar_job_worker.redis.close()
+    if upload_sweeper is not None:
+        await upload_sweeper.stop()
+    if hot_profile_refresher is not None:
+        await hot_profile_refresher.stop()
+    await dependency_prober.stop()
     await redis_client.close()
+    await s3_client.close()
     await async_engine.dispose()
     logger.info("Database engine disposed.")
 
@@ -72,7 +226,55 @@ app = FastAPI(
 )
 
 
+# Health checks must keep answering while the service sheds load.
+HEALTH_PATHS = frozenset({"/", "/live", "/ready", "/stats/db-pool", "/stats/concurrency"})
+REQUIRED_DEPENDENCIES = [
+    name.strip() for name in settings.HEALTH_REQUIRED_DEPENDENCIES.split(",") if name.strip()
+]
+READ_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+# Cache-hit reads finish in a millisecond while writes hold DB connections and upload to S3,
+# so each class gets its own limit and a write spike can't starve reads.
+concurrency_limiters = {
+    "read": AdaptiveLimiter(
+        "read",
+        initial_limit=settings.LOAD_SHEDDING_READ_INITIAL_LIMIT,
+        min_limit=settings.LOAD_SHEDDING_MIN_LIMIT,
+        max_limit=settings.LOAD_SHEDDING_READ_MAX_LIMIT,
+        max_queue=settings.LOAD_SHEDDING_QUEUE_SIZE,
+        queue_timeout=settings.LOAD_SHEDDING_QUEUE_TIMEOUT_SECONDS,
+    ),
+    "write": AdaptiveLimiter(
+        "write",
+        initial_limit=settings.LOAD_SHEDDING_WRITE_INITIAL_LIMIT,
+        min_limit=settings.LOAD_SHEDDING_MIN_LIMIT,
+        max_limit=settings.LOAD_SHEDDING_WRITE_MAX_LIMIT,
+        max_queue=settings.LOAD_SHEDDING_QUEUE_SIZE,
+        queue_timeout=settings.LOAD_SHEDDING_QUEUE_TIMEOUT_SECONDS,
+    ),
+}
+
+if settings.LOAD_SHEDDING_ENABLED:
+    app.add_middleware(
+        LoadSheddingMiddleware,
+        limiters=concurrency_limiters,
+        classify=lambda scope: "read" if scope["method"] in READ_METHODS else "write",
+        exempt_paths=HEALTH_PATHS,
+        retry_after=settings.LOAD_SHEDDING_RETRY_AFTER_SECONDS,
+    )
+
 app.include_router(profile_router, prefix="/profiles", tags=["Profiles"])
+if settings.PROFILER_ENABLED:
+    app.add_middleware(ProfilerMiddleware)
+    app.include_router(profiler_router, prefix="/admin", tags=["Admin"])
+if settings.MEMORY_DIAGNOSTICS_ENABLED:
+    app.include_router(memory_router, prefix="/admin", tags=["Admin"])
+if settings.HOT_PROFILES_ENABLED:
+    app.include_router(hot_profiles_router, prefix="/admin", tags=["Admin"])
+if settings.AVATAR_PROXY_ENABLED:
+    app.include_router(avatar_router, prefix="/profiles", tags=["Avatars"])
+if settings.AVATAR_UPLOADS_ENABLED:
+    app.include_router(upload_router, prefix="/profiles", tags=["Avatar Uploads"])
 
 
 @app.get("/test-db/", summary="Test Database Connection", tags=["Test"])
@@ -97,12 +299,61 @@ async def test_db_connection(session: AsyncSession = Depends(get_async_session))
         raise HTTPException(status_code=500, detail=f"Database error: {e}")
 
 
+@app.get("/stats/db-pool", summary="Database Pool Statistics", tags=["Health"])
+async def db_pool_stats():
+    """Reports current usage of the database connection pool."""
+    return get_pool_stats()
+
+
+@app.get("/stats/concurrency", summary="Concurrency Limits", tags=["Health"])
+async def concurrency_stats():
+    """Reports the current adaptive concurrency limit of each route class."""
+    return {name: limiter.stats() for name, limiter in concurrency_limiters.items()}
+
+
 @app.get("/", summary="Health Check", tags=["Health"])
 async def health_check():
     """Basic health check endpoint."""
     return {"status": "ok", "service": "Profile Service"}
 
 
+@app.get("/live", summary="Liveness Check", tags=["Health"])
+async def liveness_check():
+    """Answers as long as the event loop does; never touches a dependency."""
+    return {"status": "alive", "service": "Profile Service"}
+
+
+@app.get("/ready", summary="Readiness Check", tags=["Health"])
+async def readiness_check(request: Request):
+    """
+    Reports ready once startup warm-up has completed and every dependency listed in
+    HEALTH_REQUIRED_DEPENDENCIES passed its latest background probe. Served from cached
+    probe results, so polling it never reaches Postgres, Redis or S3.
+    """
+    prober: DependencyProber | None = getattr(request.app.state, "dependency_prober", None)
+    pool = get_pool_stats()
+    # QueuePool has no limit with pool_size=0, so such a pool never saturates.
+    saturation = 0.0 if pool["capacity"] <= 0 else pool["checked_out"] / pool["capacity"]
+    body = {
+        "service": "Profile Service",
+        **(prober.snapshot() if prober is not None else {}),
+        "db_pool": pool | {"saturation": round(saturation, 3)},
+    }
+    if not getattr(request.app.state, "ready", False):
+        return JSONResponse(
+            {"status": "warming up", **body}, status_code=status.HTTP_503_SERVICE_UNAVAILABLE
+        )
+    failing = [
+        name for name in REQUIRED_DEPENDENCIES if prober is None or not prober.is_healthy(name)
+    ]
+    if failing:
+        return JSONResponse(
+            {"status": "unavailable", "failing": failing, **body},
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        )
+    return {"status": "ready", **body}
+
+
 if __name__ == "__main__":
     import uvicorn
 
@@ -1,9 +1,12 @@
 import datetime
 import uuid
 
-from sqlalchemy import DateTime, func
+from sqlalchemy import DateTime, Index, LargeBinary, event, func, text
 from sqlmodel import Column, Field, SQLModel
 
+from app.core.ids import uuid7
+from app.schemas.profile import build_public_document
+
 
 class ProfileBase(SQLModel):
     display_name: str | None = Field(default=None, max_length=100)
@@ -12,7 +15,19 @@ class ProfileBase(SQLModel):
 
 
 class Profile(ProfileBase, table=True):
-    id: uuid.UUID | None = Field(default_factory=uuid.uuid4, primary_key=True)
+    __table_args__ = (
+        Index("ix_profile_created_at_id", "created_at", "id"),
+        Index(
+            "ix_profile_display_name_trgm",
+            "display_name",
+            postgresql_using="gin",
+            postgresql_ops={"display_name": "gin_trgm_ops"},
+        ),
+        # "C" collation lets the same btree serve LIKE 'prefix%' filters and ordered scans.
+        Index("ix_profile_display_name_lower_prefix", text('lower(display_name) COLLATE "C"')),
+    )
+
+    id: uuid.UUID | None = Field(default_factory=uuid7, primary_key=True)
     user_id: uuid.UUID = Field(index=True, unique=True, nullable=False)
     created_at: datetime.datetime = Field(
         sa_column=Column(DateTime(timezone=True), default=func.now(), nullable=False)
@@ -22,3 +37,21 @@ class Profile(ProfileBase, table=True):
             DateTime(timezone=True), default=func.now(), onupdate=func.now(), nullable=False
         )
     )
+    # Tiny inline rendition of the avatar, shown by clients until the full image has loaded.
+    avatar_placeholder: str | None = Field(default=None, max_length=1024)
+    # Precomputed `ProfileRead` JSON without the avatar URL, rebuilt on every ORM write.
+    # A database trigger clears it when a row is updated by anything else.
+    public_document: bytes | None = Field(
+        default=None, sa_column=Column(LargeBinary, nullable=True)
+    )
+
+
+@event.listens_for(Profile, "before_insert")
+@event.listens_for(Profile, "before_update")
+def refresh_public_document(mapper, connection, target: Profile) -> None:
+    # Timestamps are set here instead of by the database so the document can include them.
+    now = datetime.datetime.now(datetime.UTC)
+    if target.created_at is None:
+        target.created_at = now
+    target.updated_at = now
+    target.public_document = build_public_document(target)
@@ -1,7 +1,9 @@
 import uuid
 from datetime import datetime
+from typing import Any, Literal
 
-from sqlmodel import SQLModel
+from pydantic_core import to_json
+from sqlmodel import Field, SQLModel
 
 
 class ProfileUpdate(SQLModel):
@@ -15,3 +17,60 @@ class ProfileRead(ProfileUpdate):
     user_id: uuid.UUID
     created_at: datetime
     updated_at: datetime
+    avatar_placeholder: str | None = None
+
+
+def build_public_document(profile: Any) -> bytes:
+    """Serializes the public profile without `avatar_url`, which is presigned per request."""
+    return ProfileRead.model_validate(profile).model_dump_json(exclude={"avatar_url"}).encode()
+
+
+def render_public_document(document: bytes, avatar_url: str | None) -> bytes:
+    """Completes a stored public document with the avatar URL, yielding a `ProfileRead` body."""
+    return document[:-1] + b',"avatar_url":' + to_json(avatar_url) + b"}"
+
+
+class ProfilePage(SQLModel):
+    items: list[ProfileRead]
+    next_cursor: str | None = None
+
+
+class ProfileEvent(SQLModel):
+    """Change event published to the profile event stream. `avatar_key` is the S3 object key."""
+
+    type: Literal["created", "updated"]
+    profile_id: uuid.UUID
+    user_id: uuid.UUID
+    display_name: str | None = None
+    avatar_key: str | None = None
+    updated_at: datetime
+
+
+class ProfileEventCursor(SQLModel):
+    stream: str
+    last_id: str
+
+
+class AvatarJobRead(SQLModel):
+    """Status of an avatar upload processed in the background."""
+
+    id: str
+    status: Literal["queued", "processing", "succeeded", "failed"]
+    error: str | None = None
+    created_at: datetime
+    updated_at: datetime
+
+
+class AvatarUploadCreate(SQLModel):
+    length: int = Field(gt=0, description="Size of the whole avatar in bytes")
+    content_type: str = Field(schema_extra={"examples": ["image/png"]})
+    filename: str | None = None
+
+
+class AvatarUploadRead(SQLModel):
+    """Progress of a resumable avatar upload; the next chunk starts at `offset`."""
+
+    id: str
+    offset: int
+    length: int
+    expires_at: datetime
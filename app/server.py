@@ -0,0 +1,90 @@
+"""
+Production server: multi-worker uvicorn on uvloop and httptools, configured from `Settings`.
+
+    python -m app.server
+
+Workers share one listening socket. A worker that has served `SERVER_LIMIT_MAX_REQUESTS`
+(plus a random share of `SERVER_MAX_REQUESTS_JITTER`, so workers don't all restart at once)
+exits after draining and the supervisor starts a replacement. On SIGTERM in-flight requests get
+`SERVER_GRACEFUL_SHUTDOWN_SECONDS` to finish; keep it below the pod's termination grace period.
+"""
+
+import math
+import os
+import random
+import sys
+from pathlib import Path
+from socket import socket
+
+import uvicorn
+from uvicorn.main import STARTUP_FAILURE
+from uvicorn.supervisors import Multiprocess
+
+from app.core.config import Settings, settings
+
+CGROUP_CPU_MAX = Path("/sys/fs/cgroup/cpu.max")
+
+
+def available_cpus() -> int:
+    """CPUs this process may use, honouring the container's cgroup v2 CPU limit."""
+    cpus = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count()
+    try:
+        quota, period = CGROUP_CPU_MAX.read_text().split()
+    except (OSError, ValueError):
+        return cpus or 1
+    if quota == "max":
+        return cpus or 1
+    return max(1, min(cpus or 1, math.ceil(int(quota) / int(period))))
+
+
+def build_server_config(config: Settings) -> uvicorn.Config:
+    return uvicorn.Config(
+        "app.main:app",
+        host=config.SERVER_HOST,
+        port=config.SERVER_PORT,
+        root_path=config.SERVER_ROOT_PATH,
+        workers=config.SERVER_WORKERS or available_cpus(),
+        loop=config.SERVER_LOOP,
+        http=config.SERVER_HTTP,
+        backlog=config.SERVER_BACKLOG,
+        timeout_keep_alive=config.SERVER_KEEPALIVE_SECONDS,
+        limit_max_requests=config.SERVER_LIMIT_MAX_REQUESTS,
+        timeout_graceful_shutdown=config.SERVER_GRACEFUL_SHUTDOWN_SECONDS,
+        log_level="info",
+    )
+
+
+class JitteredServer(uvicorn.Server):
+    """Spreads worker restarts by adding a per-process random amount to the request limit."""
+
+    def __init__(self, config: uvicorn.Config, max_requests_jitter: int = 0):
+        super().__init__(config)
+        self.max_requests_jitter = max_requests_jitter
+
+    def run(self, sockets: list[socket] | None = None) -> None:
+        # Each worker runs on its own copy of the config, so this only affects this process.
+        if self.config.limit_max_requests is not None and self.max_requests_jitter > 0:
+            self.config.limit_max_requests += random.randint(0, self.max_requests_jitter)
+        super().run(sockets=sockets)
+
+
+def main() -> int:
+    server_config = build_server_config(settings)
+    # Workers size their database pools by the worker count (see build_pool_limits).
+    os.environ["SERVER_WORKERS"] = str(server_config.workers)
+    server = JitteredServer(server_config, settings.SERVER_MAX_REQUESTS_JITTER)
+    try:
+        if server_config.workers > 1:
+            sock = server_config.bind_socket()
+            Multiprocess(server_config, target=server.run, sockets=[sock]).run()
+        else:
+            server.run()
+    except KeyboardInterrupt:
+        pass
+    if server_config.workers == 1 and not server.started:
+        return STARTUP_FAILURE
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
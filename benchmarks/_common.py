@@ -0,0 +1,79 @@
+import random
+import statistics
+import time
+import uuid
+from collections.abc import Awaitable, Callable
+
+from sqlalchemy import insert, text
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlmodel import SQLModel
+
+from app.core.ids import uuid7
+from app.models.profile import Profile
+
+NAME_SYLLABLES = ["al", "be", "cor", "da", "el", "fi", "gor", "ha", "is", "jo", "ka", "lu", "mi"]
+NAME_SYLLABLES += ["na", "or", "pe", "qui", "ra", "sa", "ti", "ul", "va", "wen", "xo", "yu", "zel"]
+
+
+def random_display_name() -> str:
+    syllables = random.choices(NAME_SYLLABLES, k=random.randint(2, 4))
+    return "".join(syllables).capitalize() + str(random.randint(0, 999))
+
+
+def percentiles(samples: list[float]) -> dict[str, float]:
+    """Summarizes latency samples (seconds) as milliseconds."""
+    ordered = sorted(samples)
+    quantiles = statistics.quantiles(ordered, n=100)
+    return {
+        "p50": quantiles[49] * 1000,
+        "p95": quantiles[94] * 1000,
+        "p99": quantiles[98] * 1000,
+        "max": ordered[-1] * 1000,
+    }
+
+
+def print_report(name: str, samples: list[float], elapsed: float) -> None:
+    stats = percentiles(samples)
+    print(
+        f"{name:<32} n={len(samples):<7} rps={len(samples) / elapsed:>9.1f} "
+        f"p50={stats['p50']:.2f}ms p95={stats['p95']:.2f}ms "
+        f"p99={stats['p99']:.2f}ms max={stats['max']:.2f}ms"
+    )
+
+
+async def seed_profiles(
+    engine: AsyncEngine,
+    count: int,
+    batch_size: int = 5000,
+    id_factory: Callable[[], uuid.UUID] = uuid7,
+) -> list[uuid.UUID]:
+    """Recreates the profile table and inserts `count` synthetic profiles."""
+    async with engine.begin() as conn:
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        await conn.run_sync(SQLModel.metadata.drop_all)
+        await conn.run_sync(SQLModel.metadata.create_all)
+
+    user_ids: list[uuid.UUID] = []
+    for start in range(0, count, batch_size):
+        rows = []
+        for _ in range(start, min(start + batch_size, count)):
+            user_id = uuid.uuid4()
+            user_ids.append(user_id)
+            rows.append(
+                {
+                    "id": id_factory(),
+                    "user_id": user_id,
+                    "display_name": random_display_name(),
+                    "bio": "benchmark profile",
+                    "avatar_url": f"icons/{uuid.uuid4()}.png",
+                }
+            )
+        async with engine.begin() as conn:
+            await conn.execute(insert(Profile), rows)
+    return user_ids
+
+
+async def timed(call: Callable[[], Awaitable[object]], samples: list[float]) -> None:
+    started = time.perf_counter()
+    await call()
+    samples.append(time.perf_counter() - started)
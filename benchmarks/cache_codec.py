@@ -0,0 +1,122 @@
+"""
+Size and CPU cost of cached profile entries for each cache codec.
+
+Encodes synthetic profiles shaped like production ones (presigned avatar URL, inline
+placeholder, bios of varying length) and reports bytes per entry and encode/decode time.
+`decode_json` is what a `GET /profile/{user_id}` hit pays to produce the response body.
+With `--redis-url` the entries are also written to Redis and `MEMORY USAGE` is averaged
+per key, which includes the key and Redis' own per-key overhead.
+
+    python -m benchmarks.cache_codec --profiles 20000 --redis-url redis://localhost:6379/15
+
+Keys are written under `benchmark:cache-codec:` and deleted afterwards.
+"""
+
+import argparse
+import asyncio
+import base64
+import datetime
+import random
+import secrets
+import time
+import uuid
+
+import redis.asyncio as aioredis
+
+from app.core.cache_codec import (
+    JsonProfileCodec,
+    MsgpackProfileCodec,
+    ProfileCodec,
+    decode_profile,
+    decode_profile_json,
+)
+from app.schemas.profile import ProfileRead
+from benchmarks._common import random_display_name
+
+KEY_PREFIX = "benchmark:cache-codec:"
+CODECS: dict[str, ProfileCodec] = {
+    "json": JsonProfileCodec(),
+    "msgpack": MsgpackProfileCodec(compress_min_bytes=1_000_000),
+    "msgpack+zlib": MsgpackProfileCodec(compress_min_bytes=512),
+}
+BIO_WORDS = ["art", "music", "games", "travel", "code", "photos", "cooking", "weekly", "streams"]
+
+
+def presigned_url(object_key: str) -> str:
+    return (
+        f"https://fastboosty-profile-bucket.s3.eu-north-1.amazonaws.com/{object_key}"
+        "?X-Amz-Algorithm=AWS4-HMAC-SHA256"
+        f"&X-Amz-Credential=AKIA{secrets.token_hex(8).upper()}%2F20261019%2Feu-north-1%2Fs3"
+        "%2Faws4_request&X-Amz-Date=20261019T120000Z&X-Amz-Expires=86400"
+        f"&X-Amz-SignedHeaders=host&X-Amz-Signature={secrets.token_hex(32)}"
+    )
+
+
+def synthetic_profile() -> ProfileRead:
+    created_at = datetime.datetime.now(datetime.UTC) - datetime.timedelta(
+        seconds=random.randint(0, 10**8)
+    )
+    has_avatar = random.random() < 0.8  # noqa: PLR2004
+    return ProfileRead(
+        id=uuid.uuid4(),
+        user_id=uuid.uuid4(),
+        display_name=random_display_name(),
+        bio=" ".join(random.choices(BIO_WORDS, k=random.randint(0, 40))) or None,
+        avatar_url=presigned_url(f"icons/{uuid.uuid4()}.png") if has_avatar else None,
+        avatar_placeholder=(
+            "data:image/webp;base64," + base64.b64encode(secrets.token_bytes(110)).decode()
+            if has_avatar
+            else None
+        ),
+        created_at=created_at,
+        updated_at=created_at + datetime.timedelta(seconds=random.randint(0, 10**6)),
+    )
+
+
+def per_entry_micros(function, items) -> float:
+    started = time.perf_counter()
+    for item in items:
+        function(item)
+    return (time.perf_counter() - started) / len(items) * 1_000_000
+
+
+async def redis_bytes_per_key(redis_url: str, entries: list[bytes]) -> float:
+    redis = aioredis.from_url(redis_url)
+    keys = [f"{KEY_PREFIX}{{{uuid.uuid4()}}}:user" for _ in entries]
+    try:
+        async with redis.pipeline(transaction=False) as pipe:
+            for key, entry in zip(keys, entries):
+                pipe.set(key, entry, ex=600)
+            await pipe.execute()
+        async with redis.pipeline(transaction=False) as pipe:
+            for key in keys:
+                pipe.memory_usage(key, samples=0)
+            usages = await pipe.execute()
+        return sum(usages) / len(usages)
+    finally:
+        await redis.delete(*keys)
+        await redis.aclose()
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--profiles", type=int, default=20_000)
+    parser.add_argument("--redis-url", default=None)
+    args = parser.parse_args()
+
+    profiles = [synthetic_profile() for _ in range(args.profiles)]
+    for name, codec in CODECS.items():
+        entries = [codec.encode(profile) for profile in profiles]
+        report = (
+            f"{name:<13} bytes/entry={sum(map(len, entries)) / len(entries):>7.1f} "
+            f"encode={per_entry_micros(codec.encode, profiles):>6.2f}us "
+            f"decode={per_entry_micros(decode_profile, entries):>6.2f}us "
+            f"decode_json={per_entry_micros(decode_profile_json, entries):>6.2f}us"
+        )
+        if args.redis_url:
+            report += f" redis_bytes/key={await redis_bytes_per_key(args.redis_url, entries):.1f}"
+        print(report)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,89 @@
+"""
+Miss-path latency under different database pool configurations.
+
+Runs the same `SELECT profile WHERE user_id = ...` the profile endpoints issue on a
+cache miss, with a fixed concurrency, once per pool configuration.
+
+    python -m benchmarks.db_pool --rows 100000 --requests 20000 --concurrency 64
+
+The target database is recreated, so point SQLALCHEMY_DATABASE_URI at a scratch one.
+"""
+
+import argparse
+import asyncio
+import random
+import time
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlmodel import select
+
+from app.core.config import settings
+from app.core.database import build_connect_args
+from app.models.profile import Profile
+from benchmarks._common import print_report, seed_profiles, timed
+
+CONFIGURATIONS = {
+    "pre-ping, default cache": {"pool_pre_ping": True},
+    "no pre-ping, default cache": {"pool_pre_ping": False},
+    "no pre-ping, no stmt cache": {
+        "pool_pre_ping": False,
+        "connect_args": {"statement_cache_size": 0, "prepared_statement_cache_size": 0},
+    },
+    "pgbouncer mode": {
+        "pool_pre_ping": False,
+        "connect_args": build_connect_args(settings.model_copy(update={"DB_PGBOUNCER_MODE": True})),
+    },
+}
+
+
+async def run_configuration(name: str, options: dict, args: argparse.Namespace, user_ids) -> None:
+    engine_options = {
+        "pool_size": args.pool_size,
+        "max_overflow": args.max_overflow,
+        "connect_args": build_connect_args(settings),
+    } | options
+    engine = create_async_engine(str(settings.SQLALCHEMY_DATABASE_URI), **engine_options)
+    session_factory = async_sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
+
+    async def fetch_one() -> None:
+        async with session_factory() as session:
+            result = await session.execute(
+                select(Profile).where(Profile.user_id == random.choice(user_ids))
+            )
+            result.scalar_one_or_none()
+
+    semaphore = asyncio.Semaphore(args.concurrency)
+    samples: list[float] = []
+
+    async def worker() -> None:
+        async with semaphore:
+            await timed(fetch_one, samples)
+
+    # Warm the pool so connection setup isn't attributed to the first requests.
+    await asyncio.gather(*(fetch_one() for _ in range(args.pool_size)))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(args.requests)))
+    print_report(name, samples, time.perf_counter() - started)
+    await engine.dispose()
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--requests", type=int, default=20_000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--pool-size", type=int, default=settings.DB_POOL_SIZE)
+    parser.add_argument("--max-overflow", type=int, default=settings.DB_MAX_OVERFLOW)
+    args = parser.parse_args()
+
+    seed_engine = create_async_engine(str(settings.SQLALCHEMY_DATABASE_URI))
+    user_ids = await seed_profiles(seed_engine, args.rows)
+    await seed_engine.dispose()
+
+    for name, options in CONFIGURATIONS.items():
+        await run_configuration(name, options, args, user_ids)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,55 @@
+"""
+Primary key index size and insert throughput for UUIDv4 vs UUIDv7 profile ids.
+
+Fills the profile table in batches with each id generator in turn, then reports
+rows/s and the size of the primary key index.
+
+    python -m benchmarks.insert_keys --rows 2000000
+
+The target database is recreated, so point SQLALCHEMY_DATABASE_URI at a scratch one.
+"""
+
+import argparse
+import asyncio
+import time
+import uuid
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.config import settings
+from app.core.ids import uuid7
+from benchmarks._common import seed_profiles
+
+ID_FACTORIES = {"uuid4": uuid.uuid4, "uuid7": uuid7}
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--batch-size", type=int, default=5000)
+    args = parser.parse_args()
+
+    engine = create_async_engine(str(settings.SQLALCHEMY_DATABASE_URI))
+    async with engine.begin() as conn:
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pgstattuple"))
+
+    for name, id_factory in ID_FACTORIES.items():
+        started = time.perf_counter()
+        await seed_profiles(engine, args.rows, batch_size=args.batch_size, id_factory=id_factory)
+        elapsed = time.perf_counter() - started
+
+        async with engine.connect() as conn:
+            pkey_size = await conn.scalar(text("SELECT pg_relation_size('profile_pkey')"))
+            leaf_density = await conn.scalar(
+                text("SELECT avg_leaf_density FROM pgstatindex('profile_pkey')")
+            )
+        print(
+            f"{name:<6} rows={args.rows} rows/s={args.rows / elapsed:>10.1f} "
+            f"pkey_size={pkey_size / 1024 / 1024:.1f}MiB leaf_density={leaf_density:.1f}%"
+        )
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,132 @@
+"""
+Soak test: fails when one worker's memory keeps growing under sustained traffic.
+
+Starts `python -m app.server` with a single worker, sends `--warmup` requests so pools and
+caches reach their steady size, then `--requests` more while sampling the worker's RSS from
+`/proc`. Reads go to `GET /profiles/profile/{user_id}`; with `--token` (a JWT accepted by the
+service) a `--upload-share` of the requests upload a fresh avatar through `PUT /profiles/me`.
+Exits with status 1 when RSS grew by more than `--max-growth-mb` after the warm-up.
+
+    python -m benchmarks.memory_soak --requests 50000 --token "$TOKEN" --max-growth-mb 20
+
+Postgres, Redis and S3 are those configured in `.env`, and the target database is recreated,
+so point SQLALCHEMY_DATABASE_URI at a scratch one. Run with `MEMORY_DIAGNOSTICS_ENABLED=True`
+and an admin token to diff `tracemalloc` snapshots across the run (see the README).
+"""
+
+import argparse
+import asyncio
+import io
+import os
+import random
+import sys
+from pathlib import Path
+
+import httpx
+from PIL import Image
+
+from app.core.config import settings
+from benchmarks.server_throughput import seed, start_server, wait_until_ready
+
+# Worker recycling and rate limits would hide growth or reject the load.
+SERVER_OVERRIDES = {"SERVER_WORKERS": "1", "RATE_LIMIT_ENABLED": "False"}
+
+
+def rss_bytes(pid: int) -> int:
+    for line in Path(f"/proc/{pid}/status").read_text().splitlines():
+        if line.startswith("VmRSS:"):
+            return int(line.split()[1]) * 1024
+    raise RuntimeError(f"No VmRSS for process {pid}")
+
+
+def random_avatar(side: int) -> bytes:
+    # Noise doesn't compress, so every upload is about `3 * side**2` bytes.
+    image = Image.frombytes("RGB", (side, side), os.urandom(3 * side * side))
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+async def drive(client: httpx.AsyncClient, args, user_ids: list[str], requests: int) -> int:
+    """Sends `requests` requests over `args.concurrency` connections; returns the failures."""
+    remaining = requests
+    failures = 0
+    avatar = random_avatar(args.avatar_side)
+    headers = {"Authorization": f"Bearer {args.token}"} if args.token else {}
+
+    async def request() -> httpx.Response:
+        if args.token and random.random() < args.upload_share:
+            return await client.put(
+                "/profiles/me",
+                headers=headers,
+                files={"icon": ("avatar.png", avatar, "image/png")},
+            )
+        return await client.get(f"/profiles/profile/{random.choice(user_ids)}")
+
+    async def connection() -> None:
+        nonlocal remaining, failures
+        while remaining > 0:
+            remaining -= 1
+            try:
+                response = await request()
+                failures += response.is_error
+            except httpx.TransportError:
+                failures += 1
+
+    await asyncio.gather(*(connection() for _ in range(args.concurrency)))
+    return failures
+
+
+async def soak(args, pid: int, base_url: str, user_ids: list[str]) -> int:
+    limits = httpx.Limits(max_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+        if args.token:
+            # Uploads only update an existing profile.
+            headers = {"Authorization": f"Bearer {args.token}"}
+            (await client.get("/profiles/me", headers=headers)).raise_for_status()
+        await drive(client, args, user_ids, args.warmup)
+        baseline = rss_bytes(pid)
+        print(f"after warm-up: rss={baseline / 2**20:.1f}MiB")
+        sent = growth = 0
+        while sent < args.requests:
+            batch = min(args.sample_every, args.requests - sent)
+            failures = await drive(client, args, user_ids, batch)
+            sent += batch
+            growth = rss_bytes(pid) - baseline
+            print(f"requests={sent:<8} failures={failures:<5} growth={growth / 2**20:+.1f}MiB")
+    if growth > args.max_growth_mb * 2**20:
+        print(f"FAIL: RSS grew by {growth / 2**20:.1f}MiB, more than {args.max_growth_mb}MiB")
+        return 1
+    print("OK")
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--requests", type=int, default=50_000)
+    parser.add_argument("--warmup", type=int, default=5_000)
+    parser.add_argument("--sample-every", type=int, default=5_000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--token", default=None)
+    parser.add_argument("--upload-share", type=float, default=0.1)
+    parser.add_argument("--avatar-side", type=int, default=256)
+    parser.add_argument("--max-growth-mb", type=float, default=20.0)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+    if settings.SERVER_LIMIT_MAX_REQUESTS is not None:
+        parser.error("Unset SERVER_LIMIT_MAX_REQUESTS: restarting the worker would hide growth")
+
+    user_ids = asyncio.run(seed(args.rows))
+    base_url = f"http://127.0.0.1:{args.port}"
+    server = start_server(SERVER_OVERRIDES, os.sched_getaffinity(0), args.port)
+    try:
+        wait_until_ready(base_url)
+        return asyncio.run(soak(args, server.pid, base_url, user_ids))
+    finally:
+        server.terminate()
+        server.wait(timeout=settings.SERVER_GRACEFUL_SHUTDOWN_SECONDS + 5)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
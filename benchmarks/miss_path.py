@@ -0,0 +1,105 @@
+"""
+CPU cost of building a `GET /profiles/profile/{user_id}` response on a cache miss.
+
+Compares hydrating the ORM object and serializing it through `ProfileRead` with reading
+the precomputed public document and splicing in the avatar URL. Requests run one at a
+time so the process CPU time can be attributed to them; presigning is left out because
+both paths pay for it equally.
+
+    python -m benchmarks.miss_path --rows 100000 --requests 20000
+
+The target database is recreated, so point SQLALCHEMY_DATABASE_URI at a scratch one.
+"""
+
+import argparse
+import asyncio
+import random
+import time
+
+from sqlalchemy import bindparam, update
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+from sqlalchemy.orm import defer
+from sqlmodel import select
+
+from app.core.config import settings
+from app.models.profile import Profile
+from app.schemas.profile import ProfileRead, build_public_document, render_public_document
+from benchmarks._common import print_report, seed_profiles, timed
+
+AVATAR_URL = "https://bucket.s3.amazonaws.com/icons/avatar.png?X-Amz-Signature=0"
+
+
+async def fill_documents(engine: AsyncEngine, batch_size: int = 5000) -> None:
+    """Seeding bypasses the ORM, so build the documents the service would have stored."""
+    session_factory = async_sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
+    async with session_factory() as session:
+        profiles = (await session.execute(select(Profile))).scalars().all()
+    statement = (
+        update(Profile)
+        .where(Profile.id == bindparam("profile_id"))
+        .values(public_document=bindparam("document"))
+    )
+    for start in range(0, len(profiles), batch_size):
+        rows = [
+            {"profile_id": profile.id, "document": build_public_document(profile)}
+            for profile in profiles[start : start + batch_size]
+        ]
+        async with engine.begin() as conn:
+            await conn.execute(statement, rows)
+
+
+async def orm_response(session: AsyncSession, user_id) -> bytes:
+    statement = select(Profile).options(defer(Profile.public_document))
+    result = await session.execute(statement.where(Profile.user_id == user_id))
+    profile_read = ProfileRead.model_validate(result.scalar_one())
+    profile_read.avatar_url = AVATAR_URL
+    return profile_read.model_dump_json().encode()
+
+
+async def document_response(session: AsyncSession, user_id) -> bytes:
+    result = await session.execute(
+        select(Profile.public_document, Profile.avatar_url).where(Profile.user_id == user_id)
+    )
+    return render_public_document(result.one().public_document, AVATAR_URL)
+
+
+async def run(name: str, build, session_factory, user_ids, requests: int) -> None:
+    async def request() -> None:
+        # A session per request, as in the service, so the identity map starts empty.
+        async with session_factory() as session:
+            await build(session, random.choice(user_ids))
+
+    await request()  # prepare the statement outside the measurement
+    samples: list[float] = []
+    started = time.perf_counter()
+    cpu_started = time.process_time()
+    for _ in range(requests):
+        await timed(request, samples)
+    cpu_seconds = time.process_time() - cpu_started
+    print_report(name, samples, time.perf_counter() - started)
+    print(f"{'':<32} cpu={cpu_seconds / requests * 1_000_000:.1f}us/request")
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--requests", type=int, default=20_000)
+    args = parser.parse_args()
+
+    engine = create_async_engine(str(settings.SQLALCHEMY_DATABASE_URI))
+    user_ids = await seed_profiles(engine, args.rows)
+    await fill_documents(engine)
+    session_factory = async_sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
+
+    await run("ORM + ProfileRead", orm_response, session_factory, user_ids, args.requests)
+    await run("precomputed document", document_response, session_factory, user_ids, args.requests)
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
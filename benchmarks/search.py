@@ -0,0 +1,80 @@
+"""
+Display name search latency over a large seeded table.
+
+Runs the autocomplete query used by `GET /profiles/search` for random short prefixes
+and longer fuzzy queries, bypassing the Redis cache, and checks p99 against a target.
+
+    python -m benchmarks.search --rows 1000000 --requests 5000 --p99-target-ms 25
+
+The target database is recreated, so point SQLALCHEMY_DATABASE_URI at a scratch one.
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+import time
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.api.routers.endpoints import SEARCH_DEFAULT_LIMIT, build_search_statement
+from app.core.config import settings
+from benchmarks._common import percentiles, print_report, random_display_name, seed_profiles, timed
+
+
+def random_query(min_length: int, max_length: int) -> str:
+    name = random_display_name().lower()
+    return name[: random.randint(min_length, max_length)]
+
+
+async def run_queries(session_factory, args, name: str, min_length: int, max_length: int):
+    semaphore = asyncio.Semaphore(args.concurrency)
+    samples: list[float] = []
+
+    async def search() -> None:
+        query = random_query(min_length, max_length)
+        async with session_factory() as session:
+            result = await session.execute(build_search_statement(query, SEARCH_DEFAULT_LIMIT))
+            result.scalars().all()
+
+    async def worker() -> None:
+        async with semaphore:
+            await timed(search, samples)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(args.requests)))
+    print_report(name, samples, time.perf_counter() - started)
+    return samples
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--requests", type=int, default=5_000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--p99-target-ms", type=float, default=25.0)
+    parser.add_argument("--skip-seed", action="store_true")
+    args = parser.parse_args()
+
+    engine = create_async_engine(str(settings.SQLALCHEMY_DATABASE_URI), pool_size=args.concurrency)
+    if not args.skip_seed:
+        await seed_profiles(engine, args.rows)
+        async with engine.begin() as conn:
+            await conn.execute(text("ANALYZE profile"))
+    session_factory = async_sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
+
+    prefix_samples = await run_queries(session_factory, args, "prefix (1-2 chars)", 1, 2)
+    fuzzy_samples = await run_queries(session_factory, args, "prefix + fuzzy (3-8 chars)", 3, 8)
+    await engine.dispose()
+
+    p99 = percentiles(prefix_samples + fuzzy_samples)["p99"]
+    passed = p99 <= args.p99_target_ms
+    print(
+        f"overall p99={p99:.2f}ms target={args.p99_target_ms:.2f}ms {'PASS' if passed else 'FAIL'}"
+    )
+    return 0 if passed else 1
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,139 @@
+"""
+Requests per second one pod serves, by server configuration.
+
+Starts `python -m app.server` once per configuration, pinned to `--server-cpus` CPUs to stand
+in for the pod's CPU limit, and drives `GET /profiles/profile/{user_id}` from load generator
+processes pinned to the remaining CPUs. Postgres and Redis are those configured in `.env`.
+
+    python -m benchmarks.server_throughput --server-cpus 4 --clients 4 --duration 30
+
+The target database is recreated, so point SQLALCHEMY_DATABASE_URI at a scratch one.
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import httpx
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.config import settings
+from benchmarks._common import print_report, seed_profiles, timed
+from benchmarks.miss_path import fill_documents
+
+CONFIGURATIONS = {
+    "1 worker, asyncio + h11": {
+        "SERVER_WORKERS": "1",
+        "SERVER_LOOP": "asyncio",
+        "SERVER_HTTP": "h11",
+    },
+    "1 worker, uvloop + httptools": {"SERVER_WORKERS": "1"},
+    "1 worker per CPU, uvloop + httptools": {},
+}
+
+
+def start_server(overrides: dict[str, str], cpus: set[int], port: int) -> subprocess.Popen:
+    env = os.environ | {"SERVER_PORT": str(port), "SERVER_ROOT_PATH": ""} | overrides
+    cpu_list = ",".join(str(cpu) for cpu in sorted(cpus))
+    return subprocess.Popen(
+        ["taskset", "--cpu-list", cpu_list, sys.executable, "-m", "app.server"],
+        env=env,
+        stdout=subprocess.DEVNULL,
+    )
+
+
+def wait_until_ready(base_url: str, timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"{base_url}/ready").status_code == httpx.codes.OK:
+                return
+        except httpx.TransportError:
+            pass
+        time.sleep(0.5)
+    raise RuntimeError(f"Server at {base_url} did not become ready in {timeout}s")
+
+
+async def drive(base_url: str, user_ids: list[str], concurrency: int, duration: float):
+    samples: list[float] = []
+    deadline = time.perf_counter() + duration
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits) as client:
+
+        async def request() -> None:
+            response = await client.get(f"/profiles/profile/{random.choice(user_ids)}")
+            response.raise_for_status()
+
+        async def connection() -> None:
+            while time.perf_counter() < deadline:
+                await timed(request, samples)
+
+        await asyncio.gather(*(connection() for _ in range(concurrency)))
+    return samples
+
+
+def client_process(base_url, user_ids, concurrency, duration, cpus) -> list[float]:
+    os.sched_setaffinity(0, cpus)
+    return asyncio.run(drive(base_url, user_ids, concurrency, duration))
+
+
+def run_configuration(name: str, overrides: dict[str, str], args, user_ids, cpus) -> None:
+    server_cpus, client_cpus = cpus
+    base_url = f"http://127.0.0.1:{args.port}"
+    server = start_server(overrides, server_cpus, args.port)
+    try:
+        wait_until_ready(base_url)
+        # Warm the cache and every worker's pools outside the measurement.
+        asyncio.run(drive(base_url, user_ids, args.concurrency, 2.0))
+        per_client = max(1, args.concurrency // args.clients)
+        with ProcessPoolExecutor(args.clients) as executor:
+            started = time.perf_counter()
+            futures = [
+                executor.submit(
+                    client_process, base_url, user_ids, per_client, args.duration, client_cpus
+                )
+                for _ in range(args.clients)
+            ]
+            samples = [sample for future in futures for sample in future.result()]
+            elapsed = time.perf_counter() - started
+        print_report(name, samples, elapsed)
+    finally:
+        server.terminate()
+        server.wait(timeout=settings.SERVER_GRACEFUL_SHUTDOWN_SECONDS + 5)
+
+
+async def seed(rows: int) -> list[str]:
+    engine = create_async_engine(str(settings.SQLALCHEMY_DATABASE_URI))
+    user_ids = await seed_profiles(engine, rows)
+    await fill_documents(engine)
+    await engine.dispose()
+    return [str(user_id) for user_id in user_ids]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--server-cpus", type=int, default=4)
+    parser.add_argument("--clients", type=int, default=4)
+    parser.add_argument("--concurrency", type=int, default=256)
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    available = sorted(os.sched_getaffinity(0))
+    if len(available) <= args.server_cpus:
+        parser.error(f"--server-cpus must leave CPUs for the load generator ({len(available)})")
+    cpus = set(available[: args.server_cpus]), set(available[args.server_cpus :])
+
+    user_ids = asyncio.run(seed(args.rows))
+    for name, overrides in CONFIGURATIONS.items():
+        run_configuration(name, overrides, args, user_ids, cpus)
+
+
+if __name__ == "__main__":
+    main()
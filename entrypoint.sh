@@ -12,11 +12,15 @@ echo "Waiting for database to be ready..."
 # done
 # echo >&2 "Postgres is up - continuing..."
 
-echo "Running database migrations..."
-# Ensure Alembic uses the correct config (usually auto-detected via alembic.ini)
-alembic upgrade head
-
-echo "Migrations finished."
+# Checking the revision is much cheaper than `alembic upgrade head`, which loads the app.
+if python -m app.core.migrations; then
+    echo "Database is at head, skipping migrations."
+else
+    echo "Running database migrations..."
+    # Ensure Alembic uses the correct config (usually auto-detected via alembic.ini)
+    alembic upgrade head
+    echo "Migrations finished."
+fi
 
 # Now execute the main container command (passed as arguments to this script)
 # This allows CMD in Dockerfile or command in docker-compose to still work
@@ -6,7 +6,7 @@ from contextlib import asynccontextmanager
 
 os.environ.setdefault("JWT_SECRET_KEY", str(uuid.uuid4()))
 
-from unittest.mock import AsyncMock
+from unittest.mock import AsyncMock, MagicMock
 
 import pytest_asyncio
 import redis.asyncio as aioredis
@@ -14,6 +14,7 @@ from asgi_lifespan import LifespanManager
 from auth_lib.auth import get_current_user_id
 from fastapi import FastAPI
 from httpx import ASGITransport, AsyncClient
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import (
     AsyncSession,
     async_sessionmaker,
@@ -22,8 +23,10 @@ from sqlalchemy.ext.asyncio import (
 from sqlalchemy.pool import NullPool
 from sqlmodel import SQLModel
 
+from app.api.routers.admin import hot_profiles_router
+from app.api.routers.avatars import router as avatar_router
 from app.api.routers.endpoints import router
-from app.core.database import get_async_session
+from app.core.database import get_async_session, get_session_factory
 from app.core.s3_client import S3Client
 
 logger = logging.getLogger(__name__)
@@ -85,6 +88,7 @@ async def test_app():
             logger.info("Dropping existing test tables")
             await conn.run_sync(SQLModel.metadata.drop_all)
             logger.info("Creating new test tables")
+            await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
             await conn.run_sync(SQLModel.metadata.create_all)
             logger.info("Test database connection successful during startup.")
 
@@ -95,6 +99,18 @@ async def test_app():
 
         logger.info("Initializing Mock Redis Client")
         mock_redis_client = AsyncMock(spec=aioredis.Redis)
+        # Redis command methods aren't coroutine functions, so the spec makes them sync mocks.
+        for command in ("get", "set", "delete", "hget", "xadd", "xrevrange"):
+            setattr(mock_redis_client, command, AsyncMock(return_value=None))
+        mock_redis_client.delete.return_value = 0
+        # Rate limit scripts find every token bucket full.
+        mock_redis_client.register_script = MagicMock(
+            return_value=AsyncMock(return_value=[1, b"100"])
+        )
+        mock_pipeline = MagicMock()
+        mock_pipeline.__aenter__.return_value = mock_pipeline
+        mock_pipeline.execute = AsyncMock(return_value=[])
+        mock_redis_client.pipeline = MagicMock(return_value=mock_pipeline)
 
         app.state.s3_client = mock_s3_client
         app.state.redis_client = mock_redis_client
@@ -106,12 +122,16 @@ async def test_app():
 
     app = FastAPI(lifespan=test_lifespan)
     app.include_router(router)
+    app.include_router(avatar_router)
+    app.include_router(hot_profiles_router, prefix="/admin")
     app.dependency_overrides[get_current_user_id] = lambda: TEST_USER_ID
     app.dependency_overrides[get_async_session] = override_get_async_session
+    app.dependency_overrides[get_session_factory] = lambda: TestingAsyncSessionLocal
 
-    async with LifespanManager(app) as manager:
+    async with LifespanManager(app):
         logger.info("We're in!")
-        yield manager.app
+        # LifespanManager.app is a wrapper function; tests need the app to reach app.state.
+        yield app
 
 
 @pytest_asyncio.fixture
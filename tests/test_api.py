@@ -1,13 +1,22 @@
+import datetime
+import json
 import uuid
+from contextlib import asynccontextmanager
 from io import BytesIO
 
 import pytest
 from auth_lib.auth import CurrentUserUUID
 from fastapi import status
 from httpx import AsyncClient
+from PIL import Image
+from sqlalchemy import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import select
 
+from app.api.routers.endpoints import process_avatar_job
+from app.core.avatar_cache import AvatarDiskCache
+from app.core.avatar_jobs import AvatarJob
+from app.core.config import settings
 from app.models.profile import Profile
 
 
@@ -186,6 +195,156 @@ async def test_update_profile_with_icon(
     assert updated_profile.user_id == test_user_id
 
 
+@pytest.mark.asyncio
+async def test_update_profile_with_icon_stores_placeholder(
+    client: AsyncClient, test_user_id: CurrentUserUUID, test_session: AsyncSession
+):
+    # given...
+    test_session.add(Profile(user_id=test_user_id, display_name="User"))
+    await test_session.commit()
+    icon = BytesIO()
+    Image.new("RGB", (256, 256), color="teal").save(icon, format="PNG")
+    icon_file_data = {"icon": ("test_icon.png", BytesIO(icon.getvalue()), "image/png")}
+
+    # when...
+    response = await client.put("/me", data={"display_name": "User"}, files=icon_file_data)
+    result = await test_session.execute(select(Profile).where(Profile.user_id == test_user_id))
+    stored_profile = result.scalar_one()
+    await test_session.refresh(stored_profile)
+
+    # then...
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["avatar_placeholder"].startswith("data:image/webp;base64,")
+    assert stored_profile.avatar_placeholder == response.json()["avatar_placeholder"]
+
+
+@pytest.mark.asyncio
+async def test_update_profile_with_icon_asynchronously_returns_a_job(
+    client: AsyncClient,
+    test_app,
+    test_user_id: CurrentUserUUID,
+    test_session: AsyncSession,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    # given...
+    monkeypatch.setattr(settings, "AVATAR_JOBS_ENABLED", True)
+    test_session.add(Profile(user_id=test_user_id, display_name="User"))
+    await test_session.commit()
+    icon_file_data = {"icon": ("test_icon.png", BytesIO(b"icon"), "image/png")}
+
+    # when...
+    response = await client.put(
+        "/me",
+        data={"bio": "Updated right away"},
+        files=icon_file_data,
+        headers={"Prefer": "respond-async"},
+    )
+    result = await test_session.execute(select(Profile).where(Profile.user_id == test_user_id))
+    stored_profile = result.scalar_one()
+    await test_session.refresh(stored_profile)
+
+    # then...
+    assert response.status_code == status.HTTP_202_ACCEPTED
+    assert response.json()["status"] == "queued"
+    assert response.headers["Location"].endswith(f"/me/avatar-jobs/{response.json()['id']}")
+    assert stored_profile.bio == "Updated right away"
+    assert stored_profile.avatar_url is None
+    test_app.state.s3_client.upload_file.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_update_profile_with_too_large_async_icon_changes_nothing(
+    client: AsyncClient,
+    test_app,
+    test_user_id: CurrentUserUUID,
+    test_session: AsyncSession,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    # given...
+    monkeypatch.setattr(settings, "AVATAR_JOBS_ENABLED", True)
+    monkeypatch.setattr(settings, "AVATAR_JOBS_MAX_UPLOAD_BYTES", len(b"icon") - 1)
+    test_session.add(Profile(user_id=test_user_id, display_name="User", bio="Before"))
+    await test_session.commit()
+    icon_file_data = {"icon": ("test_icon.png", BytesIO(b"icon"), "image/png")}
+
+    # when...
+    response = await client.put(
+        "/me",
+        data={"bio": "After"},
+        files=icon_file_data,
+        headers={"Prefer": "respond-async"},
+    )
+    result = await test_session.execute(select(Profile).where(Profile.user_id == test_user_id))
+    stored_profile = result.scalar_one()
+    await test_session.refresh(stored_profile)
+
+    # then...
+    assert response.status_code == status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+    assert stored_profile.bio == "Before"
+    test_app.state.redis_client.pipeline.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_update_profile_with_icon_that_may_have_been_queued_stores_nothing(
+    client: AsyncClient,
+    test_app,
+    test_user_id: CurrentUserUUID,
+    test_session: AsyncSession,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    # given...
+    monkeypatch.setattr(settings, "AVATAR_JOBS_ENABLED", True)
+    test_session.add(Profile(user_id=test_user_id, display_name="User", bio="Before"))
+    await test_session.commit()
+    # The job was sent, but its reply never arrived.
+    test_app.state.redis_client.pipeline.return_value.execute.side_effect = TimeoutError
+    icon_file_data = {"icon": ("test_icon.png", BytesIO(b"icon"), "image/png")}
+
+    # when...
+    response = await client.put(
+        "/me",
+        data={"bio": "After"},
+        files=icon_file_data,
+        headers={"Prefer": "respond-async"},
+    )
+    result = await test_session.execute(select(Profile).where(Profile.user_id == test_user_id))
+    stored_profile = result.scalar_one()
+    await test_session.refresh(stored_profile)
+
+    # then...
+    assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    assert stored_profile.bio == "Before"
+    test_app.state.s3_client.upload_file.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_avatar_job_attempts_store_the_avatar_under_one_key(
+    test_app, test_user_id: CurrentUserUUID, test_session: AsyncSession
+):
+    # given...
+    test_session.add(Profile(user_id=test_user_id, display_name="User"))
+    await test_session.commit()
+    now = datetime.datetime.now(datetime.UTC)
+    job = AvatarJob(
+        id=str(uuid.uuid4()),
+        user_id=test_user_id,
+        status="processing",
+        content_type="image/png",
+        filename="icon.png",
+        attempts=2,
+        error=None,
+        created_at=now,
+        updated_at=now,
+    )
+
+    # when...
+    await process_avatar_job(test_session, test_app.state.s3_client, None, job, b"icon")
+
+    # then...
+    upload = test_app.state.s3_client.upload_file.await_args
+    assert upload.kwargs["file_uuid"] == job.id
+
+
 @pytest.mark.asyncio
 async def test_update_profile_partially_with_icon(
     client: AsyncClient, test_user_id: CurrentUserUUID, test_session: AsyncSession
@@ -261,3 +420,347 @@ async def test_get_profile_by_id_not_found(client: AsyncClient):
 
     # then...
     assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.asyncio
+async def test_get_profile_by_id_without_redis(
+    client: AsyncClient, test_app, test_user_id: uuid.UUID, test_session: AsyncSession
+):
+    # given...
+    profile = Profile(user_id=test_user_id, display_name="User", bio="Bio")
+    test_session.add(profile)
+    await test_session.commit()
+    test_app.state.redis_client = None
+
+    # when...
+    response = await client.get(f"/profile/{test_user_id}")
+
+    # then...
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["display_name"] == "User"
+
+
+@pytest.mark.asyncio
+async def test_get_profile_by_id_from_public_document(
+    client: AsyncClient, test_app, test_user_id: uuid.UUID, test_session: AsyncSession
+):
+    # given...
+    profile = Profile(user_id=test_user_id, display_name="User", avatar_url="icons/a.png")
+    test_session.add(profile)
+    await test_session.commit()
+    presigned_url = test_app.state.s3_client.get_file_url.return_value
+
+    # when...
+    response = await client.get(f"/profile/{test_user_id}")
+    data = response.json()
+
+    # then...
+    assert profile.public_document is not None
+    assert response.status_code == status.HTTP_200_OK
+    assert data["id"] == str(profile.id)
+    assert data["display_name"] == "User"
+    assert data["avatar_url"] == presigned_url
+
+
+@pytest.mark.asyncio
+async def test_get_profile_by_id_without_public_document(
+    client: AsyncClient, test_user_id: uuid.UUID, test_session: AsyncSession
+):
+    # given...
+    await test_session.execute(
+        insert(Profile).values(id=uuid.uuid4(), user_id=test_user_id, display_name="Imported")
+    )
+    await test_session.commit()
+
+    # when...
+    response = await client.get(f"/profile/{test_user_id}")
+
+    # then...
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["display_name"] == "Imported"
+
+
+@pytest.mark.asyncio
+async def test_get_profile_by_id_with_fields(
+    client: AsyncClient, test_app, test_user_id: uuid.UUID, test_session: AsyncSession
+):
+    # given...
+    profile = Profile(
+        user_id=test_user_id, display_name="User", bio="Bio", avatar_url="icons/a.png"
+    )
+    test_session.add(profile)
+    await test_session.commit()
+    get_file_url = test_app.state.s3_client.get_file_url
+    get_file_url.reset_mock()
+
+    # when...
+    response = await client.get(f"/profile/{test_user_id}", params={"fields": "display_name"})
+
+    # then...
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {"display_name": "User"}
+    get_file_url.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_get_profile_by_id_rejects_unknown_fields(
+    client: AsyncClient, test_user_id: uuid.UUID
+):
+    # when...
+    response = await client.get(f"/profile/{test_user_id}", params={"fields": "display_name,email"})
+
+    # then...
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.asyncio
+async def test_list_profiles_with_fields(client: AsyncClient, test_session: AsyncSession):
+    # given...
+    for display_name in ["first", "second"]:
+        test_session.add(Profile(user_id=uuid.uuid4(), display_name=display_name, bio="Bio"))
+    await test_session.commit()
+
+    # when...
+    response = await client.get("/", params={"fields": "display_name", "limit": 1})
+    data = response.json()
+
+    # then...
+    assert response.status_code == status.HTTP_200_OK
+    assert data["items"] == [{"display_name": "first"}]
+    assert data["next_cursor"]
+
+
+@pytest.mark.asyncio
+async def test_list_profiles_paginates_with_cursor(client: AsyncClient, test_session: AsyncSession):
+    # given...
+    display_names = [f"user_{i}" for i in range(3)]
+    for display_name in display_names:
+        test_session.add(Profile(user_id=uuid.uuid4(), display_name=display_name))
+        await test_session.commit()
+
+    # when...
+    first_page = (await client.get("/", params={"limit": 2})).json()
+    second_page = (
+        await client.get("/", params={"limit": 2, "cursor": first_page["next_cursor"]})
+    ).json()
+
+    # then...
+    assert [item["display_name"] for item in first_page["items"]] == display_names[:2]
+    assert [item["display_name"] for item in second_page["items"]] == display_names[2:]
+    assert second_page["next_cursor"] is None
+
+
+@pytest.mark.asyncio
+async def test_list_profiles_streams_ndjson(client: AsyncClient, test_session: AsyncSession):
+    # given...
+    test_session.add(Profile(user_id=uuid.uuid4(), display_name="First"))
+    test_session.add(Profile(user_id=uuid.uuid4(), avatar_url="icons/avatar.png"))
+    await test_session.commit()
+
+    # when...
+    response = await client.get("/", params={"format": "ndjson"})
+    lines = [json.loads(line) for line in response.text.splitlines()]
+
+    # then...
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert len(lines) == 2  # noqa: PLR2004
+    assert any(line["avatar_url"] for line in lines)
+
+
+@pytest.mark.asyncio
+async def test_list_profiles_rejects_invalid_cursor(client: AsyncClient):
+    # when...
+    response = await client.get("/", params={"cursor": "not-a-cursor"})
+
+    # then...
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.asyncio
+async def test_search_profiles_by_prefix_and_similarity(
+    client: AsyncClient, test_session: AsyncSession
+):
+    # given...
+    for display_name in ["Johnny", "Jonathan", "Alice"]:
+        test_session.add(Profile(user_id=uuid.uuid4(), display_name=display_name))
+    await test_session.commit()
+
+    # when...
+    prefix_response = await client.get("/search", params={"q": "jo"})
+    fuzzy_response = await client.get("/search", params={"q": "alise"})
+
+    # then...
+    assert prefix_response.status_code == status.HTTP_200_OK
+    assert {item["display_name"] for item in prefix_response.json()} == {"Johnny", "Jonathan"}
+    assert [item["display_name"] for item in fuzzy_response.json()] == ["Alice"]
+
+
+@pytest.mark.asyncio
+async def test_update_profile_publishes_change_event(
+    client: AsyncClient, test_app, test_user_id: CurrentUserUUID, test_session: AsyncSession
+):
+    # given...
+    test_session.add(Profile(user_id=test_user_id))
+    await test_session.commit()
+    redis_client = test_app.state.redis_client
+    redis_client.xadd.reset_mock()
+
+    # when...
+    response = await client.put("/me", data={"display_name": "Renamed"})
+
+    # then...
+    assert response.status_code == status.HTTP_200_OK
+    redis_client.xadd.assert_awaited_once()
+    stream, fields = redis_client.xadd.await_args.args
+    event = json.loads(fields[b"event"])
+    assert stream == "profile:events"
+    assert event["type"] == "updated"
+    assert event["user_id"] == str(test_user_id)
+    assert event["display_name"] == "Renamed"
+
+
+@pytest.mark.asyncio
+async def test_update_profile_reports_rate_limit(
+    client: AsyncClient, test_app, test_user_id: CurrentUserUUID, test_session: AsyncSession
+):
+    # given...
+    test_session.add(Profile(user_id=test_user_id))
+    await test_session.commit()
+
+    # when...
+    response = await client.put("/me", data={"display_name": "Renamed"})
+
+    # then...
+    assert response.status_code == status.HTTP_200_OK
+    assert "RateLimit-Limit" in response.headers
+    assert "RateLimit-Remaining" in response.headers
+    test_app.state.redis_client.register_script.assert_called()
+
+
+@pytest.mark.asyncio
+async def test_update_profile_over_rate_limit(
+    client: AsyncClient, test_app, test_user_id: CurrentUserUUID, test_session: AsyncSession
+):
+    # given...
+    test_session.add(Profile(user_id=test_user_id, display_name="Original"))
+    await test_session.commit()
+    test_app.state.redis_client.register_script.return_value.return_value = [0, b"0.5"]
+    icon_file_data = {"icon": ("test_icon.png", BytesIO(b"icon"), "image/png")}
+
+    # when...
+    response = await client.put("/me", data={"display_name": "Renamed"}, files=icon_file_data)
+    result = await test_session.execute(select(Profile).where(Profile.user_id == test_user_id))
+
+    # then...
+    assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+    assert int(response.headers["Retry-After"]) > 0
+    assert response.headers["RateLimit-Remaining"] == "0"
+    test_app.state.s3_client.upload_file.assert_not_awaited()
+    assert result.scalar_one().display_name == "Original"
+
+
+@pytest.mark.asyncio
+async def test_get_profile_event_cursor(client: AsyncClient, test_app):
+    # given...
+    test_app.state.redis_client.xrevrange.return_value = [(b"1760000000000-0", {})]
+
+    # when...
+    response = await client.get("/events/cursor")
+
+    # then...
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {"stream": "profile:events", "last_id": "1760000000000-0"}
+
+
+class FakeS3Body:
+    def __init__(self, content: bytes):
+        self.content = content
+
+    async def iter_chunks(self, chunk_size: int):
+        for start in range(0, len(self.content), chunk_size):
+            yield self.content[start : start + chunk_size]
+
+    def close(self):
+        pass
+
+
+def fake_open_object(content: bytes, calls: list[str]):
+    @asynccontextmanager
+    async def open_object(object_key, byte_range=None, if_none_match=None):
+        calls.append(object_key)
+        yield {
+            "Body": FakeS3Body(content),
+            "ContentType": "image/png",
+            "ContentLength": len(content),
+            "ETag": '"avatar-etag"',
+            "LastModified": datetime.datetime(2026, 1, 1, tzinfo=datetime.UTC),
+        }
+
+    return open_object
+
+
+@pytest.mark.asyncio
+async def test_get_avatar_fills_and_serves_from_disk_cache(client: AsyncClient, test_app, tmp_path):
+    # given...
+    content = b"\x89PNG avatar bytes"
+    calls: list[str] = []
+    test_app.state.s3_client.open_object = fake_open_object(content, calls)
+    test_app.state.avatar_cache = AvatarDiskCache(tmp_path, max_bytes=1024 * 1024)
+
+    # when...
+    from_s3 = await client.get("/avatar/icons/avatar.png")
+    from_disk = await client.get("/avatar/icons/avatar.png")
+
+    # then...
+    assert from_s3.status_code == status.HTTP_200_OK
+    assert from_s3.content == content
+    assert "immutable" in from_s3.headers["Cache-Control"]
+    assert from_disk.status_code == status.HTTP_200_OK
+    assert from_disk.content == content
+    assert from_disk.headers["ETag"] == '"avatar-etag"'
+    assert calls == ["icons/avatar.png"]
+
+
+@pytest.mark.asyncio
+async def test_get_avatar_range_and_conditional_requests(client: AsyncClient, test_app, tmp_path):
+    # given...
+    content = b"0123456789"
+    test_app.state.s3_client.open_object = fake_open_object(content, [])
+    test_app.state.avatar_cache = AvatarDiskCache(tmp_path, max_bytes=1024 * 1024)
+    await client.get("/avatar/icons/avatar.png")
+
+    # when...
+    ranged = await client.get("/avatar/icons/avatar.png", headers={"Range": "bytes=2-5"})
+    not_modified = await client.get(
+        "/avatar/icons/avatar.png", headers={"If-None-Match": '"avatar-etag"'}
+    )
+
+    # then...
+    assert ranged.status_code == status.HTTP_206_PARTIAL_CONTENT
+    assert ranged.content == b"2345"
+    assert ranged.headers["Content-Range"] == "bytes 2-5/10"
+    assert not_modified.status_code == status.HTTP_304_NOT_MODIFIED
+
+
+@pytest.mark.asyncio
+async def test_get_avatar_rejects_keys_outside_icons(client: AsyncClient, test_app):
+    # given...
+    calls: list[str] = []
+    test_app.state.s3_client.open_object = fake_open_object(b"", calls)
+
+    # when...
+    response = await client.get("/avatar/private/report.pdf")
+
+    # then...
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+    assert calls == []
+
+
+@pytest.mark.asyncio
+async def test_hot_profiles_are_only_listed_to_admins(client: AsyncClient):
+    # when...
+    response = await client.get("/admin/hot-profiles")
+
+    # then...
+    assert response.status_code == status.HTTP_403_FORBIDDEN
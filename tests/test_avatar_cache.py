@@ -0,0 +1,51 @@
+import os
+
+from app.core.avatar_cache import AvatarDiskCache, AvatarMetadata
+
+METADATA = AvatarMetadata("image/png", '"etag"', "Thu, 01 Jan 2026 00:00:00 GMT")
+ENTRY_SIZE = 100
+
+
+def store(cache: AvatarDiskCache, object_key: str, size: int = ENTRY_SIZE) -> None:
+    writer = cache.open_writer(object_key, METADATA)
+    writer.write(b"x" * size)
+    writer.commit()
+
+
+def test_cache_returns_committed_entries_only(tmp_path):
+    # given...
+    cache = AvatarDiskCache(tmp_path, max_bytes=10 * ENTRY_SIZE)
+    store(cache, "icons/committed.png")
+    writer = cache.open_writer("icons/aborted.png", METADATA)
+    writer.write(b"partial")
+
+    # when...
+    writer.abort()
+
+    # then...
+    cached = cache.get("icons/committed.png")
+    assert cached is not None
+    assert cached.size == ENTRY_SIZE
+    assert cached.metadata == METADATA
+    assert cache.get("icons/aborted.png") is None
+    assert {path.name for path in tmp_path.iterdir()} == {
+        path.name for path in cache.paths("icons/committed.png")
+    }
+
+
+def test_cache_evicts_least_recently_used_entries(tmp_path):
+    # given...
+    cache = AvatarDiskCache(tmp_path, max_bytes=3 * ENTRY_SIZE)
+    for index, object_key in enumerate(["icons/a.png", "icons/b.png", "icons/c.png"]):
+        store(cache, object_key)
+        data_path, _ = cache.paths(object_key)
+        os.utime(data_path, (index, index))
+    cache.get("icons/a.png")  # refreshes the oldest entry
+
+    # when...
+    store(cache, "icons/d.png")
+
+    # then...
+    assert cache.get("icons/b.png") is None
+    assert cache.get("icons/a.png") is not None
+    assert cache.get("icons/d.png") is not None
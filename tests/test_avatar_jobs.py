@@ -0,0 +1,159 @@
+import asyncio
+import datetime
+import uuid
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+import redis.asyncio as aioredis
+
+from app.core.avatar_jobs import (
+    AvatarJobFailedError,
+    AvatarJobWorker,
+    avatar_job_contents_key,
+    avatar_job_key,
+)
+from app.core.config import settings
+from app.core.redis_client import create_redis_client
+
+JOB_ID = "0192f6a8-7b3c-7d2e-8f10-1a2b3c4d5e6f"
+USER_ID = uuid.UUID("0b6f3c55-2d1f-4a8a-9d0e-6f1c7a7c2b11")
+MAX_ATTEMPTS = 2
+SOCKET_TIMEOUT_SECONDS = 0.05
+BLOCK_SECONDS = 0.2
+
+
+def mock_redis(attempts: int = 1, upload: bytes | None = b"icon") -> AsyncMock:
+    redis = AsyncMock(spec=aioredis.Redis)
+    now = datetime.datetime.now(datetime.UTC).isoformat().encode()
+    redis.hgetall = AsyncMock(
+        return_value={
+            b"user_id": str(USER_ID).encode(),
+            b"status": b"queued",
+            b"content_type": b"image/png",
+            b"filename": b"icon.png",
+            b"attempts": str(attempts - 1).encode(),
+            b"created_at": now,
+            b"updated_at": now,
+        }
+    )
+    redis.hincrby = AsyncMock(return_value=attempts)
+    redis.get = AsyncMock(return_value=upload)
+    pipeline = MagicMock()
+    pipeline.__aenter__.return_value = pipeline
+    pipeline.execute = AsyncMock(return_value=[])
+    redis.pipeline = MagicMock(return_value=pipeline)
+    return redis
+
+
+def final_status(redis: AsyncMock) -> str:
+    pipeline = redis.pipeline.return_value
+    return pipeline.hset.call_args_list[-1].kwargs["mapping"]["status"]
+
+
+@pytest.mark.asyncio
+async def test_worker_processes_the_staged_upload():
+    # given...
+    redis = mock_redis()
+    process = AsyncMock()
+    worker = AvatarJobWorker(redis, process)
+
+    # when...
+    done = await worker.handle(JOB_ID)
+
+    # then...
+    assert done
+    job, contents = process.await_args.args
+    assert (job.user_id, job.content_type, contents) == (USER_ID, "image/png", b"icon")
+    assert final_status(redis) == "succeeded"
+    redis.pipeline.return_value.delete.assert_called_with(avatar_job_contents_key(JOB_ID))
+
+
+@pytest.mark.asyncio
+async def test_worker_fails_jobs_that_cannot_succeed_at_once():
+    # given...
+    redis = mock_redis()
+    worker = AvatarJobWorker(redis, AsyncMock(side_effect=AvatarJobFailedError("Unknown type")))
+
+    # when...
+    done = await worker.handle(JOB_ID)
+
+    # then...
+    assert done
+    mapping = redis.pipeline.return_value.hset.call_args_list[-1].kwargs["mapping"]
+    assert (mapping["status"], mapping["error"]) == ("failed", "Unknown type")
+
+
+@pytest.mark.asyncio
+async def test_worker_leaves_failed_jobs_pending_until_the_last_attempt():
+    # given...
+    process = AsyncMock(side_effect=ConnectionError("S3 unreachable"))
+    retried = mock_redis(attempts=MAX_ATTEMPTS - 1)
+    exhausted = mock_redis(attempts=MAX_ATTEMPTS)
+
+    # when...
+    retried_done = await AvatarJobWorker(retried, process, max_attempts=MAX_ATTEMPTS).handle(JOB_ID)
+    exhausted_done = await AvatarJobWorker(exhausted, process, max_attempts=MAX_ATTEMPTS).handle(
+        JOB_ID
+    )
+
+    # then...
+    assert not retried_done
+    assert final_status(retried) == "queued"
+    assert exhausted_done
+    assert final_status(exhausted) == "failed"
+
+
+@pytest.mark.asyncio
+async def test_worker_fails_jobs_whose_upload_expired():
+    # given...
+    redis = mock_redis(upload=None)
+    process = AsyncMock()
+
+    # when...
+    done = await AvatarJobWorker(redis, process).handle(JOB_ID)
+
+    # then...
+    assert done
+    process.assert_not_awaited()
+    assert final_status(redis) == "failed"
+    redis.hincrby.assert_awaited_with(avatar_job_key(JOB_ID), "attempts", 1)
+
+
+async def serve_idle_stream(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    """Answers like Redis with an empty stream, holding XREADGROUP for its BLOCK time."""
+    while header := await reader.readline():
+        args = []
+        for _ in range(int(header[1:])):
+            length = int((await reader.readline())[1:])
+            args.append((await reader.readexactly(length + 2))[:-2].upper())
+        if args[0] == b"XAUTOCLAIM":
+            writer.write(b"*3\r\n$3\r\n0-0\r\n*0\r\n*0\r\n")
+        elif args[0] == b"XREADGROUP":
+            await asyncio.sleep(int(args[args.index(b"BLOCK") + 1]) / 1000)
+            writer.write(b"*-1\r\n")
+        else:
+            writer.write(b"+OK\r\n")
+        await writer.drain()
+    writer.close()
+
+
+@pytest.mark.asyncio
+async def test_worker_waits_out_its_block_time_on_an_idle_stream(monkeypatch: pytest.MonkeyPatch):
+    # given...
+    server = await asyncio.start_server(serve_idle_stream, "127.0.0.1", 0)
+    monkeypatch.setattr(settings, "REDIS_MODE", "standalone")
+    monkeypatch.setattr(settings, "REDIS_HOST", "127.0.0.1")
+    monkeypatch.setattr(settings, "REDIS_PORT", server.sockets[0].getsockname()[1])
+    monkeypatch.setattr(settings, "REDIS_SOCKET_TIMEOUT", SOCKET_TIMEOUT_SECONDS)
+    redis = create_redis_client(block=BLOCK_SECONDS)
+    worker = AvatarJobWorker(redis, AsyncMock(), block=BLOCK_SECONDS)
+
+    # when...
+    try:
+        read = await worker.run_once()
+    finally:
+        await redis.aclose()
+        server.close()
+
+    # then...
+    assert read == 0
@@ -0,0 +1,217 @@
+import time
+import uuid
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+import redis.asyncio as aioredis
+from fastapi import HTTPException, status
+
+from app.api.routers.uploads import _get_own_upload, _render_placeholder
+from app.core.avatar_uploads import (
+    AvatarUploadStore,
+    UploadBusyError,
+    UploadOffsetMismatchError,
+)
+from app.core.config import settings
+from app.core.s3_client import S3Client
+
+UPLOAD_ID = "0192f6a8-7b3c-7d2e-8f10-1a2b3c4d5e6f"
+USER_ID = uuid.UUID("0b6f3c55-2d1f-4a8a-9d0e-6f1c7a7c2b11")
+OBJECT_KEY = "user-icon/icon.png"
+S3_UPLOAD_ID = "s3-upload"
+LENGTH = 10
+PART_SIZE = 4
+PENDING = b"abc"
+
+
+def mock_redis(offset: int = 0, pending: bytes | None = None, parts: int = 0) -> AsyncMock:
+    redis = AsyncMock(spec=aioredis.Redis)
+    redis.hgetall = AsyncMock(
+        return_value={
+            b"user_id": str(USER_ID).encode(),
+            b"object_key": OBJECT_KEY.encode(),
+            b"s3_upload_id": S3_UPLOAD_ID.encode(),
+            b"length": str(LENGTH).encode(),
+            b"offset": str(offset).encode(),
+            b"parts": str(parts).encode(),
+            b"assembled": b"0",
+            b"expires_at": str(int(time.time()) + 3600).encode(),
+        }
+    )
+    redis.set = AsyncMock(return_value=True)
+    redis.register_script = MagicMock(return_value=AsyncMock(return_value=1))
+    redis.strlen = AsyncMock(return_value=len(pending or b""))
+    redis.get = AsyncMock(return_value=pending)
+    redis.lrange = AsyncMock(return_value=[f"etag-{n}".encode() for n in range(1, parts + 1)])
+    pipeline = MagicMock()
+    pipeline.__aenter__.return_value = pipeline
+    pipeline.execute = AsyncMock(return_value=[])
+    redis.pipeline = MagicMock(return_value=pipeline)
+    return redis
+
+
+def mock_s3() -> AsyncMock:
+    s3 = AsyncMock(spec=S3Client)
+    s3.upload_part = AsyncMock(return_value="etag-new")
+    return s3
+
+
+@pytest.mark.asyncio
+async def test_small_chunks_are_collected_in_redis():
+    # given...
+    redis, s3 = mock_redis(), mock_s3()
+    store = AvatarUploadStore(redis, s3, part_size=PART_SIZE)
+    upload = await store.get(UPLOAD_ID)
+
+    # when...
+    upload = await store.append(upload, 0, PENDING)
+
+    # then...
+    assert upload.offset == len(PENDING)
+    redis.pipeline.return_value.append.assert_called_once_with(
+        f"avatar:upload:{{{UPLOAD_ID}}}:pending", PENDING
+    )
+    redis.get.assert_not_awaited()
+    s3.upload_part.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_a_full_part_is_sent_to_s3():
+    # given...
+    redis, s3 = mock_redis(offset=len(PENDING), pending=PENDING), mock_s3()
+    store = AvatarUploadStore(redis, s3, part_size=PART_SIZE)
+    upload = await store.get(UPLOAD_ID)
+
+    # when...
+    upload = await store.append(upload, len(PENDING), b"de")
+
+    # then...
+    assert (upload.offset, upload.parts) == (len(b"abcde"), 1)
+    s3.upload_part.assert_awaited_once_with(OBJECT_KEY, S3_UPLOAD_ID, 1, b"abcde")
+    redis.pipeline.return_value.rpush.assert_called_once_with(
+        f"avatar:upload:{{{UPLOAD_ID}}}:parts", "etag-new"
+    )
+
+
+@pytest.mark.asyncio
+async def test_a_chunk_at_the_wrong_offset_is_refused():
+    # given...
+    redis, s3 = mock_redis(offset=len(PENDING), pending=PENDING), mock_s3()
+    store = AvatarUploadStore(redis, s3, part_size=PART_SIZE)
+    upload = await store.get(UPLOAD_ID)
+
+    # when...
+    with pytest.raises(UploadOffsetMismatchError) as error:
+        await store.append(upload, 0, PENDING)
+
+    # then...
+    assert error.value.offset == len(PENDING)
+    s3.upload_part.assert_not_awaited()
+    token = redis.set.await_args.args[1]
+    redis.register_script.return_value.assert_awaited_once_with(
+        keys=[f"avatar:upload:{{{UPLOAD_ID}}}:lock"], args=[token]
+    )
+
+
+@pytest.mark.asyncio
+async def test_an_upload_being_written_to_is_not_deleted():
+    # given...
+    redis, s3 = mock_redis(), mock_s3()
+    store = AvatarUploadStore(redis, s3, part_size=PART_SIZE)
+    upload = await store.get(UPLOAD_ID)
+    redis.set.return_value = False
+
+    # when...
+    with pytest.raises(UploadBusyError):
+        await store.delete(upload)
+
+    # then...
+    s3.abort_multipart_upload.assert_not_awaited()
+    redis.pipeline.return_value.delete.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_assembling_sends_the_remainder_as_the_last_part():
+    # given...
+    redis, s3 = mock_redis(offset=LENGTH, pending=b"ij", parts=2), mock_s3()
+    store = AvatarUploadStore(redis, s3, part_size=PART_SIZE)
+    upload = await store.get(UPLOAD_ID)
+
+    # when...
+    upload = await store.assemble(upload)
+
+    # then...
+    assert upload.assembled
+    s3.upload_part.assert_awaited_once_with(OBJECT_KEY, S3_UPLOAD_ID, 3, b"ij")
+    s3.complete_multipart_upload.assert_awaited_once_with(
+        OBJECT_KEY, S3_UPLOAD_ID, [(1, "etag-1"), (2, "etag-2"), (3, "etag-new")]
+    )
+
+
+@pytest.mark.asyncio
+async def test_sweep_aborts_expired_uploads_once():
+    # given...
+    redis, s3 = mock_redis(), mock_s3()
+    redis.zrangebyscore = AsyncMock(
+        return_value=[f"{OBJECT_KEY} {S3_UPLOAD_ID}".encode(), b"user-icon/other.png other"]
+    )
+    # Another worker already took the second one.
+    redis.zrem = AsyncMock(side_effect=[1, 0])
+    store = AvatarUploadStore(redis, s3)
+
+    # when...
+    aborted = await store.sweep()
+
+    # then...
+    assert aborted == 1
+    s3.abort_multipart_upload.assert_awaited_once_with(OBJECT_KEY, S3_UPLOAD_ID)
+
+
+@pytest.mark.asyncio
+async def test_the_placeholder_reads_a_bounded_range(monkeypatch: pytest.MonkeyPatch):
+    # given...
+    monkeypatch.setattr(settings, "AVATAR_UPLOADS_PLACEHOLDER_MAX_BYTES", LENGTH)
+    s3 = mock_s3()
+    body = MagicMock(read=AsyncMock(return_value=b"not an image"))
+    s3.open_object = MagicMock(
+        return_value=MagicMock(__aenter__=AsyncMock(return_value={"Body": body}))
+    )
+    store = AvatarUploadStore(mock_redis(offset=LENGTH), s3)
+    upload = await store.get(UPLOAD_ID)
+
+    # when...
+    await _render_placeholder(s3, upload)
+
+    # then...
+    s3.open_object.assert_called_once_with(OBJECT_KEY, byte_range=f"bytes=0-{LENGTH - 1}")
+
+
+@pytest.mark.asyncio
+async def test_a_large_upload_is_not_read_back_for_a_placeholder(monkeypatch: pytest.MonkeyPatch):
+    # given...
+    monkeypatch.setattr(settings, "AVATAR_UPLOADS_PLACEHOLDER_MAX_BYTES", LENGTH - 1)
+    s3 = mock_s3()
+    store = AvatarUploadStore(mock_redis(offset=LENGTH), s3)
+    upload = await store.get(UPLOAD_ID)
+
+    # when...
+    placeholder = await _render_placeholder(s3, upload)
+
+    # then...
+    assert placeholder is None
+    s3.open_object.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_an_unreachable_redis_makes_uploads_unavailable():
+    # given...
+    redis = mock_redis()
+    redis.hgetall.side_effect = aioredis.ConnectionError("Connection refused")
+    store = AvatarUploadStore(redis, mock_s3())
+
+    # when...
+    with pytest.raises(HTTPException) as error:
+        await _get_own_upload(store, UPLOAD_ID, USER_ID)
+
+    # then...
+    assert error.value.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
@@ -0,0 +1,79 @@
+import datetime
+import uuid
+
+import pytest
+
+from app.core.cache_codec import (
+    MSGPACK_V1,
+    MSGPACK_V1_ZLIB,
+    JsonProfileCodec,
+    MsgpackProfileCodec,
+    decode_profile,
+    decode_profile_json,
+)
+from app.schemas.profile import ProfileRead
+
+PRESIGNED_URL = (
+    "https://fastboosty-profile-bucket.s3.amazonaws.com/icons/avatar.png"
+    "?X-Amz-Algorithm=AWS4-HMAC-SHA256&X-Amz-Expires=86400&X-Amz-SignedHeaders=host"
+    "&X-Amz-Signature=" + "ab" * 32
+)
+PLACEHOLDER = "data:image/webp;base64,UklGRh4AAABXRUJQVlA4TBEAAAAvAAAAAAfQ//73v/+BiOh/AAA="
+
+
+def build_profile(**overrides) -> ProfileRead:
+    now = datetime.datetime(2026, 10, 19, 12, 30, 15, 123456, tzinfo=datetime.UTC)
+    fields = {
+        "id": uuid.uuid4(),
+        "user_id": uuid.uuid4(),
+        "display_name": "Creator",
+        "bio": "Makes things",
+        "avatar_url": PRESIGNED_URL,
+        "avatar_placeholder": PLACEHOLDER,
+        "created_at": now,
+        "updated_at": now + datetime.timedelta(minutes=5),
+    }
+    return ProfileRead(**(fields | overrides))
+
+
+@pytest.mark.parametrize("compress_min_bytes", [0, 10_000])
+def test_msgpack_codec_round_trips_profiles(compress_min_bytes: int):
+    # given...
+    profile = build_profile()
+    codec = MsgpackProfileCodec(compress_min_bytes=compress_min_bytes)
+
+    # when...
+    entry = codec.encode(profile)
+
+    # then...
+    assert entry[0] == (MSGPACK_V1_ZLIB if compress_min_bytes == 0 else MSGPACK_V1)
+    assert len(entry) < len(JsonProfileCodec().encode(profile))
+    assert decode_profile(entry) == profile
+    assert decode_profile_json(entry) == profile.model_dump_json().encode()
+
+
+def test_decoders_accept_json_entries_and_reject_unknown_formats():
+    # given...
+    profile = build_profile(avatar_url=None, avatar_placeholder=None, bio=None)
+    json_entry = JsonProfileCodec().encode(profile)
+
+    # when...
+    decoded = decode_profile(json_entry)
+    body = decode_profile_json(json_entry)
+
+    # then...
+    assert decoded == profile
+    assert body is json_entry
+    with pytest.raises(ValueError):
+        decode_profile(b"\x7f" + json_entry)
+
+
+def test_msgpack_codec_keeps_placeholders_it_cannot_pack_as_bytes():
+    # given...
+    profile = build_profile(avatar_placeholder="data:image/webp;base64,not base64")
+
+    # when...
+    decoded = decode_profile(MsgpackProfileCodec().encode(profile))
+
+    # then...
+    assert decoded.avatar_placeholder == profile.avatar_placeholder
@@ -0,0 +1,87 @@
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+import redis.asyncio as aioredis
+from redis.asyncio.cluster import RedisCluster
+
+from app.core.cache_invalidation import (
+    PROFILE_CHANGES_CHANNEL,
+    ProfileChangeListener,
+    invalidate_profiles,
+)
+
+USER_ID = "0b6f3c55-2d1f-4a8a-9d0e-6f1c7a7c2b11"
+
+
+@pytest.mark.asyncio
+async def test_invalidate_profiles_deletes_keys_in_batches():
+    # given...
+    redis = AsyncMock(spec=aioredis.Redis)
+    redis.delete = AsyncMock()
+
+    # when...
+    await invalidate_profiles(redis, ["a", "b"], batch_size=4)
+
+    # then...
+    assert [call.args for call in redis.delete.await_args_list] == [
+        ("profile:{a}:me", "profile:{a}:user", "profile:{a}:fields", "profile:{b}:me"),
+        ("profile:{b}:user", "profile:{b}:fields"),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_invalidate_profiles_on_a_cluster_deletes_each_slot_separately():
+    # given...
+    redis = AsyncMock(spec=RedisCluster)
+    pipeline = MagicMock()
+    pipeline.__aenter__.return_value = pipeline
+    pipeline.execute = AsyncMock(return_value=[3, 3])
+    redis.pipeline = MagicMock(return_value=pipeline)
+
+    # when...
+    await invalidate_profiles(redis, ["a", "b"])
+
+    # then...
+    assert sorted(call.args for call in pipeline.delete.call_args_list) == [
+        ("profile:{a}:me", "profile:{a}:user", "profile:{a}:fields"),
+        ("profile:{b}:me", "profile:{b}:user", "profile:{b}:fields"),
+    ]
+    pipeline.execute.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_listener_coalesces_notifications():
+    # given...
+    redis = AsyncMock(spec=aioredis.Redis)
+    redis.delete = AsyncMock()
+    listener = ProfileChangeListener(redis, dsn="postgresql://unused")
+    for _ in range(3):
+        listener._on_notification(None, 1, PROFILE_CHANGES_CHANNEL, USER_ID)
+
+    # when...
+    flushed = await listener.flush()
+
+    # then...
+    assert flushed
+    redis.delete.assert_awaited_once_with(
+        f"profile:{{{USER_ID}}}:me", f"profile:{{{USER_ID}}}:user", f"profile:{{{USER_ID}}}:fields"
+    )
+
+
+@pytest.mark.asyncio
+async def test_listener_keeps_pending_profiles_when_redis_fails():
+    # given...
+    redis = AsyncMock(spec=aioredis.Redis)
+    redis.delete = AsyncMock()
+    redis.delete.side_effect = [aioredis.ConnectionError("down"), 2]
+    listener = ProfileChangeListener(redis, dsn="postgresql://unused")
+    listener._on_notification(None, 1, PROFILE_CHANGES_CHANNEL, USER_ID)
+
+    # when...
+    first_attempt = await listener.flush()
+    second_attempt = await listener.flush()
+
+    # then...
+    assert not first_attempt
+    assert second_attempt
+    assert redis.delete.await_count == 2  # noqa: PLR2004
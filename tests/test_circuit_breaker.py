@@ -0,0 +1,96 @@
+import asyncio
+
+import pytest
+
+from app.core.circuit_breaker import CircuitBreaker, CircuitOpenError, CircuitState
+
+
+async def failing_call():
+    raise ConnectionError("dependency is down")
+
+
+async def successful_call():
+    return "ok"
+
+
+async def slow_call():
+    await asyncio.sleep(1)
+
+
+@pytest.mark.asyncio
+async def test_breaker_opens_after_consecutive_failures():
+    # given...
+    breaker = CircuitBreaker("test", failure_threshold=2, recovery_timeout=60)
+
+    # when...
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            await breaker.call(failing_call)
+
+    # then...
+    assert breaker.state == CircuitState.OPEN
+    with pytest.raises(CircuitOpenError):
+        await breaker.call(successful_call)
+
+
+@pytest.mark.asyncio
+async def test_breaker_closes_after_successful_probe():
+    # given...
+    breaker = CircuitBreaker("test", failure_threshold=1, recovery_timeout=0)
+    with pytest.raises(ConnectionError):
+        await breaker.call(failing_call)
+
+    # when...
+    result = await breaker.call(successful_call)
+
+    # then...
+    assert result == "ok"
+    assert breaker.state == CircuitState.CLOSED
+
+
+@pytest.mark.asyncio
+async def test_breaker_reopens_after_failed_probe():
+    # given...
+    breaker = CircuitBreaker("test", failure_threshold=1, recovery_timeout=0.05)
+    with pytest.raises(ConnectionError):
+        await breaker.call(failing_call)
+    await asyncio.sleep(0.06)
+    assert breaker.state == CircuitState.HALF_OPEN
+
+    # when...
+    with pytest.raises(ConnectionError):
+        await breaker.call(failing_call)
+
+    # then...
+    assert breaker.state == CircuitState.OPEN
+
+
+@pytest.mark.asyncio
+async def test_breaker_counts_timeouts_as_failures():
+    # given...
+    breaker = CircuitBreaker("test", failure_threshold=1, recovery_timeout=60, call_timeout=0.01)
+
+    # when...
+    with pytest.raises(TimeoutError):
+        await breaker.call(slow_call)
+
+    # then...
+    assert breaker.is_open
+
+
+@pytest.mark.asyncio
+async def test_breaker_ignores_excluded_exceptions():
+    # given...
+    breaker = CircuitBreaker(
+        "test", failure_threshold=1, recovery_timeout=60, excluded_exceptions=(ValueError,)
+    )
+
+    async def invalid_input():
+        raise ValueError("bad input")
+
+    # when...
+    with pytest.raises(ValueError):
+        await breaker.call(invalid_input)
+
+    # then...
+    assert breaker.state == CircuitState.CLOSED
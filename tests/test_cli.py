@@ -0,0 +1,96 @@
+import json
+import uuid
+from unittest.mock import AsyncMock
+
+import pytest
+
+from app.cli import Checkpoint, _prepare_records, batched, read_rows
+from app.core.s3_client import S3Client
+
+FIRST_ROW = 100
+BIO_MAX_LENGTH = 500
+
+
+def test_read_rows_skips_already_processed_rows(tmp_path):
+    # given...
+    user_ids = [str(uuid.uuid4()) for _ in range(3)]
+    source = tmp_path / "profiles.ndjson"
+    source.write_text("\n".join(json.dumps({"user_id": user_id}) for user_id in user_ids))
+
+    # when...
+    rows = list(read_rows(source, "ndjson", skip=1))
+
+    # then...
+    assert [row["user_id"] for row in rows] == user_ids[1:]
+
+
+def test_read_rows_parses_csv(tmp_path):
+    # given...
+    user_id = str(uuid.uuid4())
+    source = tmp_path / "profiles.csv"
+    source.write_text(f"user_id,display_name,bio\n{user_id},User,\n")
+
+    # when...
+    rows = list(read_rows(source, "csv"))
+
+    # then...
+    assert rows == [{"user_id": user_id, "display_name": "User", "bio": ""}]
+
+
+def test_batched_keeps_the_remainder():
+    # when...
+    batches = list(batched(iter([{"n": n} for n in range(5)]), batch_size=2))
+
+    # then...
+    assert [len(batch) for batch in batches] == [2, 2, 1]
+
+
+def test_checkpoint_round_trip(tmp_path):
+    # given...
+    path = tmp_path / "import.checkpoint"
+    checkpoint = Checkpoint.load(path)
+    checkpoint.processed = 10
+    checkpoint.failed_rows.append(4)
+
+    # when...
+    checkpoint.save()
+    restored = Checkpoint.load(path)
+
+    # then...
+    assert restored.processed == checkpoint.processed
+    assert restored.failed_rows == [4]
+    assert restored.last_key is None
+
+
+@pytest.mark.asyncio
+async def test_prepare_records_fails_rows_with_overlong_fields():
+    # given...
+    valid = {"user_id": str(uuid.uuid4()), "display_name": "User"}
+    overlong = {"user_id": str(uuid.uuid4()), "bio": "x" * (BIO_MAX_LENGTH + 1)}
+
+    # when...
+    records, failed_rows = await _prepare_records(
+        [valid, overlong], FIRST_ROW, AsyncMock(spec=S3Client), upload_workers=1
+    )
+
+    # then...
+    assert [record[2] for record in records] == ["User"]
+    assert failed_rows == [FIRST_ROW + 1]
+
+
+@pytest.mark.asyncio
+async def test_prepare_records_keeps_the_input_row_of_each_record():
+    # given...
+    user_id = str(uuid.uuid4())
+    rows = [{"user_id": user_id, "bio": "First"}, {"user_id": user_id, "bio": "Last"}]
+
+    # when...
+    records, _failed_rows = await _prepare_records(
+        rows, FIRST_ROW, AsyncMock(spec=S3Client), upload_workers=1
+    )
+
+    # then...
+    assert [(record[3], record[-1]) for record in records] == [
+        ("First", FIRST_ROW),
+        ("Last", FIRST_ROW + 1),
+    ]
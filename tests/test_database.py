@@ -0,0 +1,112 @@
+import pytest
+
+from app.core.config import settings
+from app.core.database import build_connect_args, build_pool_limits
+
+STATEMENT_CACHE_SIZE = 250
+POOL_SIZE = 5
+MAX_OVERFLOW = 10
+
+
+def test_connect_args_use_statement_cache_by_default():
+    # given...
+    config = settings.model_copy(
+        update={"DB_PGBOUNCER_MODE": False, "DB_STATEMENT_CACHE_SIZE": STATEMENT_CACHE_SIZE}
+    )
+
+    # when...
+    connect_args = build_connect_args(config)
+
+    # then...
+    assert connect_args["statement_cache_size"] == STATEMENT_CACHE_SIZE
+    assert connect_args["prepared_statement_cache_size"] == STATEMENT_CACHE_SIZE
+    assert "prepared_statement_name_func" not in connect_args
+
+
+def test_connect_args_disable_prepared_statements_in_pgbouncer_mode():
+    # given...
+    config = settings.model_copy(update={"DB_PGBOUNCER_MODE": True})
+
+    # when...
+    connect_args = build_connect_args(config)
+    name_func = connect_args["prepared_statement_name_func"]
+
+    # then...
+    assert connect_args["statement_cache_size"] == 0
+    assert connect_args["prepared_statement_cache_size"] == 0
+    assert name_func() != name_func()
+
+
+def test_pool_limits_split_connection_budget_between_workers():
+    # given...
+    config = settings.model_copy(
+        update={
+            "DB_MAX_CONNECTIONS": 40,
+            "SERVER_WORKERS": 4,
+            "DB_POOL_SIZE": POOL_SIZE,
+            "DB_MAX_OVERFLOW": MAX_OVERFLOW,
+            "CACHE_INVALIDATION_LISTENER_ENABLED": True,
+        }
+    )
+
+    # when...
+    pool_size, max_overflow = build_pool_limits(config)
+
+    # then...
+    # 40 connections / 4 workers, less one for each worker's invalidation listener.
+    assert pool_size == POOL_SIZE
+    assert pool_size + max_overflow == 40 // 4 - 1
+    assert config.SERVER_WORKERS * (pool_size + max_overflow + 1) <= config.DB_MAX_CONNECTIONS
+
+
+def test_pool_limits_keep_configured_pool_without_connection_budget():
+    # given...
+    config = settings.model_copy(
+        update={
+            "DB_MAX_CONNECTIONS": None,
+            "SERVER_WORKERS": 8,
+            "DB_POOL_SIZE": POOL_SIZE,
+            "DB_MAX_OVERFLOW": MAX_OVERFLOW,
+        }
+    )
+
+    # when...
+    pool_size, max_overflow = build_pool_limits(config)
+
+    # then...
+    assert pool_size == POOL_SIZE
+    assert max_overflow == MAX_OVERFLOW
+
+
+def test_pool_limits_reject_budget_too_small_for_workers():
+    # given...
+    config = settings.model_copy(
+        update={
+            "DB_MAX_CONNECTIONS": 6,
+            "SERVER_WORKERS": 4,
+            "CACHE_INVALIDATION_LISTENER_ENABLED": True,
+        }
+    )
+
+    # when / then...
+    with pytest.raises(ValueError):
+        build_pool_limits(config)
+
+
+@pytest.mark.parametrize(("pool_size", "max_overflow"), [(0, MAX_OVERFLOW), (POOL_SIZE, -1)])
+def test_pool_limits_reject_unbounded_pool_with_connection_budget(
+    pool_size: int, max_overflow: int
+):
+    # given...
+    config = settings.model_copy(
+        update={
+            "DB_MAX_CONNECTIONS": 100,
+            "SERVER_WORKERS": 1,
+            "DB_POOL_SIZE": pool_size,
+            "DB_MAX_OVERFLOW": max_overflow,
+        }
+    )
+
+    # when / then...
+    with pytest.raises(ValueError):
+        build_pool_limits(config)
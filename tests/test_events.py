@@ -0,0 +1,53 @@
+import uuid
+from datetime import UTC, datetime
+from unittest.mock import AsyncMock
+
+import pytest
+import redis.asyncio as aioredis
+from redis.asyncio.cluster import RedisCluster
+
+from app.core.config import settings
+from app.core.events import EVENT_FIELD, iter_profile_events
+from app.schemas.profile import ProfileEvent
+
+ENTRY_ID = b"1700000000000-0"
+SOCKET_TIMEOUT = 2.0
+EVENT = ProfileEvent(
+    type="updated",
+    profile_id=uuid.UUID("0192f6a8-7b3c-7d2e-8f10-1a2b3c4d5e6f"),
+    user_id=uuid.UUID("0b6f3c55-2d1f-4a8a-9d0e-6f1c7a7c2b11"),
+    display_name="Alice",
+    avatar_key=None,
+    updated_at=datetime(2026, 1, 1, tzinfo=UTC),
+)
+
+
+def stream_reply() -> list:
+    return [
+        (
+            settings.PROFILE_EVENTS_STREAM.encode(),
+            [(ENTRY_ID, {EVENT_FIELD: EVENT.model_dump_json().encode()})],
+        )
+    ]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("client_class", [aioredis.Redis, RedisCluster])
+async def test_iter_profile_events_blocks_within_the_socket_timeout(monkeypatch, client_class):
+    # given...
+    monkeypatch.setattr(settings, "REDIS_SOCKET_TIMEOUT", 0.5)
+    # Built without connecting, so the timeout is read from the client's real configuration.
+    redis = client_class(host="localhost", socket_timeout=SOCKET_TIMEOUT)
+    redis.xread = AsyncMock(return_value=stream_reply())
+
+    # when...
+    events = iter_profile_events(redis, last_id="0-0", block_ms=5000)
+    entry_id, event = await anext(events)
+    await events.aclose()
+    await redis.aclose()
+
+    # then...
+    assert (entry_id, event) == (ENTRY_ID.decode(), EVENT)
+    redis.xread.assert_awaited_once_with(
+        {settings.PROFILE_EVENTS_STREAM: "0-0"}, count=100, block=1500
+    )
@@ -0,0 +1,111 @@
+import asyncio
+import time
+from unittest.mock import AsyncMock
+
+import pytest
+from fastapi import status
+from httpx import ASGITransport, AsyncClient
+
+from app.core.health import LAG_SAMPLE_SECONDS, DependencyProber, ProbeResult
+from app.main import REQUIRED_DEPENDENCIES, app
+
+PROBE_TIMEOUT_SECONDS = 0.05
+BLOCKING_SECONDS = 0.6
+
+
+async def hang() -> None:
+    await asyncio.sleep(1)
+
+
+@pytest.mark.asyncio
+async def test_prober_caches_results_of_each_dependency():
+    # given...
+    postgres = AsyncMock()
+    redis = AsyncMock(side_effect=ConnectionError("connection refused"))
+    prober = DependencyProber(
+        {"postgres": postgres, "redis": redis, "s3": hang}, timeout=PROBE_TIMEOUT_SECONDS
+    )
+
+    # when...
+    await prober.probe_all()
+
+    # then...
+    dependencies = prober.snapshot()["dependencies"]
+    postgres.assert_awaited_once()
+    assert dependencies["postgres"]["ok"]
+    assert not dependencies["redis"]["ok"]
+    assert dependencies["redis"]["error"] == "connection refused"
+    assert dependencies["s3"]["error"] == f"timed out after {PROBE_TIMEOUT_SECONDS}s"
+
+
+@pytest.mark.asyncio
+async def test_prober_treats_stale_results_as_failed():
+    # given...
+    prober = DependencyProber({"postgres": AsyncMock()}, max_age=10)
+    await prober.probe_all()
+
+    # when...
+    prober.results["postgres"] = ProbeResult(ok=True, latency_ms=1, checked_at=time.time() - 60)
+
+    # then...
+    assert not prober.is_healthy("postgres")
+
+
+@pytest.mark.asyncio
+async def test_prober_measures_event_loop_lag():
+    # given...
+    prober = DependencyProber({})
+    measurement = asyncio.create_task(prober._measure_lag(1.0))
+    await asyncio.sleep(0)
+
+    # when...
+    time.sleep(BLOCKING_SECONDS)  # blocks the event loop
+    lag_ms = await measurement
+
+    # then...
+    # The sleep in flight was due within LAG_SAMPLE_SECONDS of the block starting.
+    assert lag_ms >= (BLOCKING_SECONDS - LAG_SAMPLE_SECONDS) * 1000
+
+
+@pytest.mark.asyncio
+async def test_readiness_reports_cached_probe_results():
+    # given...
+    postgres = AsyncMock(side_effect=OSError("connection refused"))
+    prober = DependencyProber({"postgres": postgres, "redis": AsyncMock()})
+    await prober.probe_all()
+    app.state.dependency_prober = prober
+    app.state.ready = True
+
+    # when...
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        live = await client.get("/live")
+        ready = await client.get("/ready")
+
+    # then...
+    assert live.status_code == status.HTTP_200_OK
+    assert ready.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    assert ready.json()["failing"] == ["postgres"]
+    assert ready.json()["dependencies"]["redis"]["ok"]
+    assert "saturation" in ready.json()["db_pool"]
+    postgres.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_readiness_reports_an_unbounded_pool_as_unsaturated(
+    monkeypatch: pytest.MonkeyPatch,
+):
+    # given...
+    pool = {"size": 0, "max_overflow": 0, "checked_in": 0, "checked_out": 5, "capacity": 0}
+    monkeypatch.setattr("app.main.get_pool_stats", lambda: pool)
+    prober = DependencyProber({name: AsyncMock() for name in REQUIRED_DEPENDENCIES})
+    await prober.probe_all()
+    app.state.dependency_prober = prober
+    app.state.ready = True
+
+    # when...
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        ready = await client.get("/ready")
+
+    # then...
+    assert ready.status_code == status.HTTP_200_OK
+    assert ready.json()["db_pool"]["saturation"] == 0.0
@@ -0,0 +1,113 @@
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+import redis.asyncio as aioredis
+
+from app.core.hot_keys import TTL_MISSING, HotKeyRefresher, HotKeyTracker
+
+CAPACITY = 5
+HOT_READS = 200
+
+
+def build_tracker() -> HotKeyTracker:
+    return HotKeyTracker(CAPACITY, width=512, depth=4, decay_every=1_000_000)
+
+
+def mock_redis(*results: list) -> AsyncMock:
+    redis = AsyncMock(spec=aioredis.Redis)
+    pipeline = MagicMock()
+    pipeline.__aenter__.return_value = pipeline
+    pipeline.execute = AsyncMock(side_effect=results)
+    redis.pipeline = MagicMock(return_value=pipeline)
+    return redis
+
+
+def test_tracker_keeps_heavy_hitters_within_capacity():
+    # given...
+    tracker = build_tracker()
+    hot_keys = {f"hot-{index}" for index in range(3)}
+
+    # when...
+    for round_ in range(HOT_READS):
+        for key in hot_keys:
+            tracker.record(key)
+        tracker.record(f"cold-{round_}")
+
+    # then...
+    hot = tracker.hot()
+    assert len(hot) <= CAPACITY
+    assert {key for key, _count in hot[:3]} == hot_keys
+    assert all(count >= HOT_READS for _key, count in hot[:3])
+
+
+def test_tracker_decay_forgets_keys_that_stop_being_read():
+    # given...
+    tracker = build_tracker()
+    tracker.record("once")
+    for _ in range(HOT_READS):
+        tracker.record("hot")
+
+    # when...
+    tracker.decay()
+
+    # then...
+    assert tracker.hot() == [("hot", HOT_READS // 2)]
+
+
+@pytest.mark.asyncio
+async def test_refresher_refreshes_expiring_hot_entries_up_to_batch_size():
+    # given...
+    tracker = build_tracker()
+    for key, reads in (("a", 40), ("b", 30), ("c", 20), ("d", 10)):
+        for _ in range(reads):
+            tracker.record(key)
+    # Published hot list, then TTLs of a (fresh), b (missing), c and d (expiring).
+    redis = mock_redis([4, 0, True], [55, TTL_MISSING, 3, 5])
+    refresh = AsyncMock()
+    refresher = HotKeyRefresher(
+        tracker, redis, refresh, lambda key: key, refresh_ahead=15, batch_size=2, min_count=10
+    )
+
+    # when...
+    refreshed = await refresher.refresh_once()
+
+    # then...
+    assert refreshed == len(refresh.await_args_list)
+    assert [call.args for call in refresh.await_args_list] == [("b",), ("c",)]
+
+
+@pytest.mark.asyncio
+async def test_refresher_warm_fills_published_hot_entries():
+    # given...
+    tracker = build_tracker()
+    redis = mock_redis([TTL_MISSING, 40])
+    redis.zrevrange = AsyncMock(return_value=[(b"a", 50.0), (b"b", 20.0)])
+    refresh = AsyncMock()
+    refresher = HotKeyRefresher(tracker, redis, refresh, lambda key: key, refresh_ahead=15)
+
+    # when...
+    warmed = await refresher.warm(count=10)
+
+    # then...
+    assert warmed == 1
+    refresh.assert_awaited_once_with("a")
+    assert [key for key, _count in tracker.hot()] == ["a", "b"]
+
+
+@pytest.mark.asyncio
+async def test_refresher_warm_with_no_count_reads_nothing():
+    # given...
+    tracker = build_tracker()
+    redis = mock_redis()
+    redis.zrevrange = AsyncMock(return_value=[(b"a", 50.0)])
+    refresh = AsyncMock()
+    refresher = HotKeyRefresher(tracker, redis, refresh, lambda key: key, refresh_ahead=15)
+
+    # when...
+    warmed = await refresher.warm(count=0)
+
+    # then...
+    assert warmed == 0
+    redis.zrevrange.assert_not_awaited()
+    refresh.assert_not_awaited()
+    assert tracker.hot() == []
@@ -0,0 +1,34 @@
+import time
+
+from app.core.ids import uuid7
+
+UUID_VERSION = 7
+
+
+def test_uuid7_sets_version_and_variant():
+    # when...
+    value = uuid7()
+
+    # then...
+    assert value.version == UUID_VERSION
+    assert value.variant == "specified in RFC 4122"
+
+
+def test_uuid7_embeds_current_timestamp():
+    # given...
+    before_ms = time.time_ns() // 1_000_000
+
+    # when...
+    timestamp_ms = uuid7().int >> 80
+
+    # then...
+    assert before_ms <= timestamp_ms <= time.time_ns() // 1_000_000 + 1
+
+
+def test_uuid7_is_monotonic_and_unique():
+    # when...
+    values = [uuid7() for _ in range(10_000)]
+
+    # then...
+    assert values == sorted(values)
+    assert len(set(values)) == len(values)
@@ -0,0 +1,101 @@
+import asyncio
+
+import pytest
+from fastapi import FastAPI, status
+from httpx import ASGITransport, AsyncClient
+
+from app.core.load_shedding import AdaptiveLimiter, LimitExceededError, LoadSheddingMiddleware
+
+RETRY_AFTER_SECONDS = 3
+
+
+@pytest.mark.asyncio
+async def test_limiter_rejects_when_limit_and_queue_are_full():
+    # given...
+    limiter = AdaptiveLimiter("test", initial_limit=1, max_queue=1, queue_timeout=5)
+    await limiter.acquire()
+    queued = asyncio.create_task(limiter.acquire())
+    await asyncio.sleep(0)
+
+    # when / then...
+    with pytest.raises(LimitExceededError):
+        await limiter.acquire()
+    limiter.release()
+    await queued
+    assert limiter.in_flight == 1
+    assert limiter.queued == 0
+
+
+@pytest.mark.asyncio
+async def test_limiter_rejects_after_queue_timeout():
+    # given...
+    limiter = AdaptiveLimiter("test", initial_limit=1, queue_timeout=0.01)
+    await limiter.acquire()
+
+    # when / then...
+    with pytest.raises(LimitExceededError):
+        await limiter.acquire()
+    assert limiter.queued == 0
+
+
+@pytest.mark.asyncio
+async def test_limiter_shrinks_limit_when_latency_rises():
+    # given...
+    limiter = AdaptiveLimiter("test", initial_limit=20, max_limit=20)
+    for _ in range(20):
+        await limiter.acquire()
+    for _ in range(50):
+        limiter.release(rtt=0.001)
+        await limiter.acquire()
+    baseline = limiter.limit
+
+    # when...
+    for _ in range(10):
+        limiter.release(rtt=0.1)
+
+    # then...
+    assert limiter.limit < baseline
+
+
+@pytest.fixture
+def shedding_app():
+    app = FastAPI()
+    limiter = AdaptiveLimiter("read", initial_limit=1, max_queue=0)
+    app.add_middleware(
+        LoadSheddingMiddleware,
+        limiters={"read": limiter},
+        classify=lambda scope: "read",
+        exempt_paths=frozenset({"/ready"}),
+        retry_after=RETRY_AFTER_SECONDS,
+    )
+
+    @app.get("/ready")
+    async def ready():
+        return {"status": "ready"}
+
+    @app.get("/profile")
+    async def profile():
+        return {"status": "ok"}
+
+    return app, limiter
+
+
+@pytest.mark.asyncio
+async def test_middleware_sheds_excess_requests_with_retry_after(shedding_app):
+    # given...
+    app, limiter = shedding_app
+    await limiter.acquire()  # another request holds the only slot
+
+    # when...
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        shed = await client.get("/profile")
+        health = await client.get("/ready")
+        limiter.release()
+        served = await client.get("/profile")
+
+    # then...
+    assert shed.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    assert shed.headers["Retry-After"] == str(RETRY_AFTER_SECONDS)
+    assert health.status_code == status.HTTP_200_OK
+    assert served.status_code == status.HTTP_200_OK
+    assert limiter.in_flight == 0
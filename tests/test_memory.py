@@ -0,0 +1,57 @@
+import pytest
+
+from app.core.memory import MemoryTracer, TracingStateError, object_counts
+
+RETAINED_BLOCKS = 1000
+BLOCK_BYTES = 1024
+
+
+class RetainedRecord:
+    pass
+
+
+def test_tracer_reports_lines_that_grew_since_the_baseline():
+    # given...
+    tracer = MemoryTracer()
+    tracer.start()
+
+    # when...
+    try:
+        retained = [bytearray(BLOCK_BYTES) for _ in range(RETAINED_BLOCKS)]
+        diff = tracer.diff(limit=1)
+    finally:
+        tracer.stop()
+
+    # then...
+    top = diff["top"][0]
+    assert top["location"].split(":")[0].endswith("test_memory.py")
+    assert top["size_diff_bytes"] >= RETAINED_BLOCKS * BLOCK_BYTES
+    assert top["count_diff"] >= len(retained)
+
+
+def test_tracer_rejects_calls_in_the_wrong_state():
+    # given...
+    tracer = MemoryTracer()
+
+    # when/then...
+    with pytest.raises(TracingStateError):
+        tracer.diff()
+    tracer.start()
+    try:
+        with pytest.raises(TracingStateError):
+            tracer.start()
+    finally:
+        tracer.stop()
+    with pytest.raises(TracingStateError):
+        tracer.stop()
+
+
+def test_object_counts_group_live_objects_by_type():
+    # given...
+    retained = [RetainedRecord() for _ in range(RETAINED_BLOCKS)]
+
+    # when...
+    counts = {entry["type"]: entry["count"] for entry in object_counts(limit=1000)}
+
+    # then...
+    assert counts[f"{__name__}.RetainedRecord"] == len(retained)
@@ -0,0 +1,41 @@
+import base64
+import io
+
+from PIL import Image
+
+from app.core.placeholders import (
+    PLACEHOLDER_MAX_LENGTH,
+    PLACEHOLDER_MAX_SIDE,
+    build_avatar_placeholder,
+)
+
+DATA_URI_PREFIX = "data:image/webp;base64,"
+
+
+def encode_image(size: tuple[int, int], mode: str = "RGB", image_format: str = "PNG") -> bytes:
+    buffer = io.BytesIO()
+    Image.new(mode, size, color="teal").save(buffer, format=image_format)
+    return buffer.getvalue()
+
+
+def test_placeholder_is_a_small_inline_thumbnail():
+    # given...
+    contents = encode_image((640, 320), image_format="JPEG")
+
+    # when...
+    placeholder = build_avatar_placeholder(contents)
+
+    # then...
+    assert placeholder is not None
+    assert placeholder.startswith(DATA_URI_PREFIX)
+    assert len(placeholder) <= PLACEHOLDER_MAX_LENGTH
+    thumbnail = Image.open(io.BytesIO(base64.b64decode(placeholder.removeprefix(DATA_URI_PREFIX))))
+    assert thumbnail.size == (PLACEHOLDER_MAX_SIDE, PLACEHOLDER_MAX_SIDE // 2)
+
+
+def test_placeholder_is_none_for_content_that_is_not_an_image():
+    # when...
+    placeholder = build_avatar_placeholder(b"not an image")
+
+    # then...
+    assert placeholder is None
@@ -0,0 +1,99 @@
+import asyncio
+import time
+
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+
+from app.core.profiler import (
+    ProfilerBusyError,
+    ProfilerMiddleware,
+    ProfilerState,
+    SamplingProfiler,
+    profiler_state,
+)
+
+BUSY_SECONDS = 0.1
+SAMPLE_INTERVAL_SECONDS = 0.001
+
+
+def create_app() -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(ProfilerMiddleware)
+
+    @app.get("/busy")
+    async def busy_handler():
+        deadline = time.perf_counter() + BUSY_SECONDS
+        while time.perf_counter() < deadline:
+            pass
+        return {}
+
+    @app.get("/idle")
+    async def idle_handler():
+        await asyncio.sleep(BUSY_SECONDS)
+        return {}
+
+    return app
+
+
+async def profile_requests(profiler: SamplingProfiler, *paths: str) -> None:
+    async with AsyncClient(
+        transport=ASGITransport(app=create_app()), base_url="http://t"
+    ) as client:
+        profiling = asyncio.create_task(profiler_state.profile(profiler, seconds=5))
+        await asyncio.sleep(0)
+        for path in paths:
+            await client.get(path)
+        await profiling
+
+
+@pytest.mark.asyncio
+async def test_profiler_samples_async_handlers_until_requests_complete():
+    # given...
+    profiler = SamplingProfiler(SAMPLE_INTERVAL_SECONDS, max_requests=2)
+
+    # when...
+    started = time.perf_counter()
+    await profile_requests(profiler, "/busy", "/idle")
+
+    # then...
+    assert time.perf_counter() - started < 1
+    assert profiler.requests == 2  # noqa: PLR2004
+    assert profiler.samples > 0
+    assert "create_app.<locals>.busy_handler (tests/test_profiler.py:" in profiler.collapsed()
+    # The idle handler only awaits, so it is never on the stack when a sample is taken.
+    assert "idle_handler" not in profiler.collapsed()
+
+
+@pytest.mark.asyncio
+async def test_profiler_keeps_only_stacks_through_the_focused_route():
+    # given...
+    app = create_app()
+    idle = next(route for route in app.routes if getattr(route, "path", None) == "/idle")
+    profiler = SamplingProfiler(
+        SAMPLE_INTERVAL_SECONDS,
+        focus=idle.endpoint.__code__,
+        focus_path="/idle",
+        max_requests=1,
+    )
+
+    # when...
+    await profile_requests(profiler, "/busy", "/idle")
+
+    # then...
+    assert profiler.requests == 1
+    assert "busy_handler" not in profiler.collapsed()
+
+
+@pytest.mark.asyncio
+async def test_profiler_runs_one_profile_at_a_time():
+    # given...
+    state = ProfilerState()
+    running = asyncio.create_task(state.profile(SamplingProfiler(), seconds=BUSY_SECONDS))
+    await asyncio.sleep(0)
+
+    # when/then...
+    with pytest.raises(ProfilerBusyError):
+        await state.profile(SamplingProfiler(), seconds=BUSY_SECONDS)
+    await running
+    assert state.active is None
@@ -0,0 +1,114 @@
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.core.rate_limit import (
+    REFUND_TOKEN_SCRIPT,
+    LocalTokenBuckets,
+    RateLimit,
+    consume,
+    local_buckets,
+)
+
+CAPACITY = 3
+
+
+def test_local_buckets_reject_once_capacity_is_used():
+    # given...
+    buckets = LocalTokenBuckets()
+    limit = RateLimit("ratelimit:test:user:1", CAPACITY, period=60)
+
+    # when...
+    decisions = [buckets.consume(limit) for _ in range(CAPACITY + 1)]
+
+    # then...
+    assert [decision.allowed for decision in decisions] == [True] * CAPACITY + [False]
+    assert decisions[-1].headers()["RateLimit-Remaining"] == "0"
+    assert decisions[-1].headers()["Retry-After"] == "20"
+
+
+def test_local_buckets_evict_least_recently_used_keys():
+    # given...
+    buckets = LocalTokenBuckets(max_keys=1)
+    first = RateLimit("ratelimit:test:user:1", 1, period=60)
+    second = RateLimit("ratelimit:test:user:2", 1, period=60)
+
+    # when...
+    buckets.consume(first)
+    buckets.consume(second)
+
+    # then...
+    assert buckets.consume(first).allowed
+
+
+@pytest.mark.asyncio
+async def test_consume_returns_tightest_limit_from_redis():
+    # given...
+    redis = MagicMock()
+    redis.register_script.return_value = AsyncMock(side_effect=[[1, b"8.5"], [1, b"2.25"]])
+    limits = [
+        RateLimit("ratelimit:test:user:1", 10, period=60),
+        RateLimit("ratelimit:test:ip:127.0.0.1", CAPACITY, period=60),
+    ]
+
+    # when...
+    decision = await consume(redis, limits)
+
+    # then...
+    assert decision.allowed
+    assert decision.limit is limits[1]
+    assert decision.headers()["RateLimit-Remaining"] == "2"
+
+
+@pytest.mark.asyncio
+async def test_consume_falls_back_to_local_buckets_when_redis_fails():
+    # given...
+    redis = MagicMock()
+    redis.register_script.return_value = AsyncMock(side_effect=ConnectionError("down"))
+    limit = RateLimit("ratelimit:test:user:fallback", 1, period=60)
+
+    # when...
+    first = await consume(redis, [limit])
+    second = await consume(redis, [limit])
+
+    # then...
+    assert first.allowed
+    assert not second.allowed
+
+
+@pytest.mark.asyncio
+async def test_rejected_request_leaves_other_local_buckets_untouched():
+    # given...
+    write = RateLimit("ratelimit:test:profile_write:user:refund", CAPACITY, period=60)
+    avatar = RateLimit("ratelimit:test:avatar_upload:user:refund", 1, period=60)
+    await consume(None, [write, avatar])
+
+    # when...
+    rejected = await consume(None, [write, avatar])
+
+    # then...
+    assert not rejected.allowed
+    assert rejected.limit is avatar
+    assert local_buckets.consume(write).tokens == pytest.approx(CAPACITY - 2, abs=0.01)
+
+
+@pytest.mark.asyncio
+async def test_rejected_request_refunds_other_redis_buckets():
+    # given...
+    bucket = AsyncMock(side_effect=[[1, b"2"], [0, b"0.5"]])
+    refund = AsyncMock()
+    redis = MagicMock()
+    redis.register_script.side_effect = lambda script: (
+        refund if script == REFUND_TOKEN_SCRIPT else bucket
+    )
+    limits = [
+        RateLimit("ratelimit:test:profile_write:user:1", CAPACITY, period=60),
+        RateLimit("ratelimit:test:avatar_upload:user:1", 1, period=60),
+    ]
+
+    # when...
+    decision = await consume(redis, limits)
+
+    # then...
+    assert not decision.allowed
+    refund.assert_awaited_once_with(keys=[limits[0].key], args=[CAPACITY])
@@ -0,0 +1,37 @@
+from unittest.mock import AsyncMock
+
+import redis.asyncio as aioredis
+from redis.asyncio.cluster import RedisCluster
+from redis.crc import key_slot
+
+from app.core.cache_keys import profile_cache_keys
+from app.core.redis_client import _parse_hosts, batch_keys
+
+
+def test_profile_keys_share_a_cluster_slot():
+    # when...
+    slots = {key_slot(key.encode()) for key in profile_cache_keys("a")}
+
+    # then...
+    assert len(slots) == 1
+
+
+def test_batch_keys_groups_by_slot_only_on_a_cluster():
+    # given...
+    keys = [*profile_cache_keys("a"), *profile_cache_keys("b")]
+
+    # when...
+    standalone_batches = batch_keys(AsyncMock(spec=aioredis.Redis), keys, batch_size=4)
+    cluster_batches = batch_keys(AsyncMock(spec=RedisCluster), keys, batch_size=4)
+
+    # then...
+    assert standalone_batches == [keys[:4], keys[4:]]
+    assert sorted(cluster_batches) == sorted([keys[:3], keys[3:]])
+
+
+def test_parse_sentinel_hosts():
+    # when...
+    hosts = _parse_hosts("sentinel-0:26380, sentinel-1,")
+
+    # then...
+    assert hosts == [("sentinel-0", 26380), ("sentinel-1", 26379)]
@@ -0,0 +1,52 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from app.core.migrations import get_head_revisions
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+COLD_START_IMPORT_BUDGET_SECONDS = 2.0
+DEFERRED_MODULES = ["aioboto3", "aiobotocore", "aiohttp", "PIL"]
+
+
+def run_python(code: str) -> str:
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=PROJECT_ROOT,
+        env=os.environ,
+    )
+    return result.stdout.strip()
+
+
+def test_app_import_defers_heavy_modules():
+    # when...
+    loaded = run_python(
+        "import sys; import app.main; "
+        f"print(','.join(name for name in {DEFERRED_MODULES!r} if name in sys.modules))"
+    )
+
+    # then...
+    assert loaded == ""
+
+
+def test_app_import_within_cold_start_budget():
+    # given...
+    code = (
+        "import time; started = time.perf_counter(); import app.main; "
+        "print(time.perf_counter() - started)"
+    )
+
+    # when...
+    # The first run may have to compile bytecode, which the image ships precompiled.
+    elapsed = min(float(run_python(code)) for _ in range(2))
+
+    # then...
+    assert elapsed < COLD_START_IMPORT_BUDGET_SECONDS
+
+
+def test_migrations_have_a_single_head():
+    assert len(get_head_revisions()) == 1